@@ -0,0 +1,792 @@
+import math
+import operator
+import struct
+import sys
+
+INT_REGISTERS = ("I1", "I2", "I3", "I4", "I5", "I6")
+FLOAT_REGISTERS = ("FF1", "FF2", "FF3", "FF4", "FF5", "FF6")
+VECTOR_REGISTERS = ("V1", "V2", "V3", "V4", "V5", "V6")
+REGISTERS = INT_REGISTERS + FLOAT_REGISTERS + VECTOR_REGISTERS
+REGISTER_CLASSES = {"I": INT_REGISTERS, "FF": FLOAT_REGISTERS, "V": VECTOR_REGISTERS}
+INT_OPERATIONS = {"ADD": operator.add, "SUB": operator.sub, "MUL": operator.mul, "DIV": operator.floordiv,
+                  "MOD": operator.mod}
+FLOAT_OPERATIONS = {"ADD": operator.add, "SUB": operator.sub, "MUL": operator.mul, "DIV": operator.truediv,
+                    "MOD": operator.mod}
+ZERO_ERRORS = {"DIV": "Division by zero", "MOD": "Modulo by zero"}
+FACT_WRAPS_TO_ZERO = 34
+ARITHMETIC_VERBS = {"ADD": "add", "SUB": "subtract", "MUL": "multiply", "DIV": "divide", "MOD": "perform modulo with"}
+
+
+def wrap(value):
+    value %= 2 ** 32
+    if value >= 2 ** 31:
+        value -= 2 ** 32
+    return value
+
+
+def f32(value):
+    bits = struct.unpack('!I', struct.pack('!f', value))[0]
+    sign_bit, raw_exponent, mantissa = bits >> 31, (bits >> 23) & 0xFF, bits & 0x7FFFFF
+    if raw_exponent == 0:
+        exponent = -126
+        mantissa_value = mantissa / (2 ** 23)
+    else:
+        exponent = raw_exponent - 127
+        mantissa_value = 1 + mantissa / (2 ** 23)
+    return ((-1) ** sign_bit) * (2 ** exponent) * mantissa_value
+
+
+def is_number(text):
+    return text.replace('.', '', 1).isdigit() and text.count('.') < 2
+
+
+class Operand:
+    __slots__ = ("text", "kind", "base", "index", "index_kind", "value")
+
+    def __init__(self, text, kind, base=None, index=None, index_kind=None, value=None):
+        self.text = text
+        self.kind = kind
+        self.base = base
+        self.index = index
+        self.index_kind = index_kind
+        self.value = value
+
+
+class Machine:
+    def __init__(self, lines):
+        self.i = dict.fromkeys(INT_REGISTERS, 0)
+        self.f = dict.fromkeys(FLOAT_REGISTERS, 0.0)
+        self.v = {name: [0.0] * 32 for name in VECTOR_REGISTERS}
+        self.memory = [None] * 1000
+        self.stack = [None] * 1000
+        self.stack_index = 0
+        self.memory_index = 0
+        self.variables = {}
+        self.texts = {}
+        self.lines = lines
+        self.line = 0
+        self.depth = 0
+
+    def error(self, message):
+        where, code_line = self.lines[self.line]
+        print(f"\033[31mFATAL ERROR at {where}: {message}\n ====>{code_line}<====\033[0m")
+        sys.exit(1)
+
+    def warn(self, operator_name):
+        print(f"\033[31mWARNING: Unknown instruction: {operator_name}, skipping...\033[0m")
+
+    def halt(self, code):
+        sys.exit(int(code))
+
+    def register(self, name):
+        if name in self.i:
+            return self.i[name]
+        if name in self.f:
+            return self.f[name]
+        return self.v.get(name)
+
+    def set_register(self, name, value):
+        if name in self.i:
+            self.i[name] = wrap(int(value))
+        elif name in self.f:
+            self.f[name] = f32(value)
+        elif name in self.v:
+            if isinstance(value, list) and (1 <= len(value) <= 32):
+                self.v[name] = [float(x) for x in value]
+            else:
+                print("\033[31mFATAL ERROR: Vector register must be assigned a list of floats with length between 1 "
+                      "and 32.\033[0m")
+                sys.exit(1)
+
+    def lookup_variable(self, name):
+        if name not in self.variables:
+            self.error(f"Variable {name} used before it was declared")
+        return self.variables[name]
+
+    def operand_index(self, operand):
+        if operand.index_kind == "literal":
+            return operand.index
+        if operand.index_kind == "register":
+            return self.register(operand.index)
+        head, buffer, var_type = self.lookup_variable(operand.index)
+        if var_type != "int":
+            self.error("Um what are you even trying to do?")
+        return self.memory[head]
+
+    def operand_value(self, operand):
+        kind = operand.kind
+        if kind == "literal":
+            return operand.value
+        if kind in ("int", "float", "vector"):
+            return self.register(operand.base)
+        if kind == "element":
+            vec = self.register(operand.base)
+            index = self.operand_index(operand)
+            if index < 0 or index >= len(vec):
+                self.error(f"Index {index} out of range for register {operand.base}")
+            return vec[index]
+        head, buffer, var_type = self.lookup_variable(operand.base)
+        if kind == "variable_element":
+            if var_type != "vector":
+                self.error(f"Cannot index non-vector variable {operand.base}")
+            index = self.operand_index(operand)
+            if index < 0 or index >= buffer:
+                self.error(f"Index {index} out of range for variable {operand.base}")
+            return self.memory[head + index]
+        if var_type == "vector":
+            return [self.memory[head + i] for i in range(buffer)]
+        return self.memory[head]
+
+    def vector_literal_values(self, operand):
+        values = []
+        for token in operand.value:
+            try:
+                values.append(float(self.operand_value(token)))
+            except (TypeError, ValueError):
+                self.error(f"Invalid conversion of {token.text} value to float")
+        return values
+
+    def move(self, key, value):
+        if key.kind in ("variable", "variable_element"):
+            self.move_to_variable(key, value)
+            return
+        target_base = key.base
+        if value.kind == "vector_literal":
+            self.set_register(target_base, self.vector_literal_values(value))
+            return
+        src_val = self.operand_value(value)
+        if key.kind == "element":
+            try:
+                num = float(src_val)
+            except (TypeError, ValueError):
+                self.error(f"Type mismatch: expected scalar for vector element assignment, got {src_val}")
+                return
+            vec = self.register(target_base)
+            target_index = self.operand_index(key)
+            if target_index < 0 or target_index >= len(vec):
+                self.error(f"Index {target_index} out of range for register {target_base}")
+                return
+            vec[target_index] = num
+            self.set_register(target_base, vec)
+        elif key.kind == "int":
+            try:
+                num = float(src_val)
+            except (TypeError, ValueError):
+                self.error(f"Invalid source value: {src_val}")
+                return
+            if num.is_integer():
+                self.set_register(target_base, int(num))
+            else:
+                self.error(f"Type mismatch: expected integer, got {src_val}")
+        elif key.kind == "float":
+            try:
+                self.set_register(target_base, float(src_val))
+            except (TypeError, ValueError):
+                self.error(f"Invalid source value: {src_val}")
+        elif isinstance(src_val, list):
+            self.set_register(target_base, src_val)
+        else:
+            self.error(f"Expected vector, got scalar for register {target_base}")
+
+    def move_to_variable(self, key, value):
+        target_base = key.base
+        head, buffer, var_type = self.lookup_variable(target_base)
+        if key.kind == "variable_element":
+            if var_type != "vector":
+                self.error(f"Cannot index non-vector variable {target_base}")
+                return
+            target_index = self.operand_index(key)
+            if value.kind == "text":
+                self.error(f"Type mismatch: expected scalar for vector element assignment, got {value.text}")
+                return
+            try:
+                num = float(self.operand_value(value))
+            except (TypeError, ValueError):
+                self.error(f"Type mismatch: expected scalar for vector element assignment, got {value.text}")
+                return
+            if target_index < 0 or target_index >= buffer:
+                self.error(f"Index {target_index} out of range for variable {target_base}")
+                return
+            self.memory[head + target_index] = num
+            return
+        if value.kind == "literal":
+            numeric_value = value.value
+            if var_type == "int" and numeric_value.is_integer():
+                self.memory[head] = int(numeric_value)
+            elif var_type == "float":
+                self.memory[head] = numeric_value
+            else:
+                self.error(f"Cannot move {numeric_value} to {target_base} due to type mismatch")
+            return
+        if value.kind == "vector_literal":
+            for i, token_val in enumerate(self.vector_literal_values(value)):
+                self.memory[head + i] = token_val
+            self.variables[target_base] = [head, len(value.value), "vector"]
+            return
+        if value.kind == "text":
+            values = [ord(char) for char in value.text.replace('"', "")]
+            if len(values) > buffer:
+                self.error(f"Memory buffer overflow by {len(values) - buffer} bytes")
+                return
+            for i, v in enumerate(values):
+                self.memory[head + i] = v
+            self.variables[target_base] = [head, buffer, "string"]
+            return
+        src_val = self.operand_value(value)
+        if var_type == "int":
+            try:
+                num = float(src_val)
+            except (TypeError, ValueError):
+                self.error(f"Invalid source value: {src_val}")
+                return
+            if num.is_integer():
+                self.memory[head] = int(num)
+            else:
+                self.error(f"Type mismatch: expected integer, got {src_val}")
+        elif var_type == "float":
+            try:
+                self.memory[head] = float(src_val)
+            except (TypeError, ValueError):
+                self.error(f"Invalid source value: {src_val}")
+        elif var_type == "vector":
+            if isinstance(src_val, list):
+                for i, elem in enumerate(src_val):
+                    self.memory[head + i] = elem
+                self.variables[target_base] = [head, len(src_val), "vector"]
+            else:
+                self.error(f"Expected vector, got scalar for variable {target_base}")
+        else:
+            self.error(f"Unknown variable type for {target_base}")
+
+    def arithmetic_operand(self, reg1, key, operation):
+        if key.kind == "vector_literal":
+            return [token.value for token in key.value]
+        if key.kind in ("variable", "variable_element"):
+            head, buf, var_type = self.lookup_variable(key.base)
+            if var_type in ("int", "float"):
+                return float(self.memory[head])
+            if var_type != "vector":
+                self.error(f"Cannot {ARITHMETIC_VERBS[operation]} a {var_type} variable and register {reg1.base}")
+        return self.operand_value(key)
+
+    def arith(self, operation, dest, key):
+        value = self.arithmetic_operand(dest, key, operation)
+        zero_error = ZERO_ERRORS.get(operation)
+        verb = ARITHMETIC_VERBS[operation]
+        if isinstance(value, list) and dest.kind != "vector":
+            self.error(f"Cannot {verb} vector and {dest.kind} register {dest.base}")
+        if dest.kind == "int":
+            if not isinstance(value, int):
+                if not float(value).is_integer():
+                    self.error(f"Cannot {verb} float and integer register {dest.base}")
+                value = int(value)
+            if zero_error and value == 0:
+                self.error(zero_error)
+            self.set_register(dest.base, INT_OPERATIONS[operation](self.i[dest.base], value))
+            return
+        func = FLOAT_OPERATIONS[operation]
+        if dest.kind == "float":
+            if zero_error and value == 0:
+                self.error(zero_error)
+            self.set_register(dest.base, func(self.f[dest.base], float(value)))
+        elif dest.kind == "vector" and isinstance(value, list):
+            vec = self.v[dest.base]
+            if len(vec) != len(value):
+                self.error("Vector size mismatch: " + str(len(vec)) + " != " + str(len(value)))
+            if zero_error and 0 in value:
+                self.error(zero_error)
+            self.set_register(dest.base, [func(x, y) for x, y in zip(vec, value)])
+        elif dest.kind == "vector":
+            if zero_error and value == 0:
+                self.error(zero_error)
+            value = float(value)
+            self.set_register(dest.base, [func(x, value) for x in self.v[dest.base]])
+        else:
+            if zero_error and value == 0:
+                self.error(zero_error)
+            vec = self.v[dest.base]
+            index = self.operand_index(dest)
+            if index < 0 or index >= len(vec):
+                self.error("Index out of range for register " + dest.base)
+            vec[index] = func(vec[index], float(value))
+            self.set_register(dest.base, vec)
+
+    def parse_operand(self, operand):
+        if '[' in operand and operand.endswith(']'):
+            try:
+                base = operand[:operand.index('[')]
+                index_str = operand[operand.index('[') + 1: -1]
+                if index_str in REGISTERS:
+                    if index_str.startswith("V") or index_str.startswith("FF"):
+                        self.error("Um what are you even trying to do?")
+                    else:
+                        index = self.register(index_str)
+                elif index_str in self.variables:
+                    head, buffer, var_type = self.variables[base]
+                    if var_type == "vector" or var_type == "float":
+                        self.error("Um what are you even trying to do?")
+                    else:
+                        index = self.memory[head]
+                else:
+                    index = int(index_str)
+                return base, index
+            except Exception:
+                return operand, None
+        return operand, None
+
+    def store(self, reg, address):
+        address = int(address)
+        base, idx = self.parse_operand(reg)
+        if base in REGISTERS:
+            value = self.register(base)
+            if base.startswith("V"):
+                if idx is None:
+                    self.memory[address] = len(value)
+                    for i, v in enumerate(value):
+                        self.memory[address + 1 + i] = v
+                else:
+                    if idx < 0 or idx >= len(value):
+                        self.error("STORE operation error: index " + str(idx) + " out of range for register " + base +
+                                   ".")
+                        return
+                    self.memory[address] = value[idx]
+            else:
+                if idx is not None:
+                    self.error("STORE operation error: scalar register " + base + " cannot be indexed.")
+                    return
+                self.memory[address] = value
+        else:
+            self.error("STORE operation error: invalid register " + reg + ".")
+
+    def load(self, reg, address):
+        address = int(address)
+        base, idx = self.parse_operand(reg)
+        if base in REGISTERS:
+            if base.startswith("V"):
+                if idx is None:
+                    length = self.memory[address]
+                    if not isinstance(length, int):
+                        self.error("LOAD_MEM operation error: invalid vector length at memory address " +
+                                   str(address) + ".")
+                        return
+                    self.set_register(base, [self.memory[address + 1 + i] for i in range(length)])
+                else:
+                    value = self.memory[address]
+                    vec = self.register(base)
+                    if idx < 0 or idx >= len(vec):
+                        self.error("LOAD_MEM operation error: index " + str(idx) + " out of range for register " +
+                                   base + ".")
+                        return
+                    vec[idx] = value
+                    self.set_register(base, vec)
+            else:
+                if idx is not None:
+                    self.error("LOAD_MEM operation error: scalar register " + base + " cannot be indexed.")
+                    return
+                self.set_register(base, self.memory[address])
+        else:
+            self.error("LOAD_MEM operation error: invalid register " + reg + ".")
+
+    def read_string(self, head, size):
+        cells = self.memory[head:head + size]
+        cached = self.texts.get(head)
+        if cached is not None and cached[0] == cells:
+            return cached[1]
+        text = "".join(map(chr, cells))
+        self.texts[head] = (cells, text)
+        return text
+
+    def print(self, key, end=""):
+        base, index = self.parse_operand(key)
+        if base in REGISTERS:
+            if base.startswith("V") and index is not None:
+                vec = self.register(base)
+                if index < 0 or index >= len(vec):
+                    self.error("Index " + str(index) + " out of range for register " + base)
+                    return
+                print(vec[index], end=end)
+            else:
+                print(self.register(base), end=end)
+            return
+        if base not in self.variables:
+            print(key, end=end)
+            return
+        try:
+            head, buffer, var_type = self.variables[base]
+            if var_type == "string":
+                if index is not None:
+                    if index < 0 or index >= buffer:
+                        self.error("Index " + str(index) + " out of range for variable " + base)
+                        return
+                    print(chr(self.memory[head + index]), end=end)
+                else:
+                    print(self.read_string(head, buffer), end=end)
+            elif var_type == "vector":
+                if index is not None:
+                    if index < 0 or index >= buffer:
+                        self.error("Index " + str(index) + " out of range for vector variable " + base)
+                        return
+                    print(self.memory[head + index], end=end)
+                else:
+                    values = [str(self.memory[head + i]) for i in range(buffer)]
+                    print(f"[{' '.join(values)}]", end=end)
+            else:
+                if index is not None:
+                    self.error("Scalar variable " + base + " cannot be indexed")
+                else:
+                    print(self.memory[head], end=end)
+        except:
+            print(key, end=end)
+
+    def text(self, reg):
+        print(chr(int(self.register(reg))))
+
+    def input(self, key, text=""):
+        value = input(text)
+        if key in REGISTERS:
+            if is_number(value):
+                numeric_value = float(value)
+                if key.startswith("I"):
+                    if numeric_value.is_integer():
+                        self.set_register(key, int(numeric_value))
+                    else:
+                        self.error(f"Cannot move float literal to integer register {key}")
+                elif key.startswith("FF"):
+                    self.set_register(key, numeric_value)
+            else:
+                self.error("Invalid type for INPUT operation. Got string when expecting number")
+        else:
+            if is_number(value):
+                numeric_value = float(value)
+                value = str(int(numeric_value)) if numeric_value.is_integer() else str(numeric_value)
+            elif not value.isnumeric():
+                value = '"' + value + '"'
+            self.set_var(key, value)
+
+    def set_var(self, name, data, buffer=None):
+        memory_head = self.memory_index
+        try:
+            if is_number(data):
+                numeric_value = float(data)
+                if numeric_value.is_integer():
+                    values = [int(numeric_value)]
+                    var_type = "int"
+                else:
+                    values = [numeric_value]
+                    var_type = "float"
+            elif data.isnumeric():
+                values = [int(data)]
+                var_type = "int"
+            elif data.startswith("[") and data.endswith("]"):
+                tokens = data[1:-1].replace(",", " ").split()
+                if not (1 <= len(tokens) <= 32):
+                    self.error(f"Vector length must be between 1 and 32, got {len(tokens)}")
+                values = []
+                for token in tokens:
+                    if token in REGISTERS:
+                        values.append(float(self.register(token)))
+                    elif token in self.variables:
+                        values.append(float(self.memory[self.variables[token][0]]))
+                    else:
+                        try:
+                            values.append(float(token))
+                        except:
+                            self.error(f"Invalid vector element: {token}")
+                var_type = "vector"
+            else:
+                values = [ord(char) for char in data.replace('"', "")]
+                var_type = "string"
+            memory_buffer = len(values) if buffer is None else int(buffer)
+            if len(values) > memory_buffer:
+                self.error(f"Memory buffer overflow by {len(values) - memory_buffer} bytes")
+            for i, value in enumerate(values):
+                self.memory[memory_head + i] = value
+            self.variables[name] = [memory_head, len(values), var_type]
+            self.memory_index += len(values)
+        except Exception as e:
+            self.error(str(e))
+
+    def push(self, key):
+        base, index = self.parse_operand(key)
+        if base in REGISTERS:
+            if base.startswith("V"):
+                if index is None:
+                    vec = self.register(base)
+                    self.push_values(vec + [len(vec)])
+                    return
+                vec = self.register(base)
+                if index < 0 or index >= len(vec):
+                    self.error("Index " + str(index) + " out of range for register " + base + ".")
+                    return
+                value = vec[index]
+            else:
+                if index is not None:
+                    self.error("Register " + base + " is scalar and cannot be indexed.")
+                    return
+                value = self.register(base)
+        elif base in self.variables:
+            head, buffer, var_type = self.variables[base]
+            if var_type == "vector":
+                if index is None:
+                    self.error("Cannot push entire vector variable " + base + " to stack; specify an index.")
+                    return
+                if index < 0 or index >= buffer:
+                    self.error("Index " + str(index) + " out of range for variable " + base + ".")
+                    return
+                value = self.memory[head + index]
+            else:
+                if index is not None:
+                    self.error("Variable " + base + " is scalar and cannot be indexed.")
+                    return
+                value = self.memory[head]
+        else:
+            self.error("Invalid key for PUSH operation: " + key)
+            return
+        if self.stack_index >= len(self.stack):
+            self.error("Stack overflow: no room to push " + key + ".")
+            return
+        self.stack[self.stack_index] = value
+        self.stack_index += 1
+
+    def pop(self, key):
+        if self.stack_index <= 0:
+            self.error("Stack underflow: no values to pop.")
+            return
+        self.stack_index -= 1
+        value = self.stack[self.stack_index]
+        base, index = self.parse_operand(key)
+        if base in REGISTERS:
+            if base.startswith("V"):
+                if index is None:
+                    self.set_register(base, self.pop_vector(value, base))
+                    return
+                vec = self.register(base)
+                if index < 0 or index >= len(vec):
+                    self.error("Index " + str(index) + " out of range for register " + base + ".")
+                    return
+                vec[index] = value
+                self.set_register(base, vec)
+            else:
+                if index is not None:
+                    self.error("Register " + base + " is scalar and cannot be indexed.")
+                    return
+                self.set_register(base, value)
+        elif base in self.variables:
+            head, buffer, var_type = self.variables[base]
+            if var_type == "vector":
+                if index is None:
+                    self.error("Cannot pop to an entire vector variable " + base + "; specify an index.")
+                    return
+                if index < 0 or index >= buffer:
+                    self.error("Index " + str(index) + " out of range for variable " + base + ".")
+                    return
+                self.memory[head + index] = value
+            else:
+                if index is not None:
+                    self.error("Variable " + base + " is scalar and cannot be indexed.")
+                    return
+                self.memory[head] = value
+            self.variables[base] = [head, buffer, "int" if float(value).is_integer() else "float"]
+        else:
+            self.error("Invalid key for POP operation: " + key)
+
+
+    def push_values(self, values):
+        top = self.stack_index + len(values)
+        if top > len(self.stack):
+            self.error(f"Stack overflow: no room to push {len(values)} values.")
+            return
+        self.stack[self.stack_index:top] = values
+        self.stack_index = top
+
+    def pop_vector(self, length, register):
+        if not isinstance(length, int) or not 1 <= length <= 32 or length > self.stack_index:
+            self.error("Top of the stack is not a whole vector, cannot pop it to " + register + ".")
+            return
+        self.stack_index -= length
+        return self.stack[self.stack_index:self.stack_index + length]
+
+    def class_registers(self, classes):
+        for name in classes:
+            if name not in REGISTER_CLASSES:
+                self.error(f"Unknown register class {name}, expected I, FF or V")
+        return [register for name in classes or REGISTER_CLASSES for register in REGISTER_CLASSES[name]]
+
+    def push_all(self, *classes):
+        values = []
+        for register in self.class_registers(classes):
+            value = self.register(register)
+            if register in self.v:
+                values.extend(value)
+                values.append(len(value))
+            else:
+                values.append(value)
+        self.push_values(values)
+
+    def pop_all(self, *classes):
+        top = self.stack_index
+        restored = []
+        for register in reversed(self.class_registers(classes)):
+            if register in self.v:
+                length = self.stack[top - 1] if top else None
+                if not isinstance(length, int) or not 1 <= length <= 32 or length >= top:
+                    self.error("Top of the stack is not a whole vector, cannot pop it to " + register + ".")
+                    return
+                top -= length + 1
+                restored.append((register, self.stack[top:top + length]))
+            else:
+                if not top:
+                    self.error("Stack underflow: no value to pop to " + register + ".")
+                    return
+                top -= 1
+                restored.append((register, self.stack[top]))
+        self.stack_index = top
+        for register, value in restored:
+            self.set_register(register, value)
+    def read_value(self, key):
+        base, index = self.parse_operand(key)
+        if base in REGISTERS:
+            value = self.register(base)
+            if index is None:
+                return value
+            if not base.startswith("V"):
+                self.error(f"Cannot index non-vector register {base}")
+            if index < 0 or index >= len(value):
+                self.error(f"Index {index} out of range for register {base}")
+            return value[index]
+        if base in self.variables:
+            head, buffer, var_type = self.variables[base]
+            if index is None:
+                if var_type == "vector":
+                    return [self.memory[head + i] for i in range(buffer)]
+                if var_type == "string":
+                    self.error(f"Cannot use string variable {base} as a number")
+                return self.memory[head]
+            if var_type != "vector":
+                self.error(f"Cannot index non-vector variable {base}")
+            if index < 0 or index >= buffer:
+                self.error(f"Index {index} out of range for variable {base}")
+            return self.memory[head + index]
+        if key.startswith("[") and key.endswith("]"):
+            try:
+                return [float(x) for x in key[1:-1].replace(",", " ").split()]
+            except ValueError:
+                self.error(f"Invalid vector literal: {key}")
+        try:
+            return float(key)
+        except ValueError:
+            self.error(f"Invalid operand: {key}")
+
+    def vector(self, reg, operation):
+        if reg not in self.v:
+            self.error(f"{operation} can only be performed on vector registers, got {reg}")
+        return self.v[reg]
+
+    def store_scalar(self, reg, result):
+        if reg in self.i:
+            result = round(result)
+        elif reg in self.v:
+            self.error(f"Cannot store scalar result in vector register {reg}")
+        elif reg not in self.f:
+            self.error(f"Invalid register type: {reg}")
+        self.set_register(reg, result)
+
+    def dot(self, dest, reg1, reg2):
+        v_reg1 = self.vector(reg1, "Dot product")
+        v_reg2 = self.vector(reg2, "Dot product")
+        if len(v_reg1) != len(v_reg2):
+            self.error("Vector registers must have the same length for dot product")
+        self.store_scalar(dest, sum(x * y for x, y in zip(v_reg1, v_reg2)))
+
+    def mag(self, dest, reg):
+        self.store_scalar(dest, math.sqrt(sum(x * x for x in self.vector(reg, "Magnitude"))))
+
+    def norm(self, dest, reg=None):
+        v_reg = self.vector(dest if reg is None else reg, "Normalization")
+        if dest not in self.v:
+            self.error(f"Normalization result must be stored in a vector register, got {dest}")
+        mag = math.sqrt(sum(x * x for x in v_reg))
+        if mag == 0:
+            self.error("Cannot normalize a zero vector.")
+        self.set_register(dest, [x / mag for x in v_reg])
+
+    def hsum(self, dest, reg):
+        self.store_scalar(dest, sum(self.vector(reg, "Horizontal sum")))
+
+    def hmin(self, dest, reg):
+        self.store_scalar(dest, min(self.vector(reg, "Horizontal min")))
+
+    def hmax(self, dest, reg):
+        self.store_scalar(dest, max(self.vector(reg, "Horizontal max")))
+
+    def fma(self, dest, key1, key2):
+        if dest not in REGISTERS:
+            self.error(f"Invalid register for FMA operation: {dest}")
+        op1, op2 = self.read_value(key1), self.read_value(key2)
+        if dest in self.v:
+            acc = self.v[dest]
+            a = op1 if isinstance(op1, list) else [op1] * len(acc)
+            b = op2 if isinstance(op2, list) else [op2] * len(acc)
+            if not (len(acc) == len(a) == len(b)):
+                self.error("Vector registers must have the same length for fused multiply-add")
+            self.set_register(dest, [x + y * z for x, y, z in zip(acc, a, b)])
+        else:
+            if isinstance(op1, list) or isinstance(op2, list):
+                self.error(f"Cannot fuse vector operands into scalar register {dest}")
+            self.store_scalar(dest, self.register(dest) + op1 * op2)
+
+    def bcast(self, dest, key, length=None):
+        value = self.read_value(key)
+        if isinstance(value, list):
+            self.error(f"Cannot broadcast vector {key}; expected a scalar")
+        length = len(self.register(dest) or []) if length is None else int(self.read_value(length))
+        if dest not in self.v:
+            self.error(f"Broadcast can only target vector registers, got {dest}")
+        if not (1 <= length <= 32):
+            self.error(f"Vector length must be between 1 and 32, got {length}")
+        self.set_register(dest, [float(value)] * length)
+
+    def shuf(self, dest, reg, key):
+        indices = self.read_value(key)
+        if not isinstance(indices, list):
+            self.error(f"SHUF expects a vector of indices, got {key}")
+        v_reg = self.vector(reg, "Shuffle")
+        if dest not in self.v:
+            self.error(f"Shuffle result must be stored in a vector register, got {dest}")
+        if not (1 <= len(indices) <= 32):
+            self.error(f"Vector length must be between 1 and 32, got {len(indices)}")
+        result = []
+        for index in indices:
+            if not float(index).is_integer() or index < 0 or index >= len(v_reg):
+                self.error(f"Shuffle index {index} out of range for register {reg}")
+            result.append(v_reg[int(index)])
+        self.set_register(dest, result)
+
+    def intrinsic(self, name):
+        if name == "SORT":
+            count, vec = self.i["I1"], self.v["V1"]
+            if count < 0 or count > len(vec):
+                self.error(f"SORT count {count} out of range for register V1")
+            vec[:count] = sorted(vec[:count])
+            self.set_register("V1", vec)
+        elif name == "ISQRT":
+            if self.i["I1"] < 0:
+                self.error(f"Cannot take the integer square root of {self.i['I1']}")
+            self.set_register("I1", math.isqrt(self.i["I1"]))
+        elif name == "SQRT":
+            if self.f["FF1"] < 0:
+                self.error(f"Cannot take the square root of {self.f['FF1']}")
+            self.set_register("FF1", math.sqrt(self.f["FF1"]))
+        elif name == "FACT":
+            value = self.i["I1"]
+            if value < 0:
+                self.error(f"Cannot take the factorial of {value}")
+            if value >= FACT_WRAPS_TO_ZERO:
+                result = 0
+            else:
+                result = 1
+                for i in range(2, value + 1):
+                    result = (result * i) % 2 ** 32
+            self.set_register("I1", result)
+        elif name == "ABS":
+            self.set_register("FF1", abs(self.f["FF1"]))
@@ -0,0 +1,174 @@
+import operator
+from functools import partial
+
+from CPU.operand_resolver import ARITHMETIC_VERBS
+
+INT_OPERATIONS = {"ADD": operator.add, "SUB": operator.sub, "MUL": operator.mul, "DIV": operator.floordiv,
+                  "MOD": operator.mod}
+FLOAT_OPERATIONS = {"ADD": operator.add, "SUB": operator.sub, "MUL": operator.mul, "DIV": operator.truediv,
+                    "MOD": operator.mod}
+ZERO_ERRORS = {"DIV": "Division by zero", "MOD": "Modulo by zero"}
+KERNELS = {}
+
+
+def value_kind(value):
+    if isinstance(value, list):
+        return "vector"
+    return "int" if isinstance(value, int) else "float"
+
+
+def int_kernel(operation):
+    func = INT_OPERATIONS[operation]
+    zero_error = ZERO_ERRORS.get(operation)
+
+    def kernel(compiler, dest, value):
+        if zero_error and value == 0:
+            compiler.report_error(zero_error)
+        cpu = compiler.CPU
+        cpu.update_register(dest.base, func(cpu.int_registers[dest.base], value))
+    return kernel
+
+
+def int_float_kernel(operation):
+    int_op = int_kernel(operation)
+
+    def kernel(compiler, dest, value):
+        if not float(value).is_integer():
+            compiler.report_error(f"Cannot {ARITHMETIC_VERBS[operation]} float and integer register {dest.base}")
+        int_op(compiler, dest, int(value))
+    return kernel
+
+
+def float_kernel(operation):
+    func = FLOAT_OPERATIONS[operation]
+    zero_error = ZERO_ERRORS.get(operation)
+
+    def kernel(compiler, dest, value):
+        if zero_error and value == 0:
+            compiler.report_error(zero_error)
+        cpu = compiler.CPU
+        cpu.update_register(dest.base, func(cpu.ff_registers[dest.base], float(value)))
+    return kernel
+
+
+def vector_vector_kernel(operation):
+    func = FLOAT_OPERATIONS[operation]
+    zero_error = ZERO_ERRORS.get(operation)
+
+    def kernel(compiler, dest, value):
+        vec = compiler.CPU.vector_registers[dest.base]
+        if len(vec) != len(value):
+            compiler.report_error("Vector size mismatch: " + str(len(vec)) + " != " + str(len(value)))
+        if zero_error and 0 in value:
+            compiler.report_error(zero_error)
+        compiler.CPU.update_register(dest.base, [func(x, y) for x, y in zip(vec, value)])
+    return kernel
+
+
+def vector_scalar_kernel(operation):
+    func = FLOAT_OPERATIONS[operation]
+    zero_error = ZERO_ERRORS.get(operation)
+
+    def kernel(compiler, dest, value):
+        if zero_error and value == 0:
+            compiler.report_error(zero_error)
+        value = float(value)
+        compiler.CPU.update_register(dest.base, [func(x, value) for x in compiler.CPU.vector_registers[dest.base]])
+    return kernel
+
+
+def element_scalar_kernel(operation):
+    func = FLOAT_OPERATIONS[operation]
+    zero_error = ZERO_ERRORS.get(operation)
+
+    def kernel(compiler, dest, value):
+        if zero_error and value == 0:
+            compiler.report_error(zero_error)
+        vec = compiler.CPU.vector_registers[dest.base]
+        index = compiler.operand_index(dest)
+        if index < 0 or index >= len(vec):
+            compiler.report_error("Index out of range for register " + dest.base)
+        vec[index] = func(vec[index], float(value))
+        compiler.CPU.update_register(dest.base, vec)
+    return kernel
+
+
+def mismatch_kernel(operation, dest_kind):
+    def kernel(compiler, dest, value):
+        compiler.report_error(f"Cannot {ARITHMETIC_VERBS[operation]} vector and {dest_kind} register {dest.base}")
+    return kernel
+
+
+for _operation in INT_OPERATIONS:
+    KERNELS[(_operation, "int", "int")] = int_kernel(_operation)
+    KERNELS[(_operation, "int", "float")] = int_float_kernel(_operation)
+    KERNELS[(_operation, "float", "int")] = KERNELS[(_operation, "float", "float")] = float_kernel(_operation)
+    KERNELS[(_operation, "vector", "vector")] = vector_vector_kernel(_operation)
+    KERNELS[(_operation, "vector", "int")] = KERNELS[(_operation, "vector", "float")] = vector_scalar_kernel(
+        _operation)
+    KERNELS[(_operation, "element", "int")] = KERNELS[(_operation, "element", "float")] = element_scalar_kernel(
+        _operation)
+    for _dest_kind in ("int", "float", "element"):
+        KERNELS[(_operation, _dest_kind, "vector")] = mismatch_kernel(_operation, _dest_kind)
+
+
+def literal_int(compiler, src):
+    return int(src.value)
+
+
+def literal_float(compiler, src):
+    return src.value
+
+
+def vector_literal(compiler, src):
+    return [token.value for token in src.value]
+
+
+def int_register(compiler, src):
+    return compiler.CPU.int_registers[src.base]
+
+
+def float_register(compiler, src):
+    return compiler.CPU.ff_registers[src.base]
+
+
+def vector_register(compiler, src):
+    return compiler.CPU.vector_registers[src.base]
+
+
+def element_value(compiler, src):
+    return compiler.operand_value(src)
+
+
+FETCHERS = {"int": int_register, "float": float_register, "vector": vector_register, "vector_literal": vector_literal,
+            "element": element_value}
+FETCHED_KINDS = {literal_int: "int", literal_float: "float", int_register: "int", float_register: "float",
+                 vector_register: "vector", vector_literal: "vector", element_value: "float"}
+
+
+def source_fetcher(src):
+    if src.kind == "literal":
+        return literal_int if src.value.is_integer() else literal_float
+    return FETCHERS.get(src.kind)
+
+
+def arithmetic_handler(kernel, fetch):
+    def handler(compiler, dest, src):
+        kernel(compiler, dest, fetch(compiler, src))
+    return handler
+
+
+HANDLERS = {(_operation, _dest_kind, _fetch): arithmetic_handler(KERNELS[(_operation, _dest_kind, _kind)], _fetch)
+            for (_operation, _dest_kind, _kind) in KERNELS
+            for _fetch, _fetched in FETCHED_KINDS.items() if _fetched == _kind}
+
+
+def bind_arithmetic(compiler, operation, dest, src):
+    fetch = source_fetcher(src)
+    if fetch is None:
+        return compiler.instruction_set[operation]
+    key = (operation, dest.kind, fetch)
+    handler = compiler.arithmetic_handlers.get(key)
+    if handler is None:
+        handler = compiler.arithmetic_handlers[key] = partial(HANDLERS[key], compiler)
+    return handler
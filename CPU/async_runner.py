@@ -0,0 +1,66 @@
+import asyncio
+import os
+
+from CPU.scheduler import BLOCKED, FINISHED, Machine
+
+BACKLOG = 4096
+
+
+def stream_source(reader):
+    async def read_line():
+        line = await reader.readline()
+        if not line:
+            raise EOFError
+        return line.decode().rstrip("\r\n")
+    return read_line
+
+
+class AsyncSession:
+    def __init__(self, file_path, source, writer, slice_size=1000, **options):
+        self.machine = Machine(file_path, **options)
+        self.compiler = self.machine.compiler
+        self.source = source
+        self.writer = writer
+        self.slice_size = max(slice_size, 1)
+
+    async def flush(self):
+        text = self.machine.read_output()
+        if text:
+            self.writer.write(text.encode())
+            await self.writer.drain()
+
+    async def run(self):
+        machine = self.machine
+        try:
+            while machine.state != FINISHED:
+                machine.run(self.slice_size)
+                await self.flush()
+                if machine.state == BLOCKED:
+                    try:
+                        machine.give_input(await self.source())
+                    except EOFError:
+                        machine.fail("INPUT reached the end of the input stream")
+                else:
+                    await asyncio.sleep(0)
+        finally:
+            await self.flush()
+        return machine.exit_code
+
+
+async def serve(file_path, address, slice_size=1000, **options):
+    async def session(reader, writer):
+        try:
+            await AsyncSession(file_path, stream_source(reader), writer, slice_size, **options).run()
+        except (ConnectionError, SystemExit):
+            pass
+        finally:
+            writer.close()
+
+    if address.isdigit():
+        server = await asyncio.start_server(session, "127.0.0.1", int(address), backlog=BACKLOG)
+    else:
+        if os.path.exists(address):
+            os.unlink(address)
+        server = await asyncio.start_unix_server(session, address, backlog=BACKLOG)
+    async with server:
+        await server.serve_forever()
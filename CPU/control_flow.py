@@ -0,0 +1,40 @@
+JUMP_OPERATORS = ("JZ", "JNZ", "JG", "JGE", "JL", "JLE", "JMP")
+CORE_OPERATORS = ("SPAWN", "JOIN", "BARRIER")
+TERMINATORS = JUMP_OPERATORS + CORE_OPERATORS + ("CALL", "HALT", "DEF", "RETURN")
+
+
+def uses_cores(program):
+    return any(entry is not None and entry[0] in CORE_OPERATORS for entry in program)
+
+
+def jump_target(compiler, pos):
+    if pos.isnumeric():
+        return int(pos) - 1
+    if pos in compiler.labels:
+        return compiler.labels[pos] + 1
+    return None
+
+
+def block_leaders(compiler):
+    program = compiler.program
+    leaders = {0}
+    for label_index in compiler.labels.values():
+        leaders.add(label_index + 1)
+    for start, end in compiler.functions.values():
+        leaders.add(start + 1)
+        leaders.add(end + 1)
+    for i, entry in enumerate(program):
+        if entry is None or entry[0] not in TERMINATORS:
+            continue
+        leaders.add(i + 1)
+        if entry[0] in JUMP_OPERATORS:
+            target = jump_target(compiler, entry[2][-1])
+            if target is not None:
+                leaders.add(target)
+    return sorted(i for i in leaders if 0 <= i < len(program))
+
+
+def basic_blocks(compiler):
+    leaders = block_leaders(compiler)
+    ends = leaders[1:] + [len(compiler.program)]
+    return list(zip(leaders, ends))
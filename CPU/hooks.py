@@ -0,0 +1,152 @@
+from CPU.control_flow import JUMP_OPERATORS
+
+EVENTS = ("instruction", "register", "memory", "read", "overflow", "allocate", "call", "return", "jump")
+PROGRAM_EVENTS = ("instruction", "call", "return", "jump")
+CALL_OPERATORS = ("CALL", "INLINE", "MEMO")
+METHODS = {"register": (("CPU", "update_register"), ("CPU", "release_register")), "memory": (("CPU", "update_memory"),),
+           "read": (("CPU", "return_memory"), ("strings", "text")), "overflow": (("CPU", "_update_overflow"),),
+           "allocate": ((None, "allocate"),)}
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+
+def called_name(entry):
+    return entry[2][0] if entry[0] == "CALL" else entry[2][0].name
+
+
+class Hooks:
+    def __init__(self, compiler):
+        self.compiler = compiler
+        self.subscribers = {event: [] for event in EVENTS}
+        self.installed = set()
+        self.saved = {}
+        self.original = None
+
+    def on(self, event, function):
+        if event not in self.subscribers:
+            raise ValueError(f"Unknown event '{event}', expected one of {', '.join(EVENTS)}")
+        self.subscribers[event].append(function)
+        if event not in self.installed:
+            self.installed.add(event)
+            self.install(event)
+        return function
+
+    def off(self, event, function):
+        self.subscribers[event].remove(function)
+        if not self.subscribers[event]:
+            self.installed.discard(event)
+            self.install(event)
+
+    def install(self, event):
+        if event in METHODS:
+            for target, name in METHODS[event]:
+                self.wrap_method(target, name, event)
+        else:
+            self.instrument()
+
+    def wrap_method(self, target, name, event):
+        owner = self.compiler if target is None else getattr(self.compiler, target)
+        if event not in self.installed:
+            saved = self.saved.pop((target, name))
+            if saved is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, saved)
+            return
+        self.saved[(target, name)] = owner.__dict__.get(name)
+        method = getattr(owner, name)
+        subscribers = self.subscribers[event]
+        cpu = self.compiler.CPU
+        if name == "release_register":
+            def hooked(register):
+                method(register)
+                value = cpu.return_register(register)
+                for function in subscribers:
+                    function(register, value)
+        elif name == "return_memory":
+            def hooked(address):
+                value = method(address)
+                for function in subscribers:
+                    function(address, value)
+                return value
+        elif name == "text":
+            def hooked(head, size):
+                text = method(head, size)
+                for address in range(head, head + size):
+                    for function in subscribers:
+                        function(address, cpu.memory[address])
+                return text
+        elif name == "_update_overflow":
+            registers = cpu.int_registers
+
+            def hooked():
+                for register, value in registers.items():
+                    if not INT_MIN <= value <= INT_MAX:
+                        for function in subscribers:
+                            function(register, value)
+                method()
+        elif name == "allocate":
+            def hooked(size):
+                head = method(size)
+                for function in subscribers:
+                    function(head, size)
+                return head
+        else:
+            def hooked(key, value, *rest):
+                method(key, value, *rest)
+                value = cpu.return_register(key) if event == "register" else cpu.memory[key]
+                for function in subscribers:
+                    function(key, value)
+        setattr(owner, name, hooked)
+
+    def instrument(self):
+        compiler = self.compiler
+        if self.original is None:
+            compiler.refresh()
+            self.original = compiler.program
+        events = self.installed.intersection(PROGRAM_EVENTS)
+        if events:
+            compiler.program = [self.hooked(i, entry, events) for i, entry in enumerate(self.original)]
+        else:
+            compiler.program, self.original = self.original, None
+
+    def hooked(self, index, entry, events):
+        if entry is None:
+            return None
+        operator, handler, args = entry
+        compiler = self.compiler
+        steps = self.subscribers["instruction"] if "instruction" in events else ()
+        calls = returns = jumps = ()
+        name = None
+        if operator in CALL_OPERATORS:
+            name = called_name(entry)
+            calls = self.subscribers["call"] if "call" in events else ()
+            returns = self.subscribers["return"] if "return" in events else ()
+        elif operator in JUMP_OPERATORS and "jump" in events:
+            jumps = self.subscribers["jump"]
+        if not (steps or calls or returns or jumps):
+            return entry
+
+        def hooked(*args):
+            for function in steps:
+                function(index)
+            for function in calls:
+                function(name, index)
+            handler(*args)
+            for function in returns:
+                function(name, index)
+            if jumps:
+                target = compiler.instruction_index + 1
+                for function in jumps:
+                    function(index, target, target != index + 1)
+        return operator, hooked, args
+
+    def enter(self, index, name):
+        for function in self.subscribers["instruction"]:
+            function(index)
+        for function in self.subscribers["call"]:
+            function(name, index)
+
+    def leave(self, index, name):
+        for function in self.subscribers["return"]:
+            function(name, index)
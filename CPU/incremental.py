@@ -0,0 +1,235 @@
+from bisect import bisect_left
+from collections import Counter
+from io import StringIO
+from math import isqrt
+from operator import attrgetter, itemgetter
+
+from CPU.control_flow import JUMP_OPERATORS
+from CPU.lexer import LineBase, lex, settles
+from CPU.linker import import_name, relocate
+from CPU.operand_resolver import declared_variable
+
+LINE = attrgetter("line")
+SITE = itemgetter(0)
+
+
+def label_target(entry):
+    if entry is not None and entry[0] in JUMP_OPERATORS and not entry[2][-1].isnumeric():
+        return entry[2][-1]
+    return None
+
+
+class IncrementalAssembler:
+    def __init__(self, compiler):
+        self.compiler = compiler
+        with open(compiler.file_path, 'r') as file:
+            self.lines = file.readlines()
+        if compiler.optimize_level:
+            compiler.assemble()
+        self.program = compiler.program
+        self.declared = Counter()
+        self.declare(compiler.asm, 1)
+        self.label_counts = Counter(name for i, name in compiler.label_sites)
+        self.jumps = {}
+        self.unresolved = {}
+        for location, entry in zip(compiler.locations, self.program):
+            self.add_jump(location, entry)
+        self.bases = []
+        self.rebase()
+        self.optimize()
+
+    def declare(self, asm, step):
+        changed = set()
+        for line in asm:
+            name = declared_variable(line)
+            if name is not None:
+                self.declared[name] += step
+                if self.declared[name] in (0, step):
+                    changed.add(name)
+                if not self.declared[name]:
+                    del self.declared[name]
+        return changed
+
+    def add_jump(self, location, entry):
+        label = label_target(entry)
+        if label is None:
+            return
+        self.jumps.setdefault(label, {})[id(location)] = location
+        if label not in self.compiler.labels:
+            self.unresolved[id(location)] = location, label
+
+    def remove_jump(self, location, entry):
+        label = label_target(entry)
+        if label is None:
+            return
+        self.jumps[label].pop(id(location), None)
+        self.unresolved.pop(id(location), None)
+
+    def revalidate(self, label):
+        for key, location in self.jumps.get(label, {}).items():
+            if label in self.compiler.labels:
+                self.unresolved.pop(key, None)
+            else:
+                self.unresolved[key] = location, label
+
+    def errors(self):
+        found = sorted(self.unresolved.values(), key=lambda item: (item[0].line, item[0].column))
+        return [f"{location}: Jump target '{label}' is not defined" for location, label in found]
+
+    def optimize(self):
+        compiler = self.compiler
+        if compiler.optimize_level:
+            compiler.program = self.program
+            compiler.stale = True
+
+    def rebase(self):
+        locations = self.compiler.locations
+        first = self.compiler.base
+        self.block = max(isqrt(len(locations) - first), 16)
+        self.bases = []
+        for i in range(first, len(locations), self.block):
+            base = LineBase()
+            self.bases.append(base)
+            for location in locations[i:i + self.block]:
+                location.relative = location.line
+                location.base = base
+
+    def split(self, index):
+        locations = self.compiler.locations
+        if index >= len(locations):
+            return len(self.bases)
+        base = locations[index].base
+        position = self.bases.index(base)
+        if index > self.compiler.base and locations[index - 1].base is base:
+            tail = LineBase(base.first)
+            end = index
+            while end < len(locations) and locations[end].base is base:
+                locations[end].base = tail
+                end += 1
+            position += 1
+            self.bases.insert(position, tail)
+        return position
+
+    def index_at(self, line):
+        return bisect_left(self.compiler.locations, line, lo=self.compiler.base, key=LINE)
+
+    def splice(self, sites, lo, hi, delta, window):
+        a = bisect_left(sites, lo, key=SITE)
+        b = bisect_left(sites, hi, key=SITE)
+        removed = sites[a:b]
+        if delta:
+            sites[b:] = [(i + delta, name) for i, name in sites[b:]]
+        sites[a:b] = [(i + lo, name) for i, name in window]
+        return removed
+
+    def relabel(self, lo, hi, delta, label_sites):
+        compiler = self.compiler
+        labels = compiler.labels
+        removed = self.splice(compiler.label_sites, lo, hi, delta, label_sites)
+        if delta:
+            for name, index in labels.items():
+                if index >= hi - 1:
+                    labels[name] = index + delta
+        self.label_counts.subtract(name for i, name in removed)
+        self.label_counts.update(name for i, name in label_sites)
+        changed = []
+        for name in {name for i, name in removed} | {name for i, name in label_sites}:
+            inside = [lo + i - 1 for i, site in label_sites if site == name]
+            count = self.label_counts[name]
+            existed = name in labels
+            if not count:
+                del self.label_counts[name]
+                labels.pop(name, None)
+            elif count == len(inside):
+                labels[name] = inside[-1]
+            else:
+                labels[name] = max(i for i, site in compiler.label_sites if site == name) - 1
+            if existed != (name in labels):
+                changed.append(name)
+        return changed
+
+    def window(self, first, last, new):
+        old = self.lines
+        start, end = first, last
+        while True:
+            while start > 1 and not settles(old[start - 2]):
+                start -= 1
+            lines = old[start - 1:first - 1] + new + old[last:end]
+            final = end >= len(old)
+            if final and not lines and start > 1:
+                start -= 1
+            elif final or (end < start or settles(old[end - 1])) and (not lines or settles(lines[-1])):
+                return start, end, lines, final
+            else:
+                end += 1
+
+    def replace(self, first, last, text):
+        compiler = self.compiler
+        if not 1 <= first <= last + 1 <= len(self.lines) + 1:
+            raise ValueError(f"Invalid line range {first}-{last}")
+        new = StringIO(text, newline=None).readlines()
+        if new and first > len(self.lines) > 0 and not self.lines[-1].endswith("\n"):
+            first -= 1
+            new.insert(0, self.lines[-1] + "\n")
+        if new and not new[-1].endswith("\n") and last < len(self.lines):
+            new[-1] += "\n"
+        start, end, lines, final = self.window(first, last, new)
+        lo = self.index_at(start)
+        hi = self.index_at(end + 1)
+        if final:
+            lo, hi = min(lo, len(compiler.asm) - 1), len(compiler.asm)
+        asm, locations, markers, label_sites = compiler.preprocess(lex(lines, compiler.file_path, start, final))
+        if any(import_name(line) is not None for line in compiler.asm[lo:hi] + asm):
+            raise ValueError("IMPORT directives cannot be edited incrementally")
+        delta = len(asm) - (hi - lo)
+        line_delta = len(new) - (last - first + 1)
+
+        for location, entry in zip(compiler.locations[lo:hi], self.program[lo:hi]):
+            self.remove_jump(location, entry)
+        declared = self.declare(compiler.asm[lo:hi], -1) | self.declare(asm, 1)
+        position = self.split(hi)
+        if line_delta:
+            for base in self.bases[position:]:
+                base.first += line_delta
+        self.lines[first - 1:last] = new
+        compiler.asm[lo:hi] = asm
+        compiler.locations[lo:hi] = locations
+        if locations:
+            self.bases.insert(position, locations[0].base)
+        if len(self.bases) > 2 * (len(compiler.locations) - compiler.base) // self.block + 16:
+            self.rebase()
+        changed = self.relabel(lo, hi, delta, label_sites)
+        self.splice(compiler.markers, lo, hi, delta, markers)
+        compiler.link_functions()
+
+        self.program[lo:hi] = [None] * len(asm)
+        decode = range(lo, lo + len(asm))
+        variables = compiler.resolver.variables
+        declared = {name for name in declared if (name in self.declared) != (name in variables)}
+        if declared:
+            variables ^= declared
+            decode = [i for i in range(compiler.base, len(compiler.asm))
+                      if lo <= i < lo + len(asm) or any(name in compiler.asm[i] for name in declared)]
+        for i in decode:
+            compiler.instruction_index = i
+            self.program[i] = relocate(compiler.decode(compiler.asm[i].strip()), compiler.base)
+        compiler.instruction_index = 0
+
+        for location, entry in zip(locations, self.program[lo:lo + len(asm)]):
+            self.add_jump(location, entry)
+        for label in changed:
+            self.revalidate(label)
+        self.optimize()
+        return self.errors()
+
+    def update(self, source):
+        old = self.lines
+        lines = StringIO(source, newline=None).readlines()
+        limit = min(len(old), len(lines))
+        first = 0
+        while first < limit and old[first] == lines[first]:
+            first += 1
+        tail = 0
+        while tail < limit - first and old[-1 - tail] == lines[-1 - tail]:
+            tail += 1
+        return self.replace(first + 1, len(old) - tail, "".join(lines[first:len(lines) - tail]))
@@ -0,0 +1,75 @@
+from CPU.control_flow import CORE_OPERATORS, JUMP_OPERATORS, jump_target
+
+NOT_INLINABLE = ("DEF", "UNKNOWN", "LOOP") + CORE_OPERATORS
+
+
+def function_body(compiler, name):
+    start, end = compiler.functions[name]
+    stop = start + 1
+    while stop <= end and compiler.program[stop] is not None and compiler.program[stop][0] != "RETURN":
+        stop += 1
+    return start + 1, stop
+
+
+def calls(compiler, name):
+    first, stop = function_body(compiler, name)
+    return {entry[2][0] for entry in compiler.program[first:stop]
+            if entry[0] == "CALL" and entry[2][0] in compiler.functions}
+
+
+def recursive_functions(compiler):
+    graph = {name: calls(compiler, name) for name in compiler.functions}
+    recursive = set()
+    for name in graph:
+        seen = set()
+        stack = list(graph[name])
+        while stack:
+            callee = stack.pop()
+            if callee == name:
+                recursive.add(name)
+                break
+            if callee not in seen:
+                seen.add(callee)
+                stack.extend(graph.get(callee, ()))
+    return recursive
+
+
+class InlinedCall:
+    def __init__(self, compiler, name):
+        self.compiler = compiler
+        self.name = name
+        self.first, self.stop = function_body(compiler, name)
+        self.entries = compiler.program[self.first:self.stop]
+        self.ops = [(self.first + i, entry[1], entry[2]) for i, entry in enumerate(self.entries)]
+        self.jumps = any(entry[0] in JUMP_OPERATORS for entry in self.entries)
+
+    def size(self):
+        return sum(1 for entry in self.entries if entry[0] not in ("NOP", "LABEL"))
+
+    def inlinable(self):
+        for entry in self.entries:
+            if entry[0] in NOT_INLINABLE:
+                return False
+            if entry[0] in JUMP_OPERATORS:
+                target = jump_target(self.compiler, entry[2][-1])
+                if target is None or not self.first <= target <= self.stop:
+                    return False
+        return True
+
+    def run(self):
+        compiler = self.compiler
+        call_site = compiler.instruction_index
+        if self.jumps:
+            ops = self.ops
+            first = self.first
+            pc = 0
+            while pc < len(ops):
+                index, handler, args = ops[pc]
+                compiler.instruction_index = index
+                handler(*args)
+                pc = compiler.instruction_index + 1 - first
+        else:
+            for index, handler, args in self.ops:
+                compiler.instruction_index = index
+                handler(*args)
+        compiler.instruction_index = call_site
@@ -0,0 +1,83 @@
+import struct
+
+MAGIC = b"VINP"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")
+ENTRY = struct.Struct("<IHI")
+
+
+def write_log(path, entries):
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+        for index, prompt, value in entries:
+            prompt, value = prompt.encode(), value.encode()
+            file.write(ENTRY.pack(index, len(prompt), len(value)))
+            file.write(prompt)
+            file.write(value)
+
+
+def read_log(path):
+    with open(path, 'rb') as file:
+        data = file.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is not a VASM input log")
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a VASM input log")
+    offset = HEADER.size
+    entries = []
+    for _ in range(count):
+        if len(data) < offset + ENTRY.size:
+            raise ValueError(f"{path} is truncated after {len(entries)} inputs")
+        index, prompt_length, value_length = ENTRY.unpack_from(data, offset)
+        offset += ENTRY.size
+        if len(data) < offset + prompt_length + value_length:
+            raise ValueError(f"{path} is truncated after {len(entries)} inputs")
+        prompt = data[offset:offset + prompt_length].decode()
+        offset += prompt_length
+        value = data[offset:offset + value_length].decode()
+        offset += value_length
+        entries.append((index, prompt, value))
+    return entries
+
+
+class InputRecorder:
+    def __init__(self, compiler, source=input):
+        self.compiler = compiler
+        self.source = source
+        self.entries = []
+        compiler.input_source = self.read
+
+    def read(self, prompt):
+        value = self.source(prompt)
+        self.entries.append((self.compiler.instruction_index, prompt, value))
+        return value
+
+    def save(self, path):
+        write_log(path, self.entries)
+        return path
+
+
+class InputReplayer:
+    def __init__(self, compiler, path):
+        self.compiler = compiler
+        self.entries = read_log(path)
+        self.position = 0
+        self.failed = False
+        compiler.input_source = self.read
+
+    def read(self, prompt):
+        compiler = self.compiler
+        if self.position >= len(self.entries):
+            self.failed = True
+            compiler.report_error(f"Replay has no value left for INPUT with prompt {prompt!r}")
+        index, expected, value = self.entries[self.position]
+        if index != compiler.instruction_index or expected != prompt:
+            self.failed = True
+            compiler.report_error(f"Replay expected INPUT {self.position + 1} at instruction {index} "
+                                  f"with prompt {expected!r}")
+        self.position += 1
+        return value
+
+    def remaining(self):
+        return 0 if self.failed else len(self.entries) - self.position
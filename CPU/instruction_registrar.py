@@ -129,44 +129,80 @@ class InstructionRegistrar:
                 result = round(result)
             self.CPU.update_register(reg1, result)
 
-    def dot_product(self, reg1, reg2):
-        if reg1 in self.CPU.vector_registers and reg2 in self.CPU.vector_registers:
-            v_reg1 = self.CPU.return_register(reg1)
-            v_reg2 = self.CPU.return_register(reg2)
-            if len(v_reg1) != len(v_reg2):
-                self.compiler.report_error("Vector registers must have the same length for dot product")
-            result = sum(v_reg1[i] * v_reg2[i] for i in range(len(v_reg1)))
-            store_as = self._get_store_as(reg1)
-            if store_as == "int":
-                result = round(result)
-            self.CPU.update_register(reg1, result)
-        else:
-            self.compiler.report_error("Dot product can only be performed between vector registers.")
+    def _get_vector(self, reg, operation):
+        if reg not in self.CPU.vector_registers:
+            self.compiler.report_error(f"{operation} can only be performed on vector registers, got {reg}")
+        return self.CPU.return_register(reg)
 
-    def magnitude(self, reg):
-        if reg in self.CPU.vector_registers:
-            v_reg = self.CPU.return_register(reg)
-            result = math.sqrt(sum(x ** 2 for x in v_reg))
-            store_as = self._get_store_as(reg)
-            if store_as == "int":
-                result = round(result)
-            self.CPU.update_register(reg, result)
-        else:
-            self.compiler.report_error("Magnitude can only be calculated for vector registers.")
-
-    def normalize(self, reg):
-        if reg in self.CPU.vector_registers:
-            v_reg = self.CPU.return_register(reg)
-            mag = math.sqrt(sum(x ** 2 for x in v_reg))
-            if mag == 0:
-                self.compiler.report_error("Cannot normalize a zero vector.")
-            normalized = [x / mag for x in v_reg]
-            store_as = self._get_store_as(reg)
-            if store_as == "int":
-                normalized = [round(x) for x in normalized]
-            self.CPU.update_register(reg, normalized)
+    def _store_scalar(self, reg, result):
+        store_as = self._get_store_as(reg)
+        if store_as == "int":
+            result = round(result)
+        elif store_as == "vector":
+            self.compiler.report_error(f"Cannot store scalar result in vector register {reg}")
+        self.CPU.update_register(reg, result)
+
+    def dot_product(self, dest, reg1, reg2):
+        v_reg1 = self._get_vector(reg1, "Dot product")
+        v_reg2 = self._get_vector(reg2, "Dot product")
+        if len(v_reg1) != len(v_reg2):
+            self.compiler.report_error("Vector registers must have the same length for dot product")
+        self._store_scalar(dest, sum(x * y for x, y in zip(v_reg1, v_reg2)))
+
+    def magnitude(self, dest, reg):
+        v_reg = self._get_vector(reg, "Magnitude")
+        self._store_scalar(dest, math.sqrt(sum(x * x for x in v_reg)))
+
+    def normalize(self, dest, reg):
+        v_reg = self._get_vector(reg, "Normalization")
+        if dest not in self.CPU.vector_registers:
+            self.compiler.report_error(f"Normalization result must be stored in a vector register, got {dest}")
+        mag = math.sqrt(sum(x * x for x in v_reg))
+        if mag == 0:
+            self.compiler.report_error("Cannot normalize a zero vector.")
+        self.CPU.update_register(dest, [x / mag for x in v_reg])
+
+    def horizontal_sum(self, dest, reg):
+        self._store_scalar(dest, sum(self._get_vector(reg, "Horizontal sum")))
+
+    def horizontal_min(self, dest, reg):
+        self._store_scalar(dest, min(self._get_vector(reg, "Horizontal min")))
+
+    def horizontal_max(self, dest, reg):
+        self._store_scalar(dest, max(self._get_vector(reg, "Horizontal max")))
+
+    def fused_multiply_add(self, dest, op1, op2):
+        if dest in self.CPU.vector_registers:
+            acc = self.CPU.return_register(dest)
+            a = op1 if isinstance(op1, list) else [op1] * len(acc)
+            b = op2 if isinstance(op2, list) else [op2] * len(acc)
+            if not (len(acc) == len(a) == len(b)):
+                self.compiler.report_error("Vector registers must have the same length for fused multiply-add")
+            self.CPU.update_register(dest, [x + y * z for x, y, z in zip(acc, a, b)])
         else:
-            self.compiler.report_error("Normalization can only be performed on vector registers.")
+            if isinstance(op1, list) or isinstance(op2, list):
+                self.compiler.report_error(f"Cannot fuse vector operands into scalar register {dest}")
+            self._store_scalar(dest, self.CPU.return_register(dest) + op1 * op2)
+
+    def broadcast(self, dest, value, length):
+        if dest not in self.CPU.vector_registers:
+            self.compiler.report_error(f"Broadcast can only target vector registers, got {dest}")
+        if not (1 <= length <= 32):
+            self.compiler.report_error(f"Vector length must be between 1 and 32, got {length}")
+        self.CPU.update_register(dest, [value] * length)
+
+    def shuffle(self, dest, reg, indices):
+        v_reg = self._get_vector(reg, "Shuffle")
+        if dest not in self.CPU.vector_registers:
+            self.compiler.report_error(f"Shuffle result must be stored in a vector register, got {dest}")
+        if not (1 <= len(indices) <= 32):
+            self.compiler.report_error(f"Vector length must be between 1 and 32, got {len(indices)}")
+        result = []
+        for index in indices:
+            if not float(index).is_integer() or index < 0 or index >= len(v_reg):
+                self.compiler.report_error(f"Shuffle index {index} out of range for register {reg}")
+            result.append(v_reg[int(index)])
+        self.CPU.update_register(dest, result)
 
     def store(self, reg, address):
         value = self.CPU.return_register(reg)
@@ -224,6 +260,6 @@ class InstructionRegistrar:
 
     def print(self, reg, end):
         if reg in self.CPU.int_registers or reg in self.CPU.ff_registers or reg in self.CPU.vector_registers:
-            print(self.CPU.return_register(reg), end=end)
+            print(self.CPU.return_register(reg), end=end, file=self.compiler.output)
         else:
-            print(reg)
+            print(reg, file=self.compiler.output)
@@ -0,0 +1,72 @@
+import math
+
+INTRINSIC_PREFIX = "@"
+INTRINSICS = {}
+FACT_WRAPS_TO_ZERO = 34
+
+
+def register_intrinsic(name, function=None):
+    name = name.upper()
+    if function is None:
+        def decorator(func):
+            INTRINSICS[name] = func
+            return func
+        return decorator
+    INTRINSICS[name] = function
+    return function
+
+
+def is_intrinsic(function_name):
+    return function_name.startswith(INTRINSIC_PREFIX)
+
+
+def call_intrinsic(compiler, function_name):
+    name = function_name[len(INTRINSIC_PREFIX):].upper()
+    if name not in INTRINSICS:
+        compiler.report_error(f"Intrinsic '{function_name}' not found")
+    INTRINSICS[name](compiler)
+
+
+@register_intrinsic("SORT")
+def intrinsic_sort(compiler):
+    count = compiler.CPU.return_register("I1")
+    vec = compiler.CPU.return_register("V1")
+    if count < 0 or count > len(vec):
+        compiler.report_error(f"SORT count {count} out of range for register V1")
+    vec[:count] = sorted(vec[:count])
+    compiler.CPU.update_register("V1", vec)
+
+
+@register_intrinsic("ISQRT")
+def intrinsic_isqrt(compiler):
+    value = compiler.CPU.return_register("I1")
+    if value < 0:
+        compiler.report_error(f"Cannot take the integer square root of {value}")
+    compiler.CPU.update_register("I1", math.isqrt(value))
+
+
+@register_intrinsic("SQRT")
+def intrinsic_sqrt(compiler):
+    value = compiler.CPU.return_register("FF1")
+    if value < 0:
+        compiler.report_error(f"Cannot take the square root of {value}")
+    compiler.CPU.update_register("FF1", math.sqrt(value))
+
+
+@register_intrinsic("FACT")
+def intrinsic_fact(compiler):
+    value = compiler.CPU.return_register("I1")
+    if value < 0:
+        compiler.report_error(f"Cannot take the factorial of {value}")
+    if value >= FACT_WRAPS_TO_ZERO:
+        result = 0
+    else:
+        result = 1
+        for i in range(2, value + 1):
+            result = (result * i) % 2 ** 32
+    compiler.CPU.update_register("I1", result)
+
+
+@register_intrinsic("ABS")
+def intrinsic_abs(compiler):
+    compiler.CPU.update_register("FF1", abs(compiler.CPU.return_register("FF1")))
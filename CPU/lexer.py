@@ -0,0 +1,85 @@
+from bisect import bisect_right
+
+
+class LineBase:
+    __slots__ = ("first",)
+
+    def __init__(self, first=0):
+        self.first = first
+
+
+class SourceLocation:
+    __slots__ = ("file", "base", "relative", "column")
+
+    def __init__(self, file, line, column, base=None):
+        self.file = file
+        self.base = base if base is not None else LineBase()
+        self.relative = line - self.base.first
+        self.column = column
+
+    @property
+    def line(self):
+        return self.base.first + self.relative
+
+    def __str__(self):
+        return f"{self.file}:{self.line}:{self.column}"
+
+
+class FragmentPositions:
+    __slots__ = ("file", "base", "offsets", "starts")
+
+    def __init__(self, file, base):
+        self.file = file
+        self.base = base
+        self.offsets = []
+        self.starts = []
+
+    def add(self, offset, line, column):
+        self.offsets.append(offset)
+        self.starts.append((line, column))
+
+    def at(self, offset):
+        segment = max(bisect_right(self.offsets, offset) - 1, 0)
+        line, column = self.starts[segment]
+        return SourceLocation(self.file, line, column + offset - self.offsets[segment], self.base)
+
+
+def lex(lines, file_name, first_line=1, final=True):
+    buffer = []
+    length = 0
+    base = LineBase()
+    positions = FragmentPositions(file_name, base)
+    for line_number, line in enumerate(lines, first_line):
+        if '//' in line:
+            line = line.split('//')[0]
+        column = 1
+        for piece in line.split(';')[:-1]:
+            positions.add(length, line_number, column)
+            buffer.append(piece)
+            yield "".join(buffer), positions
+            buffer = []
+            length = 0
+            positions = FragmentPositions(file_name, base)
+            column += len(piece) + 1
+        piece = line[column - 1:]
+        positions.add(length, line_number, column)
+        buffer.append(piece)
+        length += len(piece)
+    if final:
+        if not positions.starts:
+            positions.add(0, first_line, 1)
+        yield "".join(buffer), positions
+
+
+def settles(line):
+    code = line.split('//')[0]
+    return ';' in code and not code.rsplit(';', 1)[1].strip()
+
+
+def lex_file(path):
+    with open(path, 'r') as file:
+        yield from lex(file, path)
+
+
+def leading_space(text):
+    return len(text) - len(text.lstrip())
@@ -0,0 +1,214 @@
+import gc
+import glob
+import hashlib
+import os
+import pickle
+
+from CPU.control_flow import JUMP_OPERATORS
+from CPU.lexer import lex_file
+from CPU.operand_resolver import OperandResolver, declared_variable
+
+CACHE_DIR = "__vasmcache__"
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_name(line):
+    s = line.strip()
+    if s.startswith("IMPORT "):
+        return s[len("IMPORT "):].strip().strip('"')
+    return None
+
+
+def relocate(entry, base):
+    if base and entry is not None and entry[0] in JUMP_OPERATORS and entry[2][-1].isnumeric():
+        return entry[0], entry[1], entry[2][:-1] + (str(int(entry[2][-1]) + base),)
+    return entry
+
+
+def paused_gc(function, *args):
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return function(*args)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def decoder_fingerprint(compiler):
+    digest = hashlib.sha256()
+    digest.update(" ".join(sorted(compiler.instruction_set) + sorted(compiler.pseudo_instructions)).encode())
+    for path in sorted(glob.glob(os.path.join(SOURCE_DIR, "*.py"))):
+        with open(path, 'rb') as file:
+            digest.update(os.path.basename(path).encode())
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def open_function(markers):
+    current = None
+    for i, name in markers:
+        if name is not None:
+            current = name
+        elif current:
+            current = None
+    return current is not None
+
+
+class Module:
+    def __init__(self, path, stamp):
+        self.path = path
+        self.stamp = stamp
+        self.asm = []
+        self.locations = []
+        self.markers = []
+        self.label_sites = []
+        self.imports = []
+        self.declared = set()
+        self.externals = None
+        self.code = None
+
+    def cache_path(self):
+        return os.path.join(os.path.dirname(self.path), CACHE_DIR, os.path.basename(self.path) + ".pickle")
+
+
+class Linker:
+    def __init__(self, compiler, cache=True):
+        self.compiler = compiler
+        self.cache = cache
+        self.modules = []
+        self.offsets = []
+        self.loaded = {}
+        self.fingerprint = None
+
+    def imports(self, asm):
+        return [(i, name) for i, name in enumerate(map(import_name, asm)) if name is not None]
+
+    def link(self):
+        compiler = self.compiler
+        self.loaded = {os.path.abspath(compiler.file_path): None}
+        for index, name in self.imports(compiler.asm):
+            self.load(self.resolve(compiler.file_path, compiler.asm, compiler.locations, index, name))
+        if not self.modules:
+            return 0
+        image = [], [], [], []
+        for module in self.modules:
+            self.offsets.append(self.place(image, module))
+            if open_function(module.markers):
+                image[2].append((len(image[0]) - 1, None))
+        base = self.place(image, compiler)
+        compiler.asm, compiler.locations, compiler.markers, compiler.label_sites = image
+        return base
+
+    def place(self, image, source):
+        asm, locations, markers, label_sites = image
+        offset = len(asm)
+        asm.extend(source.asm)
+        locations.extend(source.locations)
+        markers.extend((i + offset, name) for i, name in source.markers)
+        label_sites.extend((i + offset, name) for i, name in source.label_sites)
+        return offset
+
+    def resolve(self, importer, asm, locations, index, name):
+        path = os.path.abspath(os.path.join(os.path.dirname(importer), name))
+        if not os.path.isfile(path):
+            compiler = self.compiler
+            saved = compiler.asm, compiler.locations
+            compiler.asm, compiler.locations, compiler.instruction_index = asm, locations, index
+            try:
+                compiler.report_error(f"Cannot import '{name}': file not found")
+            finally:
+                compiler.asm, compiler.locations = saved
+        return path
+
+    def load(self, path):
+        if path in self.loaded:
+            return
+        info = os.stat(path)
+        stamp = (info.st_mtime_ns, info.st_size)
+        module = self.read_cache(path, stamp) if self.cache else None
+        if module is None:
+            module = self.preprocess(path, stamp)
+        self.loaded[path] = module
+        for index, name in module.imports:
+            self.load(self.resolve(path, module.asm, module.locations, index, name))
+        externals = frozenset(self.visible(module))
+        if module.code is None or module.externals != externals:
+            self.decode(module, externals)
+            if self.cache:
+                self.write_cache(module)
+        self.modules.append(module)
+
+    def visible(self, module):
+        names = set()
+        seen = {module.path}
+        stack = [module]
+        while stack:
+            current = stack.pop()
+            for index, name in current.imports:
+                dependency = self.loaded.get(os.path.abspath(os.path.join(os.path.dirname(current.path), name)))
+                if dependency is not None and dependency.path not in seen:
+                    seen.add(dependency.path)
+                    names |= dependency.declared
+                    stack.append(dependency)
+        return names
+
+    def preprocess(self, path, stamp):
+        module = Module(path, stamp)
+        module.asm, module.locations, module.markers, module.label_sites = self.compiler.preprocess(lex_file(path))
+        module.imports = self.imports(module.asm)
+        module.declared = {name for name in map(declared_variable, module.asm) if name is not None}
+        return module
+
+    def decode(self, module, externals):
+        compiler = self.compiler
+        saved = compiler.asm, compiler.locations, getattr(compiler, "resolver", None)
+        compiler.asm, compiler.locations = module.asm, module.locations
+        compiler.resolver = OperandResolver(compiler)
+        compiler.resolver.variables = module.declared | externals
+        try:
+            code = []
+            for i, line in enumerate(module.asm):
+                compiler.instruction_index = i
+                entry = compiler.decode(line.strip())
+                code.append(None if entry is None else (entry[0], entry[2]))
+        finally:
+            compiler.asm, compiler.locations, compiler.resolver = saved
+            compiler.instruction_index = 0
+        module.code = code
+        module.externals = externals
+
+    def program(self):
+        return paused_gc(self.bind)
+
+    def bind(self):
+        compiler = self.compiler
+        program = []
+        for module, offset in zip(self.modules, self.offsets):
+            program.extend(None if code is None else relocate(compiler.bind(*code), offset) for code in module.code)
+        return program
+
+    def decoder(self):
+        if self.fingerprint is None:
+            self.fingerprint = decoder_fingerprint(self.compiler)
+        return self.fingerprint
+
+    def read_cache(self, path, stamp):
+        try:
+            with open(Module(path, stamp).cache_path(), 'rb') as file:
+                fingerprint, module = paused_gc(pickle.load, file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError, TypeError):
+            return None
+        if fingerprint != self.decoder() or module.path != path or module.stamp != stamp:
+            return None
+        return module
+
+    def write_cache(self, module):
+        cache_path = module.cache_path()
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path + ".tmp", 'wb') as file:
+                pickle.dump((self.decoder(), module), file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(cache_path + ".tmp", cache_path)
+        except OSError:
+            pass
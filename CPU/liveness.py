@@ -0,0 +1,184 @@
+from CPU.control_flow import JUMP_OPERATORS, basic_blocks, jump_target
+from CPU.operand_resolver import class_registers
+
+SAFE_SCALAR_OPERATORS = ("ADD", "SUB", "MUL")
+VECTOR_OPERATORS = ("DOT", "MAG", "NORM", "HSUM", "HMIN", "HMAX", "FMA", "BCAST", "SHUF")
+NO_EFFECT_OPERATORS = ("NOP", "LABEL", "UNKNOWN")
+STACK_OPERATORS = ("PUSH", "POP", "PUSHA", "POPA")
+
+
+class Liveness:
+    def __init__(self, compiler):
+        self.compiler = compiler
+        self.program = compiler.program
+        self.reg_names = compiler.reg_names
+        self.variables = compiler.resolver.variables
+        self.everything = frozenset(self.reg_names) | frozenset(self.variables)
+        self.blocks = basic_blocks(compiler)
+        self.function_ranges = list(compiler.functions.values())
+        self.live_in = {}
+        self.live_out = {}
+
+    def in_function(self, index):
+        return any(start < index <= end for start, end in self.function_ranges)
+
+    def text_uses(self, text):
+        pieces = text.replace("]", "[").replace(" ", "[").split("[")
+        return {piece for piece in pieces if piece in self.everything}
+
+    def operand_uses(self, operand):
+        if operand.kind in ("int", "float", "vector", "variable", "shadow"):
+            return {operand.base}
+        if operand.kind in ("element", "variable_element"):
+            uses = {operand.base}
+            if operand.index_kind != "literal":
+                uses.add(operand.index)
+            return uses
+        if operand.kind == "vector_literal":
+            uses = set()
+            for token in operand.value:
+                uses |= self.operand_uses(token)
+            return uses
+        return set()
+
+    def effects(self, entry):
+        operator, handler, args = entry
+        if operator in NO_EFFECT_OPERATORS:
+            return set(), set(), False
+        if operator == "MOVE":
+            dest, src = args
+            uses = self.operand_uses(src)
+            if dest.kind in ("int", "float", "vector"):
+                same_class = src.kind == dest.kind or (src.kind, dest.kind) == ("int", "float")
+                removable = src.kind == "literal" or same_class
+                if src.kind == "literal" and dest.kind == "float":
+                    removable = self.packs_as_float(src.value)
+                if src.kind == "vector_literal":
+                    removable = all(token.kind in ("literal", "int", "float") for token in src.value)
+                return uses, {dest.base}, removable
+            return uses | self.operand_uses(dest), set(), False
+        if operator in ("ADD", "SUB", "MUL", "DIV", "MOD"):
+            dest, src = args
+            uses = self.operand_uses(src) | self.operand_uses(dest)
+            kills = {dest.base} if dest.kind in ("int", "float", "vector") else set()
+            if dest.kind in ("int", "vector") and operator in SAFE_SCALAR_OPERATORS:
+                removable = src.kind in ("int", "literal") or (dest.kind == "vector" and src.kind == "float")
+                return uses, kills, removable
+            return uses, kills, False
+        if operator in JUMP_OPERATORS:
+            return (self.text_uses(args[0]) if len(args) > 1 else set()), set(), False
+        if operator in ("PRINT", "PRINTF", "TEXT", "STORE", "PUSH"):
+            return self.text_uses(args[0]) if args else set(), set(), False
+        if operator in ("LOADM", "POP", "INPUT"):
+            key = args[0] if args else ""
+            uses = set(self.variables) if operator == "LOADM" else set()
+            if key in self.reg_names or (operator == "INPUT" and key in self.variables):
+                return uses, {key}, False
+            return uses | self.text_uses(key), set(), False
+        if operator == "VAR":
+            uses = self.text_uses(args[1]) if len(args) > 1 else set()
+            return uses, set(), False
+        if operator == "PUSHA":
+            return set(class_registers(self.reg_names, args)), set(), False
+        if operator == "POPA":
+            return set(), set(class_registers(self.reg_names, args)), False
+        if operator in VECTOR_OPERATORS:
+            uses = set()
+            for arg in args:
+                uses |= self.text_uses(arg)
+            return uses, set(), False
+        if operator in ("HALT", "DEF"):
+            return set(), set(), False
+        if operator == "INLINE":
+            uses = set()
+            for inner in args[0].entries:
+                uses |= self.effects(inner)[0]
+            return uses, set(), False
+        if operator == "MEMO":
+            return set(args[0].reads), set(), False
+        return set(self.everything), set(), False
+
+    def packs_as_float(self, value):
+        try:
+            self.compiler.CPU.float_to_ieee754(value)
+            return True
+        except OverflowError:
+            return False
+
+    def written(self, entry):
+        operator, handler, args = entry
+        if operator in ("MOVE", "ADD", "SUB", "MUL", "DIV", "MOD"):
+            return {args[0].base}
+        if operator in ("LOADM", "POP", "INPUT", "VAR") + VECTOR_OPERATORS:
+            return self.text_uses(args[0]) if args else set()
+        if operator in NO_EFFECT_OPERATORS + JUMP_OPERATORS + ("PRINT", "PRINTF", "TEXT", "STORE", "PUSH", "PUSHA"):
+            return set()
+        if operator == "POPA":
+            return set(class_registers(self.reg_names, args))
+        if operator == "INLINE":
+            written = set()
+            for inner in args[0].entries:
+                written |= self.written(inner)
+            return written
+        if operator == "MEMO":
+            return set(args[0].writes)
+        return set(self.everything)
+
+    def successors(self, block):
+        start, end = block
+        last = self.program[end - 1]
+        if last is not None:
+            operator = last[0]
+            if operator == "HALT":
+                return []
+            if operator == "RETURN":
+                return None
+            if operator == "DEF":
+                return [self.compiler.functions[last[2][0]][1] + 1]
+            if operator in JUMP_OPERATORS:
+                target = jump_target(self.compiler, last[2][-1])
+                targets = [] if target is None else [target]
+                if target is not None and self.in_function(end - 1) and not self.in_function(target):
+                    return None
+                if operator != "JMP":
+                    targets.append(end)
+                return targets
+        if self.in_function(end - 1) and not self.in_function(end):
+            return None
+        return [end] if end < len(self.program) else []
+
+    def transfer(self, block, live):
+        start, end = block
+        live = set(live)
+        for i in range(end - 1, start - 1, -1):
+            entry = self.program[i]
+            if entry is None:
+                if self.in_function(i):
+                    live = set(self.everything)
+                continue
+            uses, kills, removable = self.effects(entry)
+            live -= kills
+            live |= uses
+        return live
+
+    def analyze(self):
+        starts = {block[0]: block for block in self.blocks}
+        self.live_in = {block: set() for block in self.blocks}
+        changed = True
+        while changed:
+            changed = False
+            for block in reversed(self.blocks):
+                successors = self.successors(block)
+                if successors is None:
+                    live_out = set(self.everything)
+                else:
+                    live_out = set()
+                    for target in successors:
+                        if target in starts:
+                            live_out |= self.live_in[starts[target]]
+                self.live_out[block] = live_out
+                live_in = self.transfer(block, live_out)
+                if live_in != self.live_in[block]:
+                    self.live_in[block] = live_in
+                    changed = True
+        return self
@@ -0,0 +1,126 @@
+from CPU.control_flow import TERMINATORS, jump_target
+
+STEP_OPERATORS = {"ADD": 1, "SUB": -1}
+
+
+def counter_step(entry, register):
+    if entry is None or entry[0] not in STEP_OPERATORS:
+        return None
+    dest, src = entry[2]
+    if dest.kind != "int" or dest.base != register or src.kind != "literal" or not src.value.is_integer():
+        return None
+    return STEP_OPERATORS[entry[0]] * int(src.value)
+
+
+class CountedLoop:
+    def __init__(self, compiler, head, end, counter, guard, exit_index):
+        self.compiler = compiler
+        self.head = head
+        self.end = end
+        self.counter = counter
+        self.guard = guard
+        self.exit_index = exit_index
+        self.fallback = compiler.program[head]
+        self.body = []
+        self.inductions = []
+        self.reads_counter = False
+        self.factor = 1
+        self.unrolled = []
+        self.remaining = 0
+
+    def entries(self):
+        return range(self.head + 1 if self.guard else self.head, self.end - 1)
+
+    def build(self, factor):
+        self.factor = factor
+        self.unrolled = []
+        for copy in range(factor):
+            if self.reads_counter:
+                self.unrolled.append((self.head, self.set_counter, (copy,)))
+            self.unrolled.extend(self.body)
+
+    def set_counter(self, copy):
+        self.compiler.CPU.update_register(self.counter, self.remaining - copy)
+
+    def run(self):
+        compiler = self.compiler
+        cpu = compiler.CPU
+        trips = cpu.int_registers[self.counter]
+        if trips <= 0:
+            self.fallback[1](*self.fallback[2])
+            return
+        self.remaining = trips
+        for _ in range(trips // self.factor):
+            for index, handler, args in self.unrolled:
+                compiler.instruction_index = index
+                handler(*args)
+            self.remaining -= self.factor
+        for index, handler, args in self.unrolled[:len(self.unrolled) // self.factor * (trips % self.factor)]:
+            compiler.instruction_index = index
+            handler(*args)
+        compiler.instruction_index = self.head
+        cpu.update_register(self.counter, 0)
+        for register, step in self.inductions:
+            cpu.update_register(register, cpu.int_registers[register] + step * trips)
+        compiler.instruction_index = self.exit_index
+
+
+def find_counted_loop(compiler, liveness, head, end):
+    program = compiler.program
+    last = program[end]
+    operator, handler, args = last
+    if operator == "JNZ":
+        counter = args[0]
+    elif operator == "JMP":
+        counter = None
+    else:
+        return None
+    first = program[head]
+    guard = first is not None and first[0] == "JZ" and (counter is None or first[2][0] == counter)
+    if guard:
+        counter = first[2][0]
+        target = jump_target(compiler, first[2][-1])
+        if target is None or head <= target <= end:
+            return None
+    elif operator == "JMP":
+        return None
+    if counter not in compiler.CPU.int_registers or counter_step(program[end - 1], counter) != -1:
+        return None
+    exit_index = target - 1 if operator == "JMP" else end
+    loop = CountedLoop(compiler, head, end, counter, guard, exit_index)
+    for i in loop.entries():
+        entry = program[i]
+        if entry is None:
+            if liveness.in_function(i):
+                return None
+            continue
+        if entry[0] in TERMINATORS or entry[0] == "UNKNOWN" or counter in liveness.written(entry):
+            return None
+        loop.reads_counter = loop.reads_counter or counter in liveness.effects(entry)[0]
+        loop.body.append((i, entry[1], entry[2]))
+    loop.inductions = find_inductions(loop, liveness)
+    inductions = {register for register, step in loop.inductions}
+    loop.body = [op for op in loop.body
+                 if not (program[op[0]][0] in STEP_OPERATORS and program[op[0]][2][0].base in inductions)]
+    return loop
+
+
+def find_inductions(loop, liveness):
+    program = loop.compiler.program
+    inductions = []
+    for register in loop.compiler.CPU.int_registers:
+        if register == loop.counter:
+            continue
+        steps = []
+        for index, handler, args in loop.body:
+            entry = program[index]
+            uses, kills, removable = liveness.effects(entry)
+            step = counter_step(entry, register)
+            if step is not None:
+                steps.append(step)
+            elif register in uses or register in liveness.written(entry):
+                break
+        else:
+            if len(steps) == 1:
+                inductions.append((register, steps[0]))
+    return inductions
@@ -0,0 +1,116 @@
+from collections import OrderedDict
+
+from CPU.control_flow import JUMP_OPERATORS, jump_target
+from CPU.inlining import function_body, recursive_functions
+from CPU.liveness import VECTOR_OPERATORS
+
+PURE_OPERATORS = ("MOVE", "ADD", "SUB", "MUL", "DIV", "MOD", "NOP", "LABEL", "INLINE") + JUMP_OPERATORS + \
+                 VECTOR_OPERATORS
+
+
+class MemoizedCall:
+    def __init__(self, compiler, name, reads, writes, size):
+        self.compiler = compiler
+        self.name = name
+        self.reads = reads
+        self.writes = writes
+        self.key_registers = tuple(sorted(reads))
+        self.write_registers = tuple(sorted(writes))
+        self.size = size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def snapshot(self, registers):
+        cpu = self.compiler.CPU
+        values = []
+        for register in registers:
+            value = cpu.return_register(register)
+            values.append(tuple(value) if isinstance(value, list) else value)
+        return tuple(values)
+
+    def run(self):
+        compiler = self.compiler
+        key = self.snapshot(self.key_registers)
+        result = self.cache.get(key)
+        if result is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            for register, value in zip(self.write_registers, result):
+                compiler.CPU.update_register(register, list(value) if isinstance(value, tuple) else value)
+            return
+        self.misses += 1
+        compiler.run_function(self.name)
+        self.cache[key] = self.snapshot(self.write_registers)
+        if len(self.cache) > self.size:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self.cache)}
+
+
+def locally_pure(compiler, liveness, name):
+    first, stop = function_body(compiler, name)
+    variables = compiler.resolver.variables - set(compiler.reg_names)
+    for entry in compiler.program[first:stop]:
+        operator, handler, args = entry
+        if operator == "CALL":
+            if args[0] not in compiler.functions:
+                return False
+            continue
+        if operator == "INLINE":
+            if not all(inner[0] in PURE_OPERATORS for inner in args[0].entries):
+                return False
+        elif operator not in PURE_OPERATORS:
+            return False
+        if operator in JUMP_OPERATORS:
+            target = jump_target(compiler, args[-1])
+            if target is None or not first <= target <= stop:
+                return False
+        if liveness.effects(entry)[0] & variables or liveness.written(entry) & variables:
+            return False
+        if operator in ("MOVE", "ADD", "SUB", "MUL", "DIV", "MOD") and any(
+                arg.kind in ("variable", "variable_element", "shadow", "text") for arg in args):
+            return False
+    return True
+
+
+def pure_functions(compiler, liveness):
+    recursive = recursive_functions(compiler)
+    pure = {name for name in compiler.functions if name not in recursive and locally_pure(compiler, liveness, name)}
+    changed = True
+    while changed:
+        changed = False
+        for name in list(pure):
+            first, stop = function_body(compiler, name)
+            if any(entry[0] == "CALL" and entry[2][0] not in pure for entry in compiler.program[first:stop]):
+                pure.discard(name)
+                changed = True
+    return pure
+
+
+def register_sets(compiler, liveness, name, found):
+    if name in found:
+        return found[name]
+    first, stop = function_body(compiler, name)
+    reads, writes, defined = set(), set(), set()
+    straight = True
+    for entry in compiler.program[first:stop]:
+        if entry[0] == "CALL":
+            callee_reads, callee_writes = register_sets(compiler, liveness, entry[2][0], found)
+            reads |= (callee_reads | callee_writes) - defined
+            writes |= callee_writes
+            straight = False
+            continue
+        if entry[0] in JUMP_OPERATORS or entry[0] == "INLINE":
+            straight = False
+        uses, kills, removable = liveness.effects(entry)
+        reads |= uses - defined
+        writes |= liveness.written(entry)
+        if straight:
+            defined |= kills
+    reads |= writes - defined
+    found[name] = reads, writes
+    return found[name]
@@ -0,0 +1,326 @@
+import multiprocessing
+import sys
+from multiprocessing import shared_memory
+
+from CPU.intrinsics import is_intrinsic
+
+RUNNING = "running"
+JOINING = "joining"
+WAITING = "waiting"
+FINISHED = "finished"
+
+EMPTY = 0
+INT = 1
+FLOAT = 2
+
+PARTICIPANTS = 0
+ARRIVED = 1
+GENERATION = 2
+NUMBERED = 3
+
+
+class SharedCells:
+    def __init__(self, values):
+        self.size = len(values)
+        self.block = shared_memory.SharedMemory(create=True, size=self.size * 9)
+        self.numbers = self.block.buf[:self.size * 8].cast('d')
+        self.kinds = self.block.buf[self.size * 8:self.size * 9]
+        self[:] = values
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return (self[i] for i in range(self.size))
+
+    def __getitem__(self, address):
+        if isinstance(address, slice):
+            return [self[i] for i in range(*address.indices(self.size))]
+        kind = self.kinds[address]
+        if kind == EMPTY:
+            return None
+        value = self.numbers[address]
+        return int(value) if kind == INT else value
+
+    def __setitem__(self, address, value):
+        if isinstance(address, slice):
+            for i, item in zip(range(*address.indices(self.size)), value):
+                self[i] = item
+        elif value is None:
+            self.kinds[address] = EMPTY
+        else:
+            self.numbers[address] = value
+            self.kinds[address] = INT if isinstance(value, int) else FLOAT
+
+    def release(self):
+        self.numbers.release()
+        self.kinds.release()
+        self.block.close()
+        self.block.unlink()
+
+
+class Core:
+    def __init__(self, number, instruction_index, frames):
+        self.number = number
+        self.instruction_index = instruction_index
+        self.frames = frames
+        self.registers = None
+        self.variables = None
+        self.call_stack = None
+        self.stack_index = 0
+        self.children = []
+        self.state = RUNNING
+        self.generation = None
+        self.exit_code = None
+        self.process = None
+
+
+class Cores:
+    def __init__(self, compiler, quantum=100, parallel=False):
+        self.compiler = compiler
+        self.quantum = max(quantum, 1)
+        self.parallel = parallel
+        self.current = Core(0, 0, [])
+        self.cores = [self.current]
+        self.condition = None
+        self.counters = [1, 0, 0, 1]
+        compiler.cores = self
+        if parallel:
+            context = multiprocessing.get_context("fork")
+            self.context = context
+            self.condition = context.Condition()
+            self.counters = context.Array('i', self.counters, lock=False)
+            self.heap = context.Value('i', compiler.memory_index, lock=False)
+            compiler.lock = context.Lock()
+            compiler.allocate = self.allocate
+            compiler.CPU.memory = SharedCells(compiler.CPU.memory)
+
+    def allocate(self, size):
+        with self.compiler.lock:
+            head = self.heap.value
+            self.heap.value += size
+        return head
+
+    def run(self):
+        main = self.current
+        try:
+            if self.parallel:
+                self.execute(main, float("inf"))
+            else:
+                self.interleave()
+        finally:
+            if self.parallel:
+                self.stop(main)
+        self.compiler.instruction_index = len(self.compiler.program)
+
+    def interleave(self):
+        while True:
+            core = self.current
+            if core.state == RUNNING:
+                if core.number:
+                    self.guarded(core)
+                else:
+                    self.execute(core, self.quantum)
+            following = self.cores[self.cores.index(core) + 1:] + self.cores[:self.cores.index(core) + 1]
+            runnable = next((other for other in following if self.resumable(other)), None)
+            if runnable is None:
+                if all(other.state == FINISHED for other in self.cores):
+                    return
+                self.compiler.report_error("Every core is waiting in JOIN or BARRIER")
+            if runnable is not core:
+                self.switch(runnable)
+
+    def resumable(self, core):
+        if core.state == JOINING and all(child.state == FINISHED for child in core.children):
+            self.enter()
+            core.state = RUNNING
+        elif core.state == WAITING and core.generation != self.counters[GENERATION]:
+            core.state = RUNNING
+        return core.state == RUNNING
+
+    def guarded(self, core):
+        try:
+            self.execute(core, self.quantum)
+        except SystemExit as exit:
+            self.finish(core, exit.code or 0)
+
+    def execute(self, core, limit):
+        compiler = self.compiler
+        program = compiler.program
+        functions = compiler.functions
+        hooks = compiler.hooks
+        frames = core.frames
+        count = 0
+        while count < limit and core.state == RUNNING:
+            index = compiler.instruction_index
+            if frames and (index > frames[-1][1] or program[index] is None or program[index][0] == "RETURN"):
+                site = frames.pop()[0]
+                if site is None:
+                    self.end(core)
+                else:
+                    if hooks.installed:
+                        hooks.leave(site, program[site][2][0])
+                    compiler.instruction_index = site + 1
+                continue
+            if index >= len(program):
+                self.end(core)
+                continue
+            entry = program[index]
+            if entry is not None:
+                operator = entry[0]
+                if operator == "CALL" and not is_intrinsic(entry[2][0]) and entry[2][0] in functions:
+                    if hooks.installed:
+                        hooks.enter(index, entry[2][0])
+                    start, end = functions[entry[2][0]]
+                    frames.append((index, end))
+                    compiler.instruction_index = start + 1
+                    count += 1
+                    continue
+                if operator == "UNKNOWN" and frames:
+                    compiler.report_error(f"Unknown instruction: {entry[2][0]}")
+                entry[1](*entry[2])
+            compiler.instruction_index += 1
+            count += 1
+
+    def end(self, core):
+        core.frames.clear()
+        self.compiler.instruction_index = len(self.compiler.program)
+        if self.joined():
+            self.finish(core, 0)
+
+    def finish(self, core, code):
+        self.leave()
+        core.state = FINISHED
+        core.exit_code = code
+
+    def function(self, function_name):
+        compiler = self.compiler
+        if is_intrinsic(function_name) or function_name not in compiler.functions:
+            compiler.report_error(f"Function '{function_name}' not found")
+        return compiler.functions[function_name]
+
+    def spawn(self, function_name):
+        compiler = self.compiler
+        start, end = self.function(function_name)
+        with self.counting():
+            number = self.counters[NUMBERED]
+            self.counters[NUMBERED] += 1
+            self.counters[PARTICIPANTS] += 1
+        core = Core(number, start + 1, [(None, end)])
+        self.current.children.append(core)
+        if self.parallel:
+            sys.stdout.flush()
+            core.process = self.context.Process(target=self.run_process, args=(core,))
+            core.process.start()
+            return
+        cpu = compiler.CPU
+        core.registers = self.registers()
+        core.variables = dict(compiler.variables)
+        core.call_stack = [None] * len(cpu.call_stack)
+        self.cores.append(core)
+
+    def run_process(self, core):
+        compiler = self.compiler
+        self.current = core
+        self.cores = [core]
+        compiler.instruction_index = core.instruction_index
+        compiler.stack_index = 0
+        compiler.CPU.call_stack = [None] * len(compiler.CPU.call_stack)
+        try:
+            self.execute(core, float("inf"))
+        finally:
+            self.stop(core)
+            sys.stdout.flush()
+
+    def join(self):
+        if not self.joined():
+            self.compiler.instruction_index -= 1
+
+    def joined(self):
+        compiler = self.compiler
+        core = self.current
+        if self.parallel:
+            self.leave()
+            try:
+                for child in core.children:
+                    child.process.join()
+                    child.exit_code = child.process.exitcode
+                    child.state = FINISHED
+            finally:
+                self.enter()
+        elif any(child.state != FINISHED for child in core.children):
+            self.leave()
+            core.state = JOINING
+            return False
+        for child in core.children:
+            if child.exit_code:
+                compiler.report_error(f"Core {child.number} stopped with exit code {child.exit_code}")
+        core.children = []
+        return True
+
+    def barrier(self):
+        with self.counting():
+            generation = self.counters[GENERATION]
+            self.counters[ARRIVED] += 1
+            self.release()
+            if self.parallel:
+                while self.counters[GENERATION] == generation:
+                    self.condition.wait()
+            elif self.counters[GENERATION] == generation:
+                self.current.state = WAITING
+                self.current.generation = generation
+
+    def enter(self):
+        with self.counting():
+            self.counters[PARTICIPANTS] += 1
+
+    def leave(self):
+        with self.counting():
+            self.counters[PARTICIPANTS] -= 1
+            self.release()
+
+    def release(self):
+        counters = self.counters
+        if counters[ARRIVED] and counters[ARRIVED] >= counters[PARTICIPANTS]:
+            counters[ARRIVED] = 0
+            counters[GENERATION] += 1
+            if self.parallel:
+                self.condition.notify_all()
+
+    def counting(self):
+        return self.condition if self.parallel else self.compiler.lock
+
+    def stop(self, core):
+        if core.state != FINISHED:
+            self.leave()
+        for child in core.children:
+            if child.process.is_alive():
+                child.process.terminate()
+            child.process.join()
+        if core.number == 0:
+            self.compiler.CPU.memory.release()
+
+    def registers(self):
+        cpu = self.compiler.CPU
+        return (dict(cpu.int_registers), dict(cpu.ff_registers),
+                {name: list(value) for name, value in cpu.vector_registers.items()})
+
+    def switch(self, core):
+        compiler = self.compiler
+        cpu = compiler.CPU
+        compiler.shadow.spill()
+        previous = self.current
+        previous.registers = self.registers()
+        previous.instruction_index = compiler.instruction_index
+        previous.stack_index = compiler.stack_index
+        previous.call_stack = cpu.call_stack
+        previous.variables = compiler.variables
+        ints, floats, vectors = core.registers
+        cpu.int_registers.update(ints)
+        cpu.ff_registers.update(floats)
+        cpu.vector_registers.update(vectors)
+        compiler.instruction_index = core.instruction_index
+        compiler.stack_index = core.stack_index
+        cpu.call_stack = core.call_stack
+        compiler.variables = core.variables
+        self.current = core
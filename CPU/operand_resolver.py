@@ -0,0 +1,148 @@
+REGISTER_KINDS = {"I": "int", "FF": "float", "V": "vector"}
+TYPED_OPERATORS = ("MOVE", "ADD", "SUB", "MUL", "DIV", "MOD")
+ARITHMETIC_VERBS = {"ADD": "add", "SUB": "subtract", "MUL": "multiply", "DIV": "divide", "MOD": "perform modulo with"}
+
+
+class Operand:
+    __slots__ = ("text", "kind", "base", "index", "index_kind", "value")
+
+    def __init__(self, text, kind, base=None, index=None, index_kind=None, value=None):
+        self.text = text
+        self.kind = kind
+        self.base = base
+        self.index = index
+        self.index_kind = index_kind
+        self.value = value
+
+    def __repr__(self):
+        return f"Operand({self.kind}, {self.text!r})"
+
+
+def register_kind(name):
+    return REGISTER_KINDS["FF" if name.startswith("FF") else name[0]]
+
+
+def class_registers(reg_names, classes):
+    kinds = [REGISTER_KINDS[name] for name in classes if name in REGISTER_KINDS] if classes else REGISTER_KINDS.values()
+    return [name for kind in kinds for name in reg_names if register_kind(name) == kind]
+
+
+def declared_variable(line):
+    parts = line.strip().split(" ", 1)
+    if parts[0] in ("VAR", "INPUT") and len(parts) > 1:
+        return parts[1].strip().split(",")[0]
+    return None
+
+
+class OperandResolver:
+    def __init__(self, compiler):
+        self.compiler = compiler
+        self.reg_names = compiler.reg_names
+        self.variables = set()
+
+    def collect_variables(self, asm):
+        for line in asm:
+            name = declared_variable(line)
+            if name is not None:
+                self.variables.add(name)
+
+    def resolve(self, text):
+        if text in self.reg_names:
+            return Operand(text, register_kind(text), base=text)
+        if '[' in text and text.endswith(']') and not text.startswith('['):
+            return self.resolve_indexed(text)
+        if text in self.variables:
+            return Operand(text, "variable", base=text)
+        try:
+            return Operand(text, "literal", value=float(text))
+        except ValueError:
+            pass
+        if text.startswith("[") and text.endswith("]"):
+            tokens = text[1:-1].replace(",", " ").split()
+            return Operand(text, "vector_literal", value=[self.resolve(token) for token in tokens])
+        return Operand(text, "text")
+
+    def resolve_indexed(self, text):
+        base = text[:text.index('[')]
+        index_str = text[text.index('[') + 1: -1]
+        if index_str in self.reg_names:
+            if register_kind(index_str) != "int":
+                self.compiler.report_error("Um what are you even trying to do?")
+            index, index_kind = index_str, "register"
+        elif index_str in self.variables:
+            index, index_kind = index_str, "variable"
+        else:
+            try:
+                index, index_kind = int(index_str), "literal"
+            except ValueError:
+                return Operand(text, "text")
+        if base in self.reg_names:
+            if register_kind(base) != "vector":
+                self.compiler.report_error(f"Cannot index non-vector register {base}")
+            return Operand(text, "element", base=base, index=index, index_kind=index_kind)
+        if base in self.variables:
+            return Operand(text, "variable_element", base=base, index=index, index_kind=index_kind)
+        return Operand(text, "text")
+
+    def resolve_instruction(self, operator, args):
+        if len(args) != 2:
+            self.compiler.report_error(f"{operator} expects 2 operands, got {len(args)}")
+        dest, src = self.resolve(args[0]), self.resolve(args[1])
+        if operator == "MOVE":
+            self.check_move(dest, src)
+        else:
+            self.check_arithmetic(operator, dest, src)
+        return dest, src
+
+    def check_move(self, dest, src):
+        if dest.kind in ("variable", "variable_element"):
+            if dest.kind == "variable_element" and src.kind == "vector_literal":
+                self.compiler.report_error(f"Cannot assign vector literal to a vector element {dest.text}")
+            self.check_vector_literal(src, "MOVE")
+            return
+        if dest.kind not in ("int", "float", "vector", "element"):
+            self.compiler.report_error(f"Invalid key for MOVE operation: {dest.text}")
+        if src.kind == "text":
+            self.compiler.report_error(f"Invalid value for MOVE operation: {src.text}")
+        if src.kind == "literal":
+            if dest.kind == "int" and not src.value.is_integer():
+                self.compiler.report_error(f"Cannot move floating point literal to {dest.base} due to type mismatch")
+            elif dest.kind == "vector":
+                self.compiler.report_error(f"Cannot assign scalar to entire vector register {dest.base}")
+        elif src.kind == "vector_literal":
+            if dest.kind == "element":
+                self.compiler.report_error(f"Cannot assign vector literal to a vector element {dest.text}")
+            elif dest.kind != "vector":
+                self.compiler.report_error(f"Cannot move vector literal to {dest.base}")
+            self.check_vector_literal(src, "MOVE")
+        elif src.kind == "vector" and dest.kind != "vector":
+            self.compiler.report_error(f"Cannot move {src.base} to {dest.text} due to type mismatch")
+        elif src.kind in ("int", "float", "element") and dest.kind == "vector":
+            self.compiler.report_error(f"Expected vector, got scalar for register {dest.base}")
+
+    def check_arithmetic(self, operator, dest, src):
+        verb = ARITHMETIC_VERBS[operator]
+        if dest.kind not in ("int", "float", "vector", "element"):
+            self.compiler.report_error(f"Invalid register for {operator} operation: {dest.text}")
+        if src.kind == "text":
+            self.compiler.report_error(f"Invalid type for {operator} operation. Got: {src.text}")
+        if src.kind == "vector_literal":
+            if any(token.kind != "literal" for token in src.value):
+                self.compiler.report_error(f"Invalid vector literal: {src.text}")
+        is_vector = src.kind in ("vector", "vector_literal")
+        if is_vector and dest.kind != "vector":
+            self.compiler.report_error(f"Cannot {verb} vector and {dest.text}")
+        if src.kind == "literal":
+            if dest.kind == "int" and not src.value.is_integer():
+                self.compiler.report_error(f"Cannot {verb} float and integer register {dest.base}")
+            if operator in ("DIV", "MOD") and src.value == 0:
+                self.compiler.report_error("Division by zero" if operator == "DIV" else "Modulo by zero")
+
+    def check_vector_literal(self, src, operator):
+        if src.kind != "vector_literal":
+            return
+        if not (1 <= len(src.value) <= 32):
+            self.compiler.report_error(f"Vector length must be between 1 and 32, got {len(src.value)}")
+        for token in src.value:
+            if token.kind not in ("int", "float", "variable", "literal"):
+                self.compiler.report_error(f"Invalid vector element: {token.text}")
@@ -0,0 +1,475 @@
+from CPU.arithmetic_kernels import FLOAT_OPERATIONS, INT_OPERATIONS
+from CPU.control_flow import JUMP_OPERATORS, TERMINATORS, basic_blocks, jump_target, uses_cores
+from CPU.inlining import InlinedCall, recursive_functions
+from CPU.liveness import Liveness, STACK_OPERATORS
+from CPU.loops import find_counted_loop
+from CPU.memoization import MemoizedCall, pure_functions, register_sets
+from CPU.operand_resolver import Operand
+
+REGISTER_PRESERVING_OPERATORS = ("PRINT", "PRINTF", "TEXT", "STORE", "PUSH", "PUSHA", "VAR")
+SKIPPED_OPERATORS = ("NOP", "LABEL")
+IDENTITY_OPERANDS = {"ADD": 0, "SUB": 0, "MUL": 1, "DIV": 1}
+
+
+def literal(value):
+    return Operand(repr(value), "literal", value=float(value))
+
+
+def instruction_text(operator, args):
+    return f"{operator} {','.join(arg.text for arg in args)}"
+
+
+class ConstantFolder:
+    level = 1
+
+    def __init__(self, optimizer):
+        self.optimizer = optimizer
+        self.compiler = optimizer.compiler
+        self.program = optimizer.compiler.program
+
+    def run(self):
+        for start, end in basic_blocks(self.compiler):
+            self.fold_block(start, end)
+
+    def wrap_int(self, value):
+        value %= 2 ** 32
+        if value >= 2 ** 31:
+            value -= 2 ** 32
+        return value
+
+    def round_float(self, value):
+        cpu = self.compiler.CPU
+        return cpu.ieee754_to_float(*cpu.float_to_ieee754(value))
+
+    def convert(self, kind, value):
+        try:
+            if kind == "int":
+                return self.wrap_int(int(value)) if float(value).is_integer() else None
+            return self.round_float(float(value))
+        except (OverflowError, ValueError):
+            return None
+
+    def evaluate(self, operation, kind, dest_value, src_value):
+        try:
+            if kind == "int":
+                if not float(src_value).is_integer():
+                    return None
+                return self.wrap_int(INT_OPERATIONS[operation](dest_value, int(src_value)))
+            return self.round_float(FLOAT_OPERATIONS[operation](dest_value, float(src_value)))
+        except (ZeroDivisionError, OverflowError, ValueError):
+            return None
+
+    def fold_block(self, start, end):
+        self.constants = {}
+        self.pending = {}
+        self.offsets = {}
+        for i in range(start, end):
+            entry = self.program[i]
+            if entry is None or entry[0] in SKIPPED_OPERATORS:
+                continue
+            operator = entry[0]
+            if operator == "MOVE":
+                self.fold_move(i, *entry[2])
+            elif operator in INT_OPERATIONS:
+                self.fold_arithmetic(i, operator, *entry[2])
+            elif operator in REGISTER_PRESERVING_OPERATORS:
+                self.read_all()
+            else:
+                self.read_all()
+                self.constants.clear()
+
+    def read(self, reg):
+        self.pending.pop(reg, None)
+        self.offsets.pop(reg, None)
+
+    def read_all(self):
+        self.pending.clear()
+        self.offsets.clear()
+
+    def read_operand(self, operand):
+        if operand.kind in ("int", "float"):
+            self.read(operand.base)
+        elif operand.kind == "literal":
+            return
+        else:
+            self.read_all()
+
+    def known(self, operand):
+        if operand.kind == "literal":
+            return operand.value
+        if operand.kind in ("int", "float"):
+            return self.constants.get(operand.base)
+        return None
+
+    def overwrite(self, i, reg, removable):
+        if reg in self.pending:
+            self.remove(self.pending[reg])
+        self.offsets.pop(reg, None)
+        if removable:
+            self.pending[reg] = i
+        else:
+            self.pending.pop(reg, None)
+
+    def remove(self, i):
+        self.optimizer.record(i, None)
+        self.program[i] = self.compiler.nop()
+
+    def rewrite(self, i, operator, args):
+        self.program[i] = self.compiler.encode(operator, args)
+        self.optimizer.record(i, instruction_text(operator, args))
+
+    def fold_move(self, i, dest, src):
+        if dest.kind not in ("int", "float"):
+            self.read_operand(src)
+            if dest.kind != "vector":
+                self.read_all()
+            return
+        reg = dest.base
+        value = self.known(src)
+        self.read_operand(src)
+        if value is not None:
+            value = self.convert(dest.kind, value)
+        if value is None:
+            self.constants.pop(reg, None)
+            removable = src.kind == dest.kind or (src.kind == "int" and dest.kind == "float")
+            self.overwrite(i, reg, removable and src.base != reg)
+            return
+        if src.kind != "literal":
+            self.rewrite(i, "MOVE", (dest, literal(value)))
+        self.constants[reg] = value
+        self.overwrite(i, reg, True)
+
+    def fold_arithmetic(self, i, operator, dest, src):
+        if dest.kind not in ("int", "float"):
+            self.read_all()
+            return
+        reg = dest.base
+        src_value = self.known(src)
+        dest_value = self.constants.get(reg)
+        if src_value is not None and dest_value is not None:
+            result = self.evaluate(operator, dest.kind, dest_value, src_value)
+            if result is not None:
+                self.read_operand(src)
+                self.rewrite(i, "MOVE", (dest, literal(result)))
+                self.constants[reg] = result
+                self.overwrite(i, reg, True)
+                return
+        if src_value is not None and IDENTITY_OPERANDS.get(operator) == src_value:
+            if dest.kind == "int" or operator in ("MUL", "DIV"):
+                self.remove(i)
+                return
+        if dest.kind == "int" and src.kind in ("int", "literal"):
+            if (operator, dest_value) in (("ADD", 0), ("MUL", 1)):
+                self.read_operand(src)
+                self.rewrite(i, "MOVE", (dest, src))
+                self.constants.pop(reg, None)
+                self.overwrite(i, reg, True)
+                return
+            if operator == "MUL" and 0 in (dest_value, src_value):
+                self.read_operand(src)
+                self.rewrite(i, "MOVE", (dest, literal(0)))
+                self.constants[reg] = 0
+                self.overwrite(i, reg, True)
+                return
+        if dest.kind == "int" and src.kind == "literal" and operator in ("ADD", "SUB"):
+            if self.merge_offset(i, operator, dest, src.value):
+                return
+        if src_value is not None and src.kind != "literal":
+            src = literal(src_value)
+            self.rewrite(i, operator, (dest, src))
+        self.read_operand(src)
+        self.read(reg)
+        self.constants.pop(reg, None)
+        if dest.kind == "int" and src.kind in ("int", "literal") and operator in ("ADD", "SUB", "MUL"):
+            self.pending[reg] = i
+            if src.kind == "literal" and operator in ("ADD", "SUB"):
+                self.offsets[reg] = (i, src.value if operator == "ADD" else -src.value)
+
+    def merge_offset(self, i, operator, dest, value):
+        reg = dest.base
+        if reg not in self.offsets:
+            return False
+        previous, delta = self.offsets.pop(reg)
+        delta += value if operator == "ADD" else -value
+        self.pending.pop(reg, None)
+        self.remove(previous)
+        self.constants.pop(reg, None)
+        if delta == 0:
+            self.remove(i)
+            return True
+        self.rewrite(i, "ADD", (dest, literal(int(delta))))
+        self.pending[reg] = i
+        self.offsets[reg] = (i, delta)
+        return True
+
+
+class DeadStoreEliminator:
+    level = 2
+
+    def __init__(self, optimizer):
+        self.optimizer = optimizer
+        self.compiler = optimizer.compiler
+        self.program = optimizer.compiler.program
+
+    def run(self):
+        liveness = Liveness(self.compiler).analyze()
+        while self.eliminate(liveness):
+            liveness = Liveness(self.compiler).analyze()
+        self.remove_push_pop_pairs(liveness)
+
+    def remove(self, i):
+        self.optimizer.record(i, None)
+        self.program[i] = self.compiler.nop()
+
+    def eliminate(self, liveness):
+        changed = False
+        for block in liveness.blocks:
+            start, end = block
+            live = set(liveness.live_out[block])
+            for i in range(end - 1, start - 1, -1):
+                entry = self.program[i]
+                if entry is None:
+                    if liveness.in_function(i):
+                        live = set(liveness.everything)
+                    continue
+                uses, kills, removable = liveness.effects(entry)
+                if removable and kills and not kills & live:
+                    self.remove(i)
+                    changed = True
+                    continue
+                live -= kills
+                live |= uses
+        return changed
+
+    def remove_push_pop_pairs(self, liveness):
+        for start, end in liveness.blocks:
+            for i in range(start, end):
+                entry = self.program[i]
+                if entry is None or entry[0] != "PUSH" or entry[2][0] not in self.compiler.reg_names:
+                    continue
+                key = entry[2][0]
+                for j in range(i + 1, end):
+                    other = self.program[j]
+                    if other is None:
+                        break
+                    if other[0] == "POP" and other[2] == (key,):
+                        self.remove(i)
+                        self.remove(j)
+                        break
+                    if other[0] in STACK_OPERATORS + TERMINATORS or key in liveness.written(other):
+                        break
+
+
+class VariablePromoter:
+    level = 2
+    scalar_kinds = ("int", "float", "literal", "variable")
+
+    def __init__(self, optimizer):
+        self.optimizer = optimizer
+        self.compiler = optimizer.compiler
+        self.program = optimizer.compiler.program
+        self.variables = optimizer.compiler.resolver.variables - set(optimizer.compiler.reg_names)
+        self.liveness = Liveness(optimizer.compiler)
+
+    def run(self):
+        if uses_cores(self.program):
+            self.optimizer.note("variables not promoted to shadow registers because the program uses SPAWN")
+            return
+        promoted = set()
+        for start, end in self.loops():
+            if all(self.promotable(self.program[i]) for i in range(start, end + 1)):
+                names = set()
+                for i in range(start, end + 1):
+                    names |= self.promote(i)
+                if names:
+                    promoted.update(range(start, end + 1))
+                    self.optimizer.note(f"{self.optimizer.lines(start, end)}: promoted {', '.join(sorted(names))} "
+                                        f"to shadow registers")
+        if not promoted:
+            return
+        for i, entry in enumerate(self.program):
+            if i not in promoted and entry is not None and self.touches_memory(entry):
+                operator, handler, args = entry
+                self.program[i] = operator, self.compiler.shadow.guard(handler), args
+
+    def loops(self):
+        loops = []
+        for i, entry in enumerate(self.program):
+            if entry is not None and entry[0] in JUMP_OPERATORS:
+                target = jump_target(self.compiler, entry[2][-1])
+                if target is not None and target <= i:
+                    loops.append((target, i))
+        return loops
+
+    def mentions_variable(self, text):
+        return bool(self.liveness.text_uses(text) & self.variables)
+
+    def operand_allowed(self, operand):
+        if operand.kind == "element":
+            return operand.index_kind != "variable"
+        if operand.kind == "vector_literal":
+            return all(token.kind in ("int", "float", "literal") for token in operand.value)
+        return operand.kind in ("vector", "shadow") + self.scalar_kinds
+
+    def promotable(self, entry):
+        if entry is None or entry[0] in SKIPPED_OPERATORS + JUMP_OPERATORS:
+            return True
+        operator, handler, args = entry
+        if operator in ("PRINT", "PRINTF"):
+            return not self.mentions_variable(args[0]) if args else True
+        if operator == "TEXT":
+            return True
+        if operator == "MOVE" and args[0].kind == "variable":
+            return args[1].kind in ("element",) + self.scalar_kinds and self.operand_allowed(args[1])
+        if operator == "MOVE" or operator in INT_OPERATIONS:
+            return all(self.operand_allowed(arg) for arg in args)
+        return False
+
+    def touches_memory(self, entry):
+        operator, handler, args = entry
+        if operator in SKIPPED_OPERATORS + JUMP_OPERATORS + ("TEXT",):
+            return False
+        if operator in ("PRINT", "PRINTF"):
+            return self.mentions_variable(args[0]) if args else False
+        if operator == "MOVE" or operator in INT_OPERATIONS:
+            return any(self.liveness.operand_uses(arg) & self.variables for arg in args)
+        return True
+
+    def shadowed(self, operand):
+        if operand.kind == "variable":
+            return self.compiler.shadow.operand(operand.base)
+        return operand
+
+    def promote(self, i):
+        entry = self.program[i]
+        if entry is None or not (entry[0] == "MOVE" or entry[0] in INT_OPERATIONS):
+            return set()
+        operator, handler, args = entry
+        names = set()
+        for arg in args:
+            names |= self.liveness.operand_uses(arg) & self.variables
+        if names:
+            self.program[i] = self.compiler.encode(operator, tuple(self.shadowed(arg) for arg in args))
+        return names
+
+
+class Inliner:
+    level = 3
+
+    def __init__(self, optimizer):
+        self.optimizer = optimizer
+        self.compiler = optimizer.compiler
+        self.program = optimizer.compiler.program
+
+    def run(self):
+        recursive = recursive_functions(self.compiler)
+        candidates = {}
+        for name in self.compiler.functions:
+            if name not in recursive:
+                inlined = InlinedCall(self.compiler, name)
+                if inlined.inlinable() and inlined.size() <= self.compiler.inline_limit:
+                    candidates[name] = inlined
+        changed = True
+        while changed:
+            changed = False
+            for i, entry in enumerate(self.program):
+                if entry is None or entry[0] != "CALL" or entry[2][0] not in candidates:
+                    continue
+                inlined = candidates[entry[2][0]]
+                if any(inner[0] == "CALL" and inner[2][0] in candidates for inner in inlined.entries):
+                    continue
+                self.program[i] = "INLINE", InlinedCall.run, (inlined,)
+                self.optimizer.note(f"{self.optimizer.lines(i)}: inlined {inlined.name} ({inlined.size()} instructions)")
+                changed = True
+            for name in list(candidates):
+                candidates[name] = InlinedCall(self.compiler, name)
+
+
+class Memoizer:
+    level = 3
+
+    def __init__(self, optimizer):
+        self.optimizer = optimizer
+        self.compiler = optimizer.compiler
+        self.program = optimizer.compiler.program
+        self.liveness = Liveness(optimizer.compiler)
+
+    def run(self):
+        found = {}
+        memos = {}
+        for name in sorted(pure_functions(self.compiler, self.liveness)):
+            register_sets(self.compiler, self.liveness, name, found)
+        for i, entry in enumerate(self.program):
+            if entry is not None and entry[0] == "CALL" and entry[2][0] in found:
+                name = entry[2][0]
+                if name not in memos:
+                    reads, writes = found[name]
+                    memos[name] = MemoizedCall(self.compiler, name, reads, writes, self.compiler.memo_size)
+                memo = memos[name]
+                self.program[i] = "MEMO", MemoizedCall.run, (memo,)
+                registers = ', '.join(memo.key_registers) or 'no registers'
+                self.optimizer.note(f"{self.optimizer.lines(i)}: memoized {memo.name} on {registers}")
+        self.compiler.memos.update(sorted(memos.items()))
+
+
+class LoopUnroller:
+    level = 3
+
+    def __init__(self, optimizer):
+        self.optimizer = optimizer
+        self.compiler = optimizer.compiler
+        self.program = optimizer.compiler.program
+        self.liveness = Liveness(optimizer.compiler)
+
+    def run(self):
+        for i, entry in enumerate(self.program):
+            if entry is None or entry[0] not in JUMP_OPERATORS:
+                continue
+            head = jump_target(self.compiler, entry[2][-1])
+            if head is None or head > i or self.program[head] is None or self.program[head][0] == "LOOP":
+                continue
+            loop = find_counted_loop(self.compiler, self.liveness, head, i)
+            if loop is None:
+                continue
+            loop.build(self.compiler.unroll)
+            self.program[head] = "LOOP", loop.run, ()
+            message = f"{self.optimizer.lines(head, i)}: counted loop on {loop.counter} unrolled x{loop.factor}"
+            for register, step in loop.inductions:
+                message += f", {register} {step:+d} per iteration folded into one update"
+            self.optimizer.note(message)
+
+
+class Optimizer:
+    passes = [ConstantFolder, DeadStoreEliminator, VariablePromoter, Inliner, Memoizer, LoopUnroller]
+
+    def __init__(self, compiler):
+        self.compiler = compiler
+        self.report = []
+        self.current = {}
+
+    def optimize(self, level):
+        for optimization in self.passes:
+            if level >= optimization.level:
+                optimization(self).run()
+
+    def record(self, index, change):
+        before = self.current.get(index, self.compiler.asm[index].strip())
+        self.current[index] = change
+        self.report.append(f"{self.lines(index)}: {before} -> {'removed' if change is None else change}")
+
+    def lines(self, start, end=None):
+        first = self.compiler.source_line(start)
+        last = first if end is None else self.compiler.source_line(end)
+        return f"line {first}" if first == last else f"lines {first}-{last}"
+
+    def note(self, message):
+        self.report.append(message)
+
+    def diff(self):
+        lines = []
+        for index in sorted(self.current):
+            lines.append(f"@@ {self.lines(index)} @@")
+            lines.append(f"-{self.compiler.asm[index].strip()}")
+            if self.current[index] is not None:
+                lines.append(f"+{self.current[index]}")
+        return lines
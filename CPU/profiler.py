@@ -0,0 +1,106 @@
+import os
+import signal
+import threading
+from collections import Counter
+
+
+def enclosing_labels(compiler):
+    size = len(compiler.program)
+    owners = [None] * size
+    for name, (start, end) in compiler.functions.items():
+        for i in range(start, min(end + 1, size)):
+            owners[i] = name
+    sites = {i: name for i, name in compiler.label_sites if not any(c.isspace() for c in name)}
+    current, labels = {}, []
+    for i, owner in enumerate(owners):
+        if i in sites:
+            current[owner] = sites[i]
+        labels.append(current.get(owner))
+    return owners, labels
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.001):
+        self.interval = max(interval, 0.0001)
+        self.compiler = None
+        self.root = None
+        self.owners = []
+        self.labels = []
+        self.stacks = {}
+        self.samples = Counter()
+        self.previous = None
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def attach(self, compiler):
+        self.compiler = compiler
+        self.root = os.path.basename(compiler.file_path)
+        self.owners, self.labels = enclosing_labels(compiler)
+        compiler.hooks.on("call", self.call)
+        compiler.hooks.on("return", self.ret)
+        return self
+
+    def stack(self):
+        cores = self.compiler.cores
+        number = cores.current.number if cores is not None else None
+        if number not in self.stacks:
+            self.stacks[number] = []
+        return self.stacks[number]
+
+    def call(self, name, index):
+        self.stack().append((name, index))
+
+    def ret(self, name, index):
+        stack = self.stack()
+        if stack:
+            stack.pop()
+
+    def sample(self):
+        compiler = self.compiler
+        index = compiler.instruction_index
+        frames = [self.root]
+        if compiler.cores is not None:
+            frames.append(f"core {compiler.cores.current.number}")
+        stack = self.stack()
+        if stack and stack[-1][1] == index:
+            stack = stack[:-1]
+        frames.extend(name for name, site in stack)
+        if 0 <= index < len(self.labels):
+            owner = self.owners[index]
+            if owner is not None and (not stack or stack[-1][0] != owner):
+                frames.append(owner)
+            if self.labels[index] is not None:
+                frames.append(self.labels[index])
+        self.samples[";".join(frames)] += 1
+
+    def on_signal(self, signum, frame):
+        self.sample()
+
+    def poll(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        if hasattr(signal, "setitimer"):
+            self.previous = signal.signal(signal.SIGPROF, self.on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        else:
+            self.thread = threading.Thread(target=self.poll, daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        if self.thread is not None:
+            self.stopped.set()
+            self.thread.join()
+            self.thread = None
+        elif self.previous is not None:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, self.previous)
+            self.previous = None
+
+    def save(self, path):
+        with open(path, 'w') as file:
+            for stack, count in sorted(self.samples.items()):
+                file.write(f"{stack} {count}\n")
+        return path
@@ -0,0 +1,77 @@
+import json
+from collections import Counter
+
+SYNTHETIC_OPERATORS = ("NOP", "LOOP", "INLINE", "MEMO")
+
+
+class ResourceStats:
+    def __init__(self):
+        self.compiler = None
+        self.operators = []
+        self.counts = []
+        self.taken = 0
+        self.not_taken = 0
+        self.cells = set()
+        self.allocations = 0
+        self.allocated = 0
+        self.peak_memory = 0
+        self.peak_stack = 0
+        self.wraps = 0
+
+    def attach(self, compiler):
+        self.compiler = compiler
+        self.operators = [None if entry is None else entry[0] for entry in compiler.program]
+        self.counts = [0] * len(self.operators)
+        self.peak_memory = compiler.memory_index
+        hooks = compiler.hooks
+        hooks.on("instruction", self.step)
+        hooks.on("jump", self.jump)
+        hooks.on("memory", self.memory_write)
+        hooks.on("allocate", self.allocation)
+        hooks.on("overflow", self.overflow)
+        return self
+
+    def step(self, index):
+        self.counts[index] += 1
+        if self.compiler.stack_index > self.peak_stack:
+            self.peak_stack = self.compiler.stack_index
+
+    def jump(self, index, target, taken):
+        if taken:
+            self.taken += 1
+        else:
+            self.not_taken += 1
+
+    def memory_write(self, address, value):
+        self.cells.add(address)
+
+    def allocation(self, head, size):
+        self.allocations += 1
+        self.allocated += size
+        self.peak_memory = max(self.peak_memory, head + size)
+
+    def overflow(self, register, value):
+        self.wraps += 1
+
+    def report(self):
+        self.peak_stack = max(self.peak_stack, self.compiler.stack_index)
+        opcodes, synthetic = Counter(), Counter()
+        for operator, count in zip(self.operators, self.counts):
+            if count:
+                (synthetic if operator in SYNTHETIC_OPERATORS else opcodes)[operator] += count
+        return {
+            "program": self.compiler.file_path,
+            "instructions": sum(self.counts),
+            "opcodes": dict(opcodes.most_common()),
+            "synthetic_opcodes": dict(synthetic.most_common()),
+            "jumps": {"taken": self.taken, "not_taken": self.not_taken},
+            "memory": {"peak_index": self.peak_memory, "cells_written": len(self.cells),
+                       "allocations": self.allocations, "allocated_cells": self.allocated},
+            "stack": {"peak_depth": self.peak_stack},
+            "overflow_wraps": self.wraps,
+        }
+
+    def save(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.report(), file, indent=2)
+        return path
@@ -0,0 +1,182 @@
+import io
+import time
+from collections import deque
+
+from CPU.intrinsics import is_intrinsic
+from CPU.vasm_compiler import Compiler
+
+RUNNING = "running"
+BLOCKED = "blocked"
+FINISHED = "finished"
+
+BLOCKING_OPERATORS = ("INLINE", "LOOP")
+
+
+class Machine:
+    def __init__(self, file_path, priority=1, inputs=(), name=None, **options):
+        self.compiler = Compiler(file_path, run=False, **options)
+        self.name = name or file_path
+        self.priority = max(priority, 1)
+        self.inputs = deque(inputs)
+        self.output = io.StringIO()
+        self.frames = []
+        self.state = RUNNING
+        self.prompt = None
+        self.exit_code = None
+        self.executed = 0
+        self.slices = 0
+        self.elapsed = 0.0
+        compiler = self.compiler
+        compiler.output = self.output
+        compiler.input_source = self.take_input
+        compiler.program = [self.lower(entry) for entry in compiler.program]
+        compiler.instruction_index = 0
+
+    def lower(self, entry):
+        if entry is None or entry[0] not in BLOCKING_OPERATORS or not self.reads_input([entry]):
+            return entry
+        if entry[0] == "LOOP":
+            return entry[1].__self__.fallback
+        return "CALL", self.compiler.handle_call, (entry[2][0].name,)
+
+    def reads_input(self, entries):
+        program = self.compiler.program
+        for entry in entries:
+            if entry is None:
+                continue
+            if entry[0] == "INPUT":
+                return True
+            if entry[0] == "INLINE" and self.reads_input(entry[2][0].entries):
+                return True
+            if entry[0] == "LOOP":
+                loop = entry[1].__self__
+                if self.reads_input([loop.fallback] + [program[i] for i in loop.entries() if i != loop.head]):
+                    return True
+        return False
+
+    def give_input(self, value):
+        self.inputs.append(value)
+        if self.state == BLOCKED:
+            self.state = RUNNING
+
+    def take_input(self, text=""):
+        return self.inputs.popleft()
+
+    def read_output(self):
+        text = self.output.getvalue()
+        if text:
+            self.output.seek(0)
+            self.output.truncate()
+        return text
+
+    def fail(self, message):
+        self.guarded(self.compiler.report_error, message)
+
+    def run(self, limit):
+        if self.state != RUNNING:
+            return 0
+        start, executed = time.perf_counter(), self.executed
+        self.slices += 1
+        self.guarded(self.execute, limit)
+        self.elapsed += time.perf_counter() - start
+        return self.executed - executed
+
+    def guarded(self, function, *args):
+        try:
+            function(*args)
+        except SystemExit as exit:
+            self.state = FINISHED
+            self.exit_code = exit.code or 0
+
+    def execute(self, limit):
+        compiler = self.compiler
+        program = compiler.program
+        functions = compiler.functions
+        hooks = compiler.hooks
+        frames = self.frames
+        count = 0
+        try:
+            while count < limit:
+                index = compiler.instruction_index
+                if frames and (index > frames[-1][1] or program[index] is None or program[index][0] == "RETURN"):
+                    site = frames.pop()[0]
+                    if hooks.installed:
+                        hooks.leave(site, program[site][2][0])
+                    compiler.instruction_index = site + 1
+                    continue
+                if index >= len(program):
+                    compiler.shadow.spill()
+                    self.state = FINISHED
+                    self.exit_code = 0
+                    return
+                entry = program[index]
+                if entry is not None:
+                    operator = entry[0]
+                    if operator == "CALL" and not is_intrinsic(entry[2][0]) and entry[2][0] in functions:
+                        if hooks.installed:
+                            hooks.enter(index, entry[2][0])
+                        compiler.shadow.spill()
+                        start, end = functions[entry[2][0]]
+                        frames.append((index, end))
+                        compiler.instruction_index = start + 1
+                        count += 1
+                        continue
+                    if operator == "UNKNOWN" and frames:
+                        compiler.report_error(f"Unknown instruction: {entry[2][0]}")
+                    if operator == "INPUT":
+                        if self.prompt is None:
+                            self.prompt = entry[2][1] if len(entry[2]) > 1 else ""
+                            self.output.write(self.prompt)
+                        if not self.inputs:
+                            self.state = BLOCKED
+                            return
+                        self.prompt = None
+                    entry[1](*entry[2])
+                compiler.instruction_index += 1
+                count += 1
+        finally:
+            self.executed += count
+
+    def stats(self):
+        return {"name": self.name, "state": self.state, "priority": self.priority, "executed": self.executed,
+                "slices": self.slices, "seconds": self.elapsed, "exit_code": self.exit_code}
+
+
+class Scheduler:
+    def __init__(self, quantum=1000):
+        self.quantum = max(quantum, 1)
+        self.machines = []
+        self.finished = []
+        self.executed = 0
+
+    def spawn(self, file_path, priority=1, inputs=(), name=None, **options):
+        return self.add(Machine(file_path, priority, inputs, name, **options))
+
+    def add(self, machine):
+        self.machines.append(machine)
+        return machine
+
+    def runnable(self):
+        return [machine for machine in self.machines if machine.state == RUNNING]
+
+    def blocked(self):
+        return [machine for machine in self.machines if machine.state == BLOCKED]
+
+    def step(self):
+        executed = 0
+        for machine in self.runnable():
+            executed += machine.run(self.quantum * machine.priority)
+        done = [machine for machine in self.machines if machine.state == FINISHED]
+        if done:
+            self.machines = [machine for machine in self.machines if machine.state != FINISHED]
+            self.finished.extend(done)
+        self.executed += executed
+        return executed
+
+    def run(self):
+        while self.runnable():
+            self.step()
+        return self.finished
+
+    def stats(self):
+        return [machine.stats() for machine in self.finished + self.machines]
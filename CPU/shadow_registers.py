@@ -0,0 +1,84 @@
+from CPU.operand_resolver import Operand
+
+
+class ShadowSlot:
+    __slots__ = ("name", "shadow", "fallback", "active", "dirty", "head", "var_type", "value")
+
+    def __init__(self, name, shadow):
+        self.name = name
+        self.shadow = shadow
+        self.fallback = Operand(name, "variable", base=name)
+        self.active = False
+        self.dirty = False
+        self.head = None
+        self.var_type = None
+        self.value = None
+
+    def load(self):
+        compiler = self.shadow.compiler
+        head, buffer, var_type = compiler.lookup_variable(self.name)
+        if var_type not in ("int", "float"):
+            return False
+        self.head = head
+        self.var_type = var_type
+        self.value = compiler.CPU.return_memory(head)
+        self.active = True
+        self.shadow.active.append(self)
+        return True
+
+    def read(self):
+        if self.active or self.load():
+            return self.value
+        return self.shadow.compiler.operand_value(self.fallback)
+
+    def write(self, value):
+        compiler = self.shadow.compiler
+        if not (self.active or self.load()):
+            compiler.move_to_variable(self.fallback, value)
+            return
+        src_val = compiler.operand_value(value)
+        try:
+            num = float(src_val)
+        except (TypeError, ValueError):
+            compiler.report_error(f"Invalid source value: {src_val}")
+            return
+        if self.var_type == "float":
+            self.value = num
+        elif num.is_integer():
+            self.value = int(num)
+        else:
+            compiler.report_error(f"Type mismatch: expected integer, got {src_val}")
+        self.dirty = True
+
+
+class ShadowRegisters:
+    def __init__(self, compiler):
+        self.compiler = compiler
+        self.slots = {}
+        self.active = []
+
+    def slot(self, name):
+        if name not in self.slots:
+            self.slots[name] = ShadowSlot(name, self)
+        return self.slots[name]
+
+    def operand(self, name):
+        return Operand(name, "shadow", base=name, value=self.slot(name))
+
+    def spill(self):
+        for slot in self.active:
+            if slot.dirty:
+                self.compiler.CPU.update_memory(slot.head, slot.value)
+                slot.dirty = False
+            slot.active = False
+        self.active.clear()
+
+    def guard(self, handler):
+        active = self.active
+        spill = self.spill
+
+        def guarded(*args):
+            if active:
+                spill()
+            handler(*args)
+        return guarded
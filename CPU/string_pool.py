@@ -0,0 +1,42 @@
+import sys
+
+
+def is_string_data(data):
+    if data.replace('.', '', 1).isdigit() and data.count('.') < 2:
+        return False
+    return not data.isnumeric() and not (data.startswith("[") and data.endswith("]"))
+
+
+class StringPool:
+    def __init__(self, compiler):
+        self.compiler = compiler
+        self.constants = {}
+        self.texts = {}
+
+    def collect(self, program):
+        for entry in program:
+            if entry is None:
+                continue
+            operator, handler, args = entry
+            if operator == "VAR" and len(args) > 1 and is_string_data(args[1]):
+                self.intern(args[1])
+            elif operator == "MOVE" and args[1].kind == "text":
+                self.intern(args[1].text)
+
+    def intern(self, literal):
+        if literal not in self.constants:
+            text = sys.intern(literal.replace('"', ""))
+            self.constants[literal] = (text, tuple(ord(char) for char in text))
+        return self.constants[literal]
+
+    def codes(self, literal):
+        return self.intern(literal)[1]
+
+    def text(self, head, size):
+        cells = self.compiler.CPU.memory[head:head + size]
+        cached = self.texts.get(head)
+        if cached is not None and cached[0] == cells:
+            return cached[1]
+        text = "".join(map(chr, cells))
+        self.texts[head] = (cells, text)
+        return text
@@ -0,0 +1,151 @@
+import json
+
+from CPU.operand_resolver import register_kind
+from CPU.profiler import enclosing_labels
+
+DEFAULT_CYCLES = 1
+OPCODE_CYCLES = {"LABEL": 0, "MUL": 3, "DIV": 12, "MOD": 12, "CALL": 2, "PUSH": 2, "POP": 2, "PUSHA": 4, "POPA": 4,
+                 "DOT": 4, "MAG": 6, "NORM": 8, "HSUM": 3, "HMIN": 3, "HMAX": 3, "FMA": 4, "SHUF": 2, "SPAWN": 20,
+                 "JOIN": 4, "BARRIER": 4, "XADD": 4, "XCHG": 4, "CAS": 4}
+OPERAND_CYCLES = {"register": 0, "immediate": 0, "memory": 0, "vector": 2}
+CACHE = {"lines": 64, "line_size": 4, "ways": 2, "hit": 1, "miss": 20}
+
+
+def is_cycles(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+
+
+def check_costs(config, key, known=None):
+    costs = config.get(key, {})
+    if not isinstance(costs, dict):
+        raise ValueError(f"Timing config '{key}' must be an object")
+    for name, cycles in costs.items():
+        if known is not None and name not in known:
+            raise ValueError(f"Unknown timing config {key} key '{name}', expected one of {', '.join(known)}")
+        if not is_cycles(cycles):
+            raise ValueError(f"Timing config {key}.{name} must be a non-negative number, got {cycles!r}")
+
+
+def load_config(path):
+    with open(path) as file:
+        config = json.load(file)
+    if not isinstance(config, dict):
+        raise ValueError("Timing config must be a JSON object")
+    unknown = set(config) - {"default", "opcodes", "operands", "cache"}
+    if unknown:
+        raise ValueError(f"Unknown timing config keys: {', '.join(sorted(unknown))}")
+    if not is_cycles(config.get("default", DEFAULT_CYCLES)):
+        raise ValueError(f"Timing config default must be a non-negative number, got {config['default']!r}")
+    check_costs(config, "opcodes")
+    check_costs(config, "operands", OPERAND_CYCLES)
+    check_costs(config, "cache", CACHE)
+    for key in ("lines", "line_size", "ways"):
+        value = config.get("cache", {}).get(key, CACHE[key])
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            raise ValueError(f"Timing config cache.{key} must be a positive integer, got {value!r}")
+    return config
+
+
+class DataCache:
+    def __init__(self, lines=64, line_size=4, ways=2):
+        self.line_size = max(line_size, 1)
+        self.ways = max(min(ways, lines), 1)
+        self.sets = [[] for _ in range(max(lines // self.ways, 1))]
+
+    def access(self, address):
+        line = address // self.line_size
+        tags = self.sets[line % len(self.sets)]
+        tag = line // len(self.sets)
+        if tag in tags:
+            tags.remove(tag)
+            tags.append(tag)
+            return True
+        if len(tags) >= self.ways:
+            tags.pop(0)
+        tags.append(tag)
+        return False
+
+
+class TimingModel:
+    def __init__(self, config=None):
+        config = config or {}
+        self.default = config.get("default", DEFAULT_CYCLES)
+        self.opcodes = dict(OPCODE_CYCLES, **config.get("opcodes", {}))
+        self.operands = dict(OPERAND_CYCLES, **config.get("operands", {}))
+        cache = dict(CACHE, **config.get("cache", {}))
+        self.cache = DataCache(cache["lines"], cache["line_size"], cache["ways"])
+        self.hit = cache["hit"]
+        self.miss = cache["miss"]
+        self.compiler = None
+        self.costs = []
+        self.scopes = []
+        self.cycles = []
+        self.executed = []
+        self.accesses = []
+        self.hits = []
+
+    def attach(self, compiler):
+        self.compiler = compiler
+        self.costs = [self.cost(compiler, i, entry) for i, entry in enumerate(compiler.program)]
+        owners, labels = enclosing_labels(compiler)
+        self.scopes = [label or owner or "<top>" for owner, label in zip(owners, labels)]
+        size = len(compiler.program)
+        self.cycles, self.executed, self.accesses, self.hits = [0] * size, [0] * size, [0] * size, [0] * size
+        compiler.hooks.on("instruction", self.step)
+        compiler.hooks.on("memory", self.memory_access)
+        compiler.hooks.on("read", self.memory_access)
+        return self
+
+    def cost(self, compiler, index, entry):
+        if entry is None:
+            return 0
+        cycles = self.opcodes.get(entry[0], self.default)
+        parts = compiler.asm[index].strip().split(" ", 1)
+        if len(parts) > 1:
+            for operand in parts[1].split(","):
+                cycles += self.operands[self.operand_kind(compiler, operand.strip())]
+        return cycles
+
+    def operand_kind(self, compiler, text):
+        base = text.split("[", 1)[0]
+        if base in compiler.reg_names:
+            return "vector" if register_kind(base) == "vector" else "register"
+        if base in compiler.resolver.variables:
+            return "memory"
+        if text.startswith("["):
+            return "vector"
+        return "immediate"
+
+    def step(self, index):
+        self.executed[index] += 1
+        self.cycles[index] += self.costs[index]
+
+    def memory_access(self, address, value):
+        self.access(address)
+
+    def access(self, address):
+        index = self.compiler.instruction_index
+        if not 0 <= index < len(self.accesses):
+            return
+        self.accesses[index] += 1
+        if self.cache.access(address):
+            self.hits[index] += 1
+            self.cycles[index] += self.hit
+        else:
+            self.cycles[index] += self.miss
+
+    def report(self):
+        scopes = {}
+        for i, scope in enumerate(self.scopes):
+            if self.executed[i] or self.accesses[i]:
+                totals = scopes.setdefault(scope, [0, 0, 0, 0])
+                totals[0] += self.cycles[i]
+                totals[1] += self.executed[i]
+                totals[2] += self.accesses[i]
+                totals[3] += self.hits[i]
+        totals = [sum(self.cycles), sum(self.executed), sum(self.accesses), sum(self.hits)]
+        rows = sorted(scopes.items(), key=lambda item: -item[1][0]) + [("total", totals)]
+        return [{"label": scope, "cycles": cycles, "instructions": executed,
+                 "cpi": cycles / executed if executed else 0.0, "accesses": accesses,
+                 "hit_rate": hits / accesses if accesses else 0.0}
+                for scope, (cycles, executed, accesses, hits) in rows]
@@ -0,0 +1,198 @@
+import json
+import struct
+from collections import Counter
+
+MAGIC = b"VTRC"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQQI")
+RECORD = struct.Struct("<BBHId")
+REGISTERS = ["I1", "I2", "I3", "I4", "I5", "I6", "FF1", "FF2", "FF3", "FF4", "FF5", "FF6", "V1", "V2", "V3", "V4",
+             "V5", "V6"]
+REGISTER_IDS = {name: i for i, name in enumerate(REGISTERS)}
+
+STEP = 0
+INT = 1
+FLOAT = 2
+VECTOR = 3
+MEMORY = 4
+CHECKPOINT = 5
+
+MEMORY_INT = 0
+MEMORY_FLOAT = 1
+MEMORY_EMPTY = 2
+
+
+def memory_record(address, value):
+    if value is None:
+        return MEMORY, MEMORY_EMPTY, 0, address, 0.0
+    if isinstance(value, int):
+        return MEMORY, MEMORY_INT, 0, address, float(value)
+    return MEMORY, MEMORY_FLOAT, 0, address, float(value)
+
+
+def register_records(register, value):
+    reg = REGISTER_IDS[register]
+    if register.startswith("V"):
+        return [(VECTOR, reg, i, len(value), float(x)) for i, x in enumerate(value)]
+    return [(INT if register.startswith("I") else FLOAT, reg, 0, 0, float(value))]
+
+
+class TraceRecorder:
+    def __init__(self, capacity=1 << 16, checkpoints=4):
+        self.capacity = max(capacity, 1)
+        self.buffer = bytearray(RECORD.size * self.capacity)
+        self.written = 0
+        self.steps = 0
+        self.interval = max(self.capacity // max(checkpoints, 1), 1)
+        self.checkpoints = []
+        self.compiler = None
+
+    def attach(self, compiler):
+        self.compiler = compiler
+        hooks = compiler.hooks
+        hooks.on("instruction", self.step)
+        hooks.on("register", self.register_write)
+        hooks.on("memory", self.memory_write)
+        self.checkpoint()
+        return self
+
+    def record(self, kind, reg, aux, index, value):
+        RECORD.pack_into(self.buffer, (self.written % self.capacity) * RECORD.size, kind, reg, aux, index, value)
+        self.written += 1
+
+    def register_write(self, register, value):
+        if register in REGISTER_IDS:
+            for record in register_records(register, value):
+                self.record(*record)
+
+    def memory_write(self, address, value):
+        self.record(*memory_record(address, value))
+
+    def step(self, index):
+        if self.written - self.checkpoints[-1][0] >= self.interval:
+            self.checkpoint()
+        self.record(STEP, 0, 0, index, self.steps)
+        self.steps += 1
+
+    def checkpoint(self):
+        cpu = self.compiler.CPU
+        records = []
+        for register in REGISTERS:
+            records.extend(register_records(register, cpu.return_register(register)))
+        records.extend(memory_record(address, value) for address, value in enumerate(cpu.memory) if value is not None)
+        self.checkpoints.append((self.written, b"".join(RECORD.pack(*record) for record in records), len(records)))
+        oldest = self.written - self.capacity
+        while len(self.checkpoints) > 1 and self.checkpoints[0][0] < oldest:
+            self.checkpoints.pop(0)
+
+    def records(self):
+        count = min(self.written, self.capacity)
+        start = (self.written - count) % self.capacity * RECORD.size
+        return bytes(self.buffer[start:]) + bytes(self.buffer[:start]) if count == self.capacity else \
+            bytes(self.buffer[:count * RECORD.size])
+
+    def save(self, path):
+        compiler = self.compiler
+        oldest = self.written - min(self.written, self.capacity)
+        checkpoints = [checkpoint for checkpoint in self.checkpoints if checkpoint[0] >= oldest]
+        lines = [[str(location), line.strip()] for location, line in zip(compiler.locations, compiler.asm)]
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, self.capacity, self.written, self.steps,
+                                   len(checkpoints)))
+            file.write(self.records())
+            for seq, records, count in checkpoints:
+                file.write(RECORD.pack(CHECKPOINT, 0, 0, count, seq))
+                file.write(records)
+            file.write(json.dumps({"program": compiler.file_path, "lines": lines}).encode())
+        return path
+
+
+class TraceReader:
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            data = file.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path} is not a VASM trace")
+        magic, version, size, self.capacity, self.written, self.steps, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            raise ValueError(f"{path} is not a VASM trace")
+        offset = HEADER.size
+        retained = min(self.written, self.capacity)
+        self.first = self.written - retained
+        if len(data) < offset + retained * size:
+            raise ValueError(f"{path} is truncated inside its records")
+        self.records = list(RECORD.iter_unpack(data[offset:offset + retained * size]))
+        offset += retained * size
+        self.checkpoints = []
+        for _ in range(count):
+            if len(data) < offset + size:
+                raise ValueError(f"{path} is truncated inside its checkpoints")
+            kind, reg, aux, length, seq = RECORD.unpack_from(data, offset)
+            offset += size
+            if len(data) < offset + length * size:
+                raise ValueError(f"{path} is truncated inside its checkpoints")
+            state = list(RECORD.iter_unpack(data[offset:offset + length * size]))
+            offset += length * size
+            self.checkpoints.append((int(seq), state))
+        try:
+            trailer = json.loads(data[offset:].decode())
+        except ValueError:
+            raise ValueError(f"{path} is truncated inside its program listing") from None
+        if not isinstance(trailer, dict) or not isinstance(trailer.get("program"), str) or \
+                not isinstance(trailer.get("lines"), list):
+            raise ValueError(f"{path} has no program listing")
+        self.program = trailer["program"]
+        self.lines = trailer["lines"]
+        self.step_positions = {int(record[4]): self.first + i for i, record in enumerate(self.records)
+                               if record[0] == STEP}
+
+    def describe(self, index):
+        if 0 <= index < len(self.lines):
+            location, text = self.lines[index]
+            return f"{location}  {text}"
+        return f"instruction {index}"
+
+    def executed(self):
+        return [(int(record[4]), record[3]) for record in self.records if record[0] == STEP]
+
+    def state_at(self, step):
+        if step not in self.step_positions:
+            raise ValueError(f"Step {step} is not in the trace")
+        end = self.step_positions[step] + 1
+        while end - self.first < len(self.records) and self.records[end - self.first][0] != STEP:
+            end += 1
+        usable = [checkpoint for checkpoint in self.checkpoints if checkpoint[0] <= self.step_positions[step]]
+        if not usable:
+            raise ValueError(f"Step {step} was recorded before the oldest checkpoint")
+        seq, state = usable[-1]
+        registers = {name: [] if name.startswith("V") else 0 for name in REGISTERS}
+        memory = {}
+        self.apply(registers, memory, state)
+        self.apply(registers, memory, self.records[seq - self.first:end - self.first])
+        return registers, memory
+
+    def apply(self, registers, memory, records):
+        for kind, reg, aux, index, value in records:
+            if kind == INT:
+                registers[REGISTERS[reg]] = int(value)
+            elif kind == FLOAT:
+                registers[REGISTERS[reg]] = value
+            elif kind == VECTOR:
+                vector = registers[REGISTERS[reg]]
+                del vector[index:]
+                vector.extend([0.0] * (index - len(vector)))
+                vector[aux] = value
+            elif kind == MEMORY:
+                if reg == MEMORY_EMPTY:
+                    memory.pop(index, None)
+                else:
+                    memory[index] = int(value) if reg == MEMORY_INT else value
+
+    def hot_instructions(self, top=10):
+        return Counter(index for step, index in self.executed()).most_common(top)
+
+    def hot_jumps(self, top=10):
+        executed = self.executed()
+        edges = Counter((previous[1], current[1]) for previous, current in zip(executed, executed[1:])
+                        if current[0] == previous[0] + 1 and current[1] != previous[1] + 1)
+        return edges.most_common(top)
@@ -0,0 +1,215 @@
+import os
+
+from CPU import aot_runtime
+from CPU.aot_runtime import f32, wrap
+from CPU.control_flow import JUMP_OPERATORS, basic_blocks, jump_target
+from CPU.intrinsics import INTRINSIC_PREFIX, INTRINSICS, is_intrinsic
+
+BUILTIN_INTRINSICS = ("SORT", "ISQRT", "SQRT", "FACT", "ABS")
+JUMP_CONDITIONS = {"JZ": "== 0", "JNZ": "!= 0", "JG": "> 0", "JGE": ">= 0", "JL": "< 0", "JLE": "<= 0"}
+REGISTER_TABLES = {"int": "i", "float": "f", "vector": "v"}
+INLINE_OPERATORS = {"ADD": "+", "SUB": "-", "MUL": "*"}
+TEXT_HANDLERS = {"STORE": "store", "LOADM": "load", "TEXT": "text", "VAR": "set_var", "INPUT": "input",
+                 "PUSH": "push", "POP": "pop", "PUSHA": "push_all", "POPA": "pop_all", "DOT": "dot", "MAG": "mag",
+                 "NORM": "norm", "HSUM": "hsum", "HMIN": "hmin", "HMAX": "hmax", "FMA": "fma", "BCAST": "bcast",
+                 "SHUF": "shuf"}
+
+
+class Translator:
+    def __init__(self, compiler):
+        self.compiler = compiler
+        self.program = compiler.program
+        self.operands = {}
+        self.function_ranges = list(compiler.functions.values())
+
+    def report_error(self, index, message):
+        self.compiler.instruction_index = index
+        self.compiler.report_error(message)
+
+    def in_function(self, index):
+        return any(start < index <= end for start, end in self.function_ranges)
+
+    def source_entry(self, entry):
+        operator = entry[0]
+        if operator == "LOOP":
+            return entry[1].__self__.fallback
+        if operator in ("INLINE", "MEMO"):
+            return "CALL", None, (entry[2][0].name,)
+        return entry
+
+    def operand(self, operand):
+        key = id(operand)
+        if key not in self.operands:
+            if operand.kind == "shadow":
+                operand = operand.value.fallback
+            value = operand.value
+            if operand.kind == "vector_literal":
+                value = "[" + ", ".join(self.operand(token) for token in value) + "]"
+            else:
+                value = repr(value)
+            name = f"O{len(self.operands)}"
+            self.operands[key] = name, (f"{name} = Operand({operand.text!r}, {operand.kind!r}, {operand.base!r}, "
+                                        f"{operand.index!r}, {operand.index_kind!r}, {value})")
+        return self.operands[key][0]
+
+    def register_ref(self, operand):
+        return f"{REGISTER_TABLES[operand.kind]}[{operand.base!r}]"
+
+    def translate(self):
+        lines = [(str(location), line.strip()) for location, line in zip(self.compiler.locations, self.compiler.asm)]
+        blocks = basic_blocks(self.compiler)
+        bodies = [self.translate_block(start, end) for start, end in blocks]
+        with open(aot_runtime.__file__) as runtime:
+            source = [f"# Generated from {os.path.basename(self.compiler.file_path)} by the VASM translator.",
+                      runtime.read().rstrip(), "", ""]
+        source.append(f"LINES = {lines!r}")
+        source.extend(definition for name, definition in self.operands.values())
+        source.extend(["", ""])
+        for (start, end), body in zip(blocks, bodies):
+            source.append(f"def block_{start}(m):")
+            source.append("    i, f, v = m.i, m.f, m.v")
+            source.extend("    " + line for line in body)
+            source.extend(["", ""])
+        source.append("BLOCKS = {" + ", ".join(f"{start}: block_{start}" for start, end in blocks) + "}")
+        functions = {name: (start + 1, end) for name, (start, end) in self.compiler.functions.items()}
+        source.append(f"FUNCTIONS = {functions!r}")
+        source.extend(["", "", "def run_blocks(m, pc, end):",
+                       "    while pc is not None and pc <= end:",
+                       "        pc = BLOCKS[pc](m)",
+                       "", "",
+                       "def call(m, name):",
+                       "    start, end = FUNCTIONS[name]",
+                       "    m.depth += 1",
+                       "    run_blocks(m, start, end)",
+                       "    m.depth -= 1",
+                       "", "",
+                       "def main():",
+                       "    m = Machine(LINES)",
+                       f"    run_blocks(m, 0, {len(self.program) - 1})",
+                       "    return m",
+                       "", "",
+                       "if __name__ == \"__main__\":",
+                       "    main()", ""])
+        return "\n".join(source)
+
+    def write(self, path):
+        source = self.translate()
+        with open(path, "w") as file:
+            file.write(source)
+        return path
+
+    def translate_block(self, start, end):
+        body = []
+        for i in range(start, end):
+            entry = self.program[i]
+            if entry is None:
+                if self.in_function(i):
+                    body.append("if m.depth:")
+                    body.append("    return None")
+                continue
+            body.extend(self.translate_entry(i, self.source_entry(entry)))
+            if body and body[-1].startswith("return "):
+                return body
+        body.append(f"return {end}")
+        return body
+
+    def translate_entry(self, i, entry):
+        operator, handler, args = entry
+        line = f"m.line = {i}"
+        if operator in ("NOP", "LABEL"):
+            return []
+        if operator == "DEF":
+            return [f"return {self.compiler.functions[args[0]][1] + 1}"]
+        if operator == "RETURN":
+            return ["if m.depth:", "    return None", "m.warn('RETURN')"]
+        if operator == "UNKNOWN":
+            if self.in_function(i):
+                return ["if m.depth:", f"    {line}", f"    m.error({'Unknown instruction: ' + args[0]!r})",
+                        f"m.warn({args[0]!r})"]
+            return [f"m.warn({args[0]!r})"]
+        if operator == "CALL":
+            return self.translate_call(i, args[0])
+        if operator == "HALT":
+            return [f"m.halt({', '.join(repr(arg) for arg in args)})"]
+        if operator in JUMP_OPERATORS:
+            return self.translate_jump(i, operator, args)
+        if operator == "MOVE":
+            return self.translate_move(i, *args)
+        if operator in ("ADD", "SUB", "MUL", "DIV", "MOD"):
+            return self.translate_arithmetic(i, operator, *args)
+        if operator in ("PRINT", "PRINTF"):
+            end = ", '\\n'" if operator == "PRINTF" else ""
+            return [line, f"m.print({', '.join(repr(arg) for arg in args)}{end})"]
+        if operator in TEXT_HANDLERS:
+            return [line, f"m.{TEXT_HANDLERS[operator]}({', '.join(repr(arg) for arg in args)})"]
+        self.report_error(i, f"Cannot translate instruction {operator}")
+
+    def translate_call(self, i, name):
+        if is_intrinsic(name):
+            intrinsic = name[len(INTRINSIC_PREFIX):].upper()
+            if intrinsic not in INTRINSICS:
+                return [f"m.line = {i}", f"m.error({'Intrinsic ' + repr(name) + ' not found'!r})"]
+            if intrinsic not in BUILTIN_INTRINSICS:
+                self.report_error(i, f"Cannot translate intrinsic '{name}'")
+            return [f"m.line = {i}", f"m.intrinsic({intrinsic!r})"]
+        if name not in self.compiler.functions:
+            return [f"m.line = {i}", f"m.error({'Function ' + repr(name) + ' not found'!r})"]
+        start, end = self.compiler.functions[name]
+        for j in range(start + 1, end + 1):
+            entry = self.program[j]
+            if entry is not None and entry[0] in JUMP_OPERATORS:
+                target = jump_target(self.compiler, entry[2][-1])
+                if target is not None and not start < target <= end + 1:
+                    self.report_error(j, f"Cannot translate a jump out of function {name}")
+        return [f"call(m, {name!r})"]
+
+    def translate_jump(self, i, operator, args):
+        pos = args[-1]
+        target = jump_target(self.compiler, pos)
+        if target is None:
+            taken = [f"m.line = {i}", f"m.error({'Invalid type for ' + operator + ' operation. Got: ' + pos!r})"]
+        else:
+            taken = [f"return {target}"]
+        if operator == "JMP":
+            return taken
+        reg = args[0]
+        kind = {"I": "int", "F": "float", "V": "vector"}.get(reg[0]) if reg in aot_runtime.REGISTERS else None
+        value = f"{REGISTER_TABLES[kind]}[{reg!r}]" if kind else f"m.register({reg!r})"
+        return [f"if {value} {JUMP_CONDITIONS[operator]}:"] + ["    " + line for line in taken]
+
+    def translate_move(self, i, dest, src):
+        if dest.kind == "int":
+            if src.kind == "literal" and src.value.is_integer():
+                return [f"i[{dest.base!r}] = {wrap(int(src.value))!r}"]
+            if src.kind == "int":
+                return [f"i[{dest.base!r}] = i[{src.base!r}]"]
+        if dest.kind == "float":
+            if src.kind == "literal" and abs(src.value) < 3.4e38:
+                return [f"f[{dest.base!r}] = {f32(src.value)!r}"]
+            if src.kind == "float":
+                return [f"f[{dest.base!r}] = f[{src.base!r}]"]
+            if src.kind == "int":
+                return [f"f[{dest.base!r}] = f32(float(i[{src.base!r}]))"]
+        if dest.kind == "vector" and src.kind == "vector":
+            return [f"v[{dest.base!r}] = list(v[{src.base!r}])"]
+        return [f"m.line = {i}", f"m.move({self.operand(dest)}, {self.operand(src)})"]
+
+    def translate_arithmetic(self, i, operator, dest, src):
+        target = self.register_ref(dest) if dest.kind in ("int", "float") else None
+        if dest.kind == "int":
+            if src.kind == "literal" and src.value.is_integer() and (operator in INLINE_OPERATORS or src.value):
+                value = int(src.value)
+                if operator in INLINE_OPERATORS:
+                    return [f"{target} = wrap({target} {INLINE_OPERATORS[operator]} {value!r})"]
+                symbol = "//" if operator == "DIV" else "%"
+                return [f"{target} = wrap({target} {symbol} {value!r})"]
+            if src.kind == "int" and operator in INLINE_OPERATORS:
+                return [f"{target} = wrap({target} {INLINE_OPERATORS[operator]} i[{src.base!r}])"]
+        if dest.kind == "float":
+            if src.kind == "literal" and (operator in INLINE_OPERATORS or src.value):
+                symbol = INLINE_OPERATORS.get(operator, "/" if operator == "DIV" else "%")
+                return [f"{target} = f32({target} {symbol} {src.value!r})"]
+            if src.kind in ("int", "float") and operator in INLINE_OPERATORS:
+                return [f"{target} = f32({target} {INLINE_OPERATORS[operator]} "
+                        f"float({self.register_ref(src)}))"]
+        return [f"m.line = {i}", f"m.arith({operator!r}, {self.operand(dest)}, {self.operand(src)})"]
@@ -1,16 +1,46 @@
+from contextlib import nullcontext
+
+from CPU.arithmetic_kernels import KERNELS, bind_arithmetic, value_kind
 from CPU.instruction_registrar import InstructionRegistrar
+from CPU.intrinsics import call_intrinsic, is_intrinsic
+from CPU.control_flow import uses_cores
+from CPU.hooks import Hooks
+from CPU.lexer import leading_space, lex_file
+from CPU.linker import Linker, relocate
+from CPU.multicore import Cores
+from CPU.operand_resolver import ARITHMETIC_VERBS, class_registers, OperandResolver, REGISTER_KINDS, TYPED_OPERATORS
+from CPU.optimizer import Optimizer
+from CPU.shadow_registers import ShadowRegisters
+from CPU.string_pool import StringPool
 from CPU.virtual_cpu import VirtualCPU
 
 
 class Compiler:
-    def __init__(self, file_path):
+    def __init__(self, file_path, optimize=0, run=True, unroll=4, inline_limit=8, memo_size=256, cache=True):
         self.file_path = file_path
+        self.cache = cache
+        self.optimize_level = optimize
+        self.unroll = unroll
+        self.inline_limit = inline_limit
+        self.memo_size = memo_size
+        self.memos = {}
         self.CPU = VirtualCPU()
-        self.asm = self.load_file().split(';')
+        self.asm = []
+        self.locations = []
+        self.markers = []
+        self.label_sites = []
         self.instruction_index = 0
         self.memory_index = 0
         self.stack_index = 0
+        self.stale = False
         self.debug = True
+        self.input_source = input
+        self.output = None
+        self.cores = None
+        self.lock = nullcontext()
+        self.hooks = Hooks(self)
+        self.strings = StringPool(self)
+        self.arithmetic_handlers = {}
         self.instruction_set = {
             "MOVE": self.handle_move,
             "ADD": self.handle_add,
@@ -34,7 +64,32 @@ class Compiler:
             "VAR": self.handle_set_var,
             "INPUT": self.handle_input,
             "PUSH": self.handle_push,
-            "POP": self.handle_pop
+            "POP": self.handle_pop,
+            "PUSHA": self.handle_push_all,
+            "POPA": self.handle_pop_all,
+            "DOT": self.handle_dot,
+            "MAG": self.handle_mag,
+            "NORM": self.handle_norm,
+            "HSUM": self.handle_hsum,
+            "HMIN": self.handle_hmin,
+            "HMAX": self.handle_hmax,
+            "FMA": self.handle_fma,
+            "BCAST": self.handle_bcast,
+            "SHUF": self.handle_shuf,
+            "SPAWN": self.handle_spawn,
+            "JOIN": self.handle_join,
+            "BARRIER": self.handle_barrier,
+            "XADD": self.handle_xadd,
+            "XCHG": self.handle_xchg,
+            "CAS": self.handle_cas
+        }
+        self.pseudo_instructions = {
+            "DEF": self.skip_function,
+            "RETURN": self.handle_unknown,
+            "CALL": self.handle_call,
+            "LABEL": self.handle_nop,
+            "NOP": self.handle_nop,
+            "UNKNOWN": self.handle_unknown
         }
         self.variables = {}
         self.functions = {}
@@ -43,78 +98,169 @@ class Compiler:
                           "V3", "V4", "V5", "V6"]
         self.cpu_executor = InstructionRegistrar(self.CPU, self)
         self.preprocess_functions()
-        self.read_asm()
+        self.assemble()
+        self.optimize()
+        if run:
+            self.run()
+
+    def optimize(self):
+        self.shadow = ShadowRegisters(self)
+        self.memos = {}
+        self.optimizer = Optimizer(self)
+        self.optimizer.optimize(self.optimize_level)
+
+    def refresh(self):
+        if self.stale:
+            self.stale = False
+            self.program = list(self.program)
+            self.optimize()
+
+    def run(self):
+        self.refresh()
+        self.instruction_index = 0
+        if self.cores is None and uses_cores(self.program):
+            Cores(self)
+        if self.cores is not None:
+            self.cores.run()
+        else:
+            self.read_asm()
+        self.shadow.spill()
+
+    def reset(self):
+        self.CPU.reset()
+        self.variables = {}
+        self.memory_index = 0
+        self.stack_index = 0
+        self.instruction_index = 0
 
     def report_error(self, message):
-        line_num = self.instruction_index + 1
-        code_line = self.asm[self.instruction_index].strip() if self.instruction_index < len(self.asm) else ""
-        print(f"\033[31mFATAL ERROR at line {line_num}: {message}\n ====>{code_line}<====\033[0m")
+        if self.instruction_index < len(self.asm):
+            where = self.locations[self.instruction_index]
+            code_line = self.asm[self.instruction_index].strip()
+        else:
+            where, code_line = f"line {self.instruction_index + 1}", ""
+        print(f"\033[31mFATAL ERROR at {where}: {message}\n ====>{code_line}<====\033[0m", file=self.output)
         exit(1)
 
+    def source_line(self, index):
+        return self.locations[index].line
+
     def preprocess_functions(self):
-        new_asm = []
-        for line in self.asm:
-            s = line.strip()
-            if not s or s.startswith("//"):
-                new_asm.append(line)
-            elif s.startswith("DEF "):
-                parts = s.split(":", 1)
-                new_asm.append(parts[0].strip() + ":")
-                if len(parts) > 1 and parts[1].strip():
-                    new_asm.append(parts[1].strip())
-            else:
-                new_asm.append(line)
-        self.asm = new_asm
-        start_line = None
-        current_function = None
+        self.asm, self.locations, self.markers, self.label_sites = self.preprocess(lex_file(self.file_path))
+        self.linker = Linker(self, self.cache)
+        self.base = self.linker.link()
+        self.link()
+
+    def preprocess(self, fragments):
+        saved = self.asm, self.locations, self.markers, self.label_sites
+        self.asm, self.locations, self.markers, self.label_sites = [], [], [], []
+        try:
+            for text, positions in fragments:
+                self.add_fragment(text, positions)
+            return self.asm, self.locations, self.markers, self.label_sites
+        finally:
+            self.asm, self.locations, self.markers, self.label_sites = saved
+
+    def add_fragment(self, text, positions):
+        s = text.strip()
+        lead = leading_space(text)
+        if not s.startswith("DEF "):
+            self.add_instruction(text, s, positions, lead)
+            return
+        head, colon, body = s.partition(":")
+        self.add_instruction(head.strip() + ":", head.strip() + ":", positions, lead)
+        if body.strip():
+            offset = lead + len(head) + len(colon) + leading_space(body)
+            self.add_instruction(body.strip(), body.strip(), positions, offset)
+
+    def add_instruction(self, text, s, positions, offset):
+        i = len(self.asm)
+        self.asm.append(text)
+        self.locations.append(positions.at(offset))
+        if not s:
+            return
+        if s.startswith("DEF "):
+            self.markers.append((i, s.split()[1].rstrip(":")))
+        elif s.startswith("RETURN"):
+            self.markers.append((i, None))
+        if ":" in s and not s.startswith("DEF "):
+            label_part, instruction_part = s.split(":", 1)
+            self.label_sites.append((i, label_part.strip()))
+            if instruction_part.strip():
+                self.asm[i] = instruction_part.strip()
+                self.locations[i] = positions.at(offset + len(label_part) + 1 + leading_space(instruction_part))
+
+    def link(self):
+        self.link_functions()
+        self.labels = {name: i - 1 for i, name in self.label_sites}
+
+    def link_functions(self):
         self.functions = {}
-        self.labels = {}
-        for i, line in enumerate(self.asm):
-            s = line.strip()
-            if not s or s.startswith("//"):
-                continue
-            if s.startswith("DEF "):
-                if current_function is not None:
-                    self.functions[current_function] = (start_line, i - 1)
-                current_function = s.split()[1].rstrip(":")
-                start_line = i
-            elif s.startswith("RETURN") and current_function:
-                self.functions[current_function] = (start_line, i)
-                current_function = None
-            if ":" in s and not s.startswith("DEF "):
-                label_part, *instruction_part = s.split(":", 1)
-                label_name = label_part.strip()
-                self.labels[label_name] = i - 1
-                if instruction_part and instruction_part[0].strip():
-                    self.asm[i] = instruction_part[0].strip()
-        if current_function is not None:
-            self.functions[current_function] = (start_line, len(self.asm) - 1)
+        current, start = None, 0
+        for i, name in self.markers:
+            if name is not None:
+                if current is not None:
+                    self.functions[current] = (start, i - 1)
+                current, start = name, i
+            elif current:
+                self.functions[current] = (start, i)
+                current = None
+        if current is not None:
+            self.functions[current] = (start, len(self.asm) - 1)
+
+    def assemble(self):
+        self.resolver = OperandResolver(self)
+        self.resolver.collect_variables(self.asm)
+        self.program = self.linker.program()
+        for i in range(self.base, len(self.asm)):
+            self.instruction_index = i
+            self.program.append(relocate(self.decode(self.asm[i].strip()), self.base))
+        self.instruction_index = 0
+        self.strings.collect(self.program)
+
+    def decode(self, instruction):
+        if not instruction:
+            return None
+        if instruction.startswith("DEF "):
+            return "DEF", self.skip_function, (instruction.split()[1].rstrip(":"),)
+        if instruction.startswith("RETURN"):
+            return "RETURN", self.handle_unknown, ("RETURN",)
+        parts = instruction.split(" ", 1)
+        operator = parts[0]
+        if operator == "CALL":
+            if len(parts) < 2:
+                self.report_error("CALL expects a function name")
+            return "CALL", self.handle_call, (parts[1].strip(),)
+        if operator == "IMPORT":
+            return self.nop()
+        if operator in self.instruction_set:
+            args = parts[1].strip().split(",") if len(parts) > 1 else []
+            if operator in TYPED_OPERATORS:
+                args = self.resolver.resolve_instruction(operator, args)
+            return self.encode(operator, args)
+        if instruction.endswith(":"):
+            return "LABEL", self.handle_nop, ()
+        return "UNKNOWN", self.handle_unknown, (operator,)
+
+    def encode(self, operator, args):
+        if operator in TYPED_OPERATORS and operator != "MOVE":
+            return operator, bind_arithmetic(self, operator, *args), tuple(args)
+        return operator, self.instruction_set[operator], tuple(args)
+
+    def bind(self, operator, args):
+        if operator in self.pseudo_instructions:
+            return operator, self.pseudo_instructions[operator], args
+        return self.encode(operator, args)
+
+    def nop(self):
+        return "NOP", self.handle_nop, ()
 
     def read_asm(self):
-        while self.instruction_index < len(self.asm):
-            instruction = self.asm[self.instruction_index].strip()
-            if not instruction:
-                self.instruction_index += 1
-                continue
-            if instruction.startswith("DEF "):
-                function_name = instruction.split()[1].rstrip(":")
-                self.instruction_index = self.functions[function_name][1] + 1
-                continue
-            parts = instruction.split(" ", 1)
-            operator = parts[0]
-            if operator == "CALL":
-                function_name = parts[1].strip()
-                if function_name in self.functions:
-                    self.run_function(function_name)
-                else:
-                    self.report_error(f"Function '{function_name}' not found")
-            elif operator in self.instruction_set:
-                args = parts[1].strip().split(",") if len(parts) > 1 else []
-                self.instruction_set[operator](*args)
-            elif instruction.endswith(":"):
-                pass
-            else:
-                print(f"\033[31mWARNING: Unknown instruction: {operator}, skipping...\033[0m")
+        program = self.program
+        while self.instruction_index < len(program):
+            entry = program[self.instruction_index]
+            if entry is not None:
+                entry[1](*entry[2])
             self.instruction_index += 1
 
     def run_function(self, function_name):
@@ -124,19 +270,32 @@ class Compiler:
         original_index = self.instruction_index
         self.instruction_index = start + 1
         while self.instruction_index <= end:
-            instruction = self.asm[self.instruction_index].strip()
-            if not instruction or instruction.startswith("RETURN"):
+            entry = self.program[self.instruction_index]
+            if entry is None or entry[0] == "RETURN":
                 break
-            parts = instruction.split(" ", 1)
-            operator = parts[0]
-            args = parts[1].strip().split(",") if len(parts) > 1 else []
-            if operator in self.instruction_set:
-                self.instruction_set[operator](*args)
-            else:
-                self.report_error(f"Unknown instruction: {operator}")
+            if entry[0] == "UNKNOWN":
+                self.report_error(f"Unknown instruction: {entry[2][0]}")
+            entry[1](*entry[2])
             self.instruction_index += 1
         self.instruction_index = original_index
 
+    def skip_function(self, function_name):
+        self.instruction_index = self.functions[function_name][1]
+
+    def handle_nop(self):
+        pass
+
+    def handle_unknown(self, operator):
+        print(f"\033[31mWARNING: Unknown instruction: {operator}, skipping...\033[0m", file=self.output)
+
+    def handle_call(self, function_name):
+        if is_intrinsic(function_name):
+            call_intrinsic(self, function_name)
+        elif function_name in self.functions:
+            self.run_function(function_name)
+        else:
+            self.report_error(f"Function '{function_name}' not found")
+
     def parse_operand(self, operand):
         if '[' in operand and operand.endswith(']'):
             try:
@@ -160,272 +319,138 @@ class Compiler:
                 return operand, None
         return operand, None
 
+    def lookup_variable(self, name):
+        if name not in self.variables:
+            self.report_error(f"Variable {name} used before it was declared")
+        return self.variables[name]
+
+    def operand_index(self, operand):
+        if operand.index_kind == "literal":
+            return operand.index
+        if operand.index_kind == "register":
+            return self.CPU.return_register(operand.index)
+        head, buffer, var_type = self.lookup_variable(operand.index)
+        if var_type != "int":
+            self.report_error("Um what are you even trying to do?")
+        return self.CPU.return_memory(head)
+
+    def operand_value(self, operand):
+        kind = operand.kind
+        if kind == "literal":
+            return operand.value
+        if kind == "shadow":
+            return operand.value.read()
+        if kind in ("int", "float", "vector"):
+            return self.CPU.return_register(operand.base)
+        if kind == "element":
+            vec = self.CPU.return_register(operand.base)
+            index = self.operand_index(operand)
+            if index < 0 or index >= len(vec):
+                self.report_error(f"Index {index} out of range for register {operand.base}")
+            return vec[index]
+        head, buffer, var_type = self.lookup_variable(operand.base)
+        if kind == "variable_element":
+            if var_type != "vector":
+                self.report_error(f"Cannot index non-vector variable {operand.base}")
+            index = self.operand_index(operand)
+            if index < 0 or index >= buffer:
+                self.report_error(f"Index {index} out of range for variable {operand.base}")
+            return self.CPU.return_memory(head + index)
+        if var_type == "vector":
+            return [self.CPU.return_memory(head + i) for i in range(buffer)]
+        return self.CPU.return_memory(head)
+
+    def vector_literal_values(self, operand):
+        values = []
+        for token in operand.value:
+            try:
+                values.append(float(self.operand_value(token)))
+            except (TypeError, ValueError):
+                self.report_error(f"Invalid conversion of {token.text} value to float")
+        return values
+
     def handle_move(self, key, value):
-        target_base, target_index = self.parse_operand(key)
-        if target_base in self.reg_names:
-            if target_index is not None and not target_base.startswith("V"):
-                self.report_error(f"Cannot index non-vector register {target_base}")
-                return
+        if key.kind == "shadow":
+            key.value.write(value)
+            return
+        if key.kind in ("variable", "variable_element"):
+            self.move_to_variable(key, value)
+            return
+        target_base = key.base
+        if value.kind == "vector_literal":
+            self.CPU.update_register(target_base, self.vector_literal_values(value))
+            return
+        src_val = self.operand_value(value)
+        if key.kind == "element":
             try:
-                numeric_value = float(value)
-                if target_index is None:
-                    if target_base.startswith("I") and numeric_value.is_integer():
-                        self.cpu_executor.move(target_base, int(numeric_value))
-                    elif target_base.startswith("FF"):
-                        self.cpu_executor.move(target_base, numeric_value)
-                    elif target_base.startswith("V"):
-                        self.report_error(f"Cannot assign scalar to entire vector register {target_base}")
-                    else:
-                        self.report_error(f"Unknown register type for {target_base}")
-                else:
-                    vector = self.CPU.return_register(target_base)
-                    if target_index < 0 or target_index >= len(vector):
-                        self.report_error(f"Index {target_index} out of range for register {target_base}")
-                        return
-                    vector[target_index] = numeric_value
-                    self.CPU.update_register(target_base, vector)
+                num = float(src_val)
+            except (TypeError, ValueError):
+                self.report_error(f"Type mismatch: expected scalar for vector element assignment, got {src_val}")
                 return
-            except ValueError:
-                pass
-            if value.startswith("[") and value.endswith("]"):
-                if target_index is not None:
-                    self.report_error(f"Cannot assign vector literal to a vector element {target_base}[{target_index}]")
-                    return
-                tokens = value[1:-1].replace(",", " ").split()
-                if not (1 <= len(tokens) <= 32):
-                    self.report_error(f"Vector length must be between 1 and 32, got {len(tokens)}")
-                    return
-                vector = []
-                for token in tokens:
-                    if token in self.reg_names:
-                        reg_val = self.CPU.return_register(token)
-                        try:
-                            vector.append(float(reg_val))
-                        except Exception:
-                            self.report_error(f"Invalid conversion of register {token} value to float")
-                            return
-                    elif token in self.variables:
-                        head, buf, typ = self.variables[token]
-                        mem_val = self.CPU.return_memory(head)
-                        vector.append(float(mem_val))
-                    else:
-                        try:
-                            vector.append(float(token))
-                        except Exception:
-                            self.report_error(f"Invalid vector element: {token}")
-                            return
-                self.CPU.update_register(target_base, vector)
+            vec = self.CPU.return_register(target_base)
+            target_index = self.operand_index(key)
+            if target_index < 0 or target_index >= len(vec):
+                self.report_error(f"Index {target_index} out of range for register {target_base}")
                 return
-            if ('[' in value and value.endswith(']')):
-                src_base, src_index = self.parse_operand(value)
+            vec[target_index] = num
+            self.CPU.update_register(target_base, vec)
+        elif key.kind == "int":
+            try:
+                num = float(src_val)
+            except (TypeError, ValueError):
+                self.report_error(f"Invalid source value: {src_val}")
+                return
+            if num.is_integer():
+                self.CPU.update_register(target_base, int(num))
             else:
-                src_base, src_index = value, None
+                self.report_error(f"Type mismatch: expected integer, got {src_val}")
+        elif key.kind == "float":
+            try:
+                self.CPU.update_register(target_base, float(src_val))
+            except (TypeError, ValueError):
+                self.report_error(f"Invalid source value: {src_val}")
+        elif isinstance(src_val, list):
+            self.CPU.update_register(target_base, src_val)
+        else:
+            self.report_error(f"Expected vector, got scalar for register {target_base}")
 
-            if src_base in self.reg_names or src_base in self.variables:
-                if src_base in self.reg_names:
-                    if src_index is None:
-                        src_val = self.CPU.return_register(src_base)
-                    else:
-                        if not src_base.startswith("V"):
-                            self.report_error(f"Cannot index non-vector register {src_base}")
-                            return
-                        vec = self.CPU.return_register(src_base)
-                        if src_index < 0 or src_index >= len(vec):
-                            self.report_error(f"Index {src_index} out of range for register {src_base}")
-                            return
-                        src_val = vec[src_index]
-                else:
-                    head, buf, typ = self.variables[src_base]
-                    if src_index is None:
-                        if typ == "vector":
-                            src_val = [self.CPU.return_memory(head + i) for i in range(buf)]
-                        else:
-                            src_val = self.CPU.return_memory(head)
-                    else:
-                        if typ != "vector":
-                            self.report_error(f"Cannot index non-vector variable {src_base}")
-                            return
-                        if src_index < 0 or src_index >= buf:
-                            self.report_error(f"Index {src_index} out of range for variable {src_base}")
-                            return
-                        src_val = self.CPU.return_memory(head + src_index)
-                if target_index is None:
-                    if target_base.startswith("I"):
-                        try:
-                            num = float(src_val)
-                            if num.is_integer():
-                                self.cpu_executor.move(target_base, int(num))
-                            else:
-                                self.report_error(f"Type mismatch: expected integer, got {src_val}")
-                            return
-                        except Exception:
-                            self.report_error(f"Invalid source value: {src_val}")
-                            return
-                    elif target_base.startswith("FF"):
-                        try:
-                            num = float(src_val)
-                            self.cpu_executor.move(target_base, num)
-                            return
-                        except Exception:
-                            self.report_error(f"Invalid source value: {src_val}")
-                            return
-                    elif target_base.startswith("V"):
-                        if isinstance(src_val, list):
-                            self.CPU.update_register(target_base, src_val)
-                            return
-                        else:
-                            self.report_error(f"Expected vector, got scalar for register {target_base}")
-                            return
-                    else:
-                        self.report_error(f"Unknown register type for {target_base}")
-                        return
-                else:
-                    try:
-                        num = float(src_val)
-                    except Exception:
-                        self.report_error(
-                            f"Type mismatch: expected scalar for vector element assignment, got {src_val}")
-                        return
-                    vec = self.CPU.return_register(target_base)
-                    if target_index < 0 or target_index >= len(vec):
-                        self.report_error(f"Index {target_index} out of range for register {target_base}")
-                        return
-                    vec[target_index] = num
-                    self.CPU.update_register(target_base, vec)
-                    return
-            self.report_error(f"Invalid value for MOVE operation: {value}")
-            return
-        elif target_base in self.variables:
-            head, buffer, var_type = self.variables[target_base]
-            if target_index is not None and var_type != "vector":
+    def move_to_variable(self, key, value):
+        target_base = key.base
+        head, buffer, var_type = self.lookup_variable(target_base)
+        if key.kind == "variable_element":
+            if var_type != "vector":
                 self.report_error(f"Cannot index non-vector variable {target_base}")
                 return
-
+            target_index = self.operand_index(key)
+            if value.kind == "text":
+                self.report_error(f"Type mismatch: expected scalar for vector element assignment, got {value.text}")
+                return
             try:
-                numeric_value = float(value)
-                if target_index is None:
-                    if var_type == "int" and numeric_value.is_integer():
-                        self.CPU.update_memory(head, int(numeric_value))
-                    elif var_type == "float":
-                        self.CPU.update_memory(head, numeric_value)
-                    else:
-                        self.report_error(f"Cannot move {numeric_value} to {target_base} due to type mismatch")
-                    return
-                else:
-                    if target_index < 0 or target_index >= buffer:
-                        self.report_error(f"Index {target_index} out of range for variable {target_base}")
-                        return
-                    self.CPU.update_memory(head + target_index, numeric_value)
-                    return
-            except ValueError:
-                pass
-            if value.startswith("[") and value.endswith("]"):
-                if target_index is not None:
-                    self.report_error(f"Cannot assign vector literal to a vector element {target_base}[{target_index}]")
-                    return
-                tokens = value[1:-1].replace(",", " ").split()
-                if not (1 <= len(tokens) <= 32):
-                    self.report_error(f"Vector length must be between 1 and 32, got {len(tokens)}")
-                    return
-                for i, token in enumerate(tokens):
-                    if token in self.reg_names:
-                        token_val = self.CPU.return_register(token)
-                        try:
-                            self.CPU.update_memory(head + i, float(token_val))
-                        except Exception:
-                            self.report_error(f"Invalid conversion of register {token} value to float")
-                            return
-                    elif token in self.variables:
-                        t_head, t_buf, t_type = self.variables[token]
-                        token_val = self.CPU.return_memory(t_head)
-                        self.CPU.update_memory(head + i, float(token_val))
-                    else:
-                        try:
-                            token_val = float(token)
-                            self.CPU.update_memory(head + i, token_val)
-                        except Exception:
-                            self.report_error(f"Invalid vector element: {token}")
-                            return
-                self.variables[target_base] = [head, len(tokens), "vector"]
+                num = float(self.operand_value(value))
+            except (TypeError, ValueError):
+                self.report_error(f"Type mismatch: expected scalar for vector element assignment, got {value.text}")
                 return
-            if ('[' in value and value.endswith(']')):
-                src_base, src_index = self.parse_operand(value)
+            if target_index < 0 or target_index >= buffer:
+                self.report_error(f"Index {target_index} out of range for variable {target_base}")
+                return
+            self.CPU.update_memory(head + target_index, num)
+            return
+        if value.kind == "literal":
+            numeric_value = value.value
+            if var_type == "int" and numeric_value.is_integer():
+                self.CPU.update_memory(head, int(numeric_value))
+            elif var_type == "float":
+                self.CPU.update_memory(head, numeric_value)
             else:
-                src_base, src_index = value, None
-
-            if src_base in self.reg_names or src_base in self.variables:
-                if src_base in self.reg_names:
-                    if src_index is None:
-                        src_val = self.CPU.return_register(src_base)
-                    else:
-                        if not src_base.startswith("V"):
-                            self.report_error(f"Cannot index non-vector register {src_base}")
-                            return
-                        vec = self.CPU.return_register(src_base)
-                        if src_index < 0 or src_index >= len(vec):
-                            self.report_error(f"Index {src_index} out of range for register {src_base}")
-                            return
-                        src_val = vec[src_index]
-                else:
-                    t_head, t_buf, t_type = self.variables[src_base]
-                    if src_index is None:
-                        if t_type == "vector":
-                            src_val = [self.CPU.return_memory(t_head + i) for i in range(t_buf)]
-                        else:
-                            src_val = self.CPU.return_memory(t_head)
-                    else:
-                        if t_type != "vector":
-                            self.report_error(f"Cannot index non-vector variable {src_base}")
-                            return
-                        if src_index < 0 or src_index >= t_buf:
-                            self.report_error(f"Index {src_index} out of range for variable {src_base}")
-                            return
-                        src_val = self.CPU.return_memory(t_head + src_index)
-                if target_index is None:
-                    if var_type == "int":
-                        try:
-                            num = float(src_val)
-                            if num.is_integer():
-                                self.CPU.update_memory(head, int(num))
-                            else:
-                                self.report_error(f"Type mismatch: expected integer, got {src_val}")
-                            return
-                        except Exception:
-                            self.report_error(f"Invalid source value: {src_val}")
-                            return
-                    elif var_type == "float":
-                        try:
-                            num = float(src_val)
-                            self.CPU.update_memory(head, num)
-                            return
-                        except Exception:
-                            self.report_error(f"Invalid source value: {src_val}")
-                            return
-                    elif var_type == "vector":
-                        if isinstance(src_val, list):
-                            for i, elem in enumerate(src_val):
-                                self.CPU.update_memory(head + i, elem)
-                            self.variables[target_base] = [head, len(src_val), "vector"]
-                            return
-                        else:
-                            self.report_error(f"Expected vector, got scalar for variable {target_base}")
-                            return
-                    else:
-                        self.report_error(f"Unknown variable type for {target_base}")
-                        return
-                else:
-                    try:
-                        num = float(src_val)
-                    except Exception:
-                        self.report_error(
-                            f"Type mismatch: expected scalar for vector element assignment, got {src_val}")
-                        return
-                    if target_index < 0 or target_index >= buffer:
-                        self.report_error(f"Index {target_index} out of range for variable {target_base}")
-                        return
-                    self.CPU.update_memory(head + target_index, num)
-                    return
-            values = [ord(char) for char in value.replace('"', "")]
+                self.report_error(f"Cannot move {numeric_value} to {target_base} due to type mismatch")
+            return
+        if value.kind == "vector_literal":
+            for i, token_val in enumerate(self.vector_literal_values(value)):
+                self.CPU.update_memory(head + i, token_val)
+            self.variables[target_base] = [head, len(value.value), "vector"]
+            return
+        if value.kind == "text":
+            values = self.strings.codes(value.text)
             if len(values) > buffer:
                 self.report_error(f"Memory buffer overflow by {len(values) - buffer} bytes")
                 return
@@ -433,485 +458,66 @@ class Compiler:
                 self.CPU.update_memory(head + i, v)
             self.variables[target_base] = [head, buffer, "string"]
             return
-        else:
-            self.report_error(f"Invalid key for MOVE operation: {key}")
-            return
-
-    def handle_add(self, reg1, key):
-        rbase, rindex = self.parse_operand(reg1)
-        kbase, kindex = self.parse_operand(key)
-        if rbase in self.reg_names:
-            if kbase in self.reg_names:
-                if kindex is not None:
-                    vec2 = self.CPU.return_register(kbase)
-                    if kindex < 0 or kindex >= len(vec2):
-                        self.report_error("Index out of range for " + kbase)
-                        return
-                    op = vec2[kindex]
-                else:
-                    op = self.CPU.return_register(kbase)
-            elif kbase in self.variables:
-                head, buf, var_type = self.variables[kbase]
-                if var_type in ("int", "float"):
-                    op = float(self.CPU.return_memory(head))
-                elif var_type == "vector":
-                    if kindex is not None:
-                        if kindex < 0 or kindex >= buf:
-                            self.report_error("Index out of range for variable " + kbase)
-                            return
-                        op = self.CPU.return_memory(head + kindex)
-                    else:
-                        op = [self.CPU.return_memory(head + i) for i in range(buf)]
-                else:
-                    self.report_error("Cannot add a " + var_type + " variable to register " + rbase)
-                    return
+        src_val = self.operand_value(value)
+        if var_type == "int":
+            try:
+                num = float(src_val)
+            except (TypeError, ValueError):
+                self.report_error(f"Invalid source value: {src_val}")
+                return
+            if num.is_integer():
+                self.CPU.update_memory(head, int(num))
             else:
-                if key.startswith("[") and key.endswith("]"):
-                    try:
-                        tokens = key[1:-1].split()
-                        op = [float(x) for x in tokens]
-                    except:
-                        self.report_error("Invalid vector literal: " + key)
-                        return
-                else:
-                    try:
-                        op = float(key)
-                    except:
-                        self.report_error("Invalid type for ADD operation. Got: " + key)
-                        return
-            if rindex is None:
-                if rbase.startswith("I"):
-                    if isinstance(op, list):
-                        self.report_error("Cannot add vector to integer register " + rbase)
-                        return
-                    val = self.CPU.return_register(rbase)
-                    if float(op).is_integer():
-                        self.CPU.update_register(rbase, val + int(op))
-                    else:
-                        self.report_error("Cannot add float to integer register " + rbase)
-                        return
-                elif rbase.startswith("FF"):
-                    if isinstance(op, list):
-                        self.report_error("Cannot add vector to float register " + rbase)
-                        return
-                    val = self.CPU.return_register(rbase)
-                    self.CPU.update_register(rbase, val + float(op))
-                elif rbase.startswith("V"):
-                    vec = self.CPU.return_register(rbase)
-                    if isinstance(op, list):
-                        if len(vec) != len(op):
-                            self.report_error("Vector size mismatch: " + str(len(vec)) + " != " + str(len(op)))
-                            return
-                        self.CPU.update_register(rbase, [x + y for x, y in zip(vec, op)])
-                    else:
-                        self.CPU.update_register(rbase, [x + op for x in vec])
+                self.report_error(f"Type mismatch: expected integer, got {src_val}")
+        elif var_type == "float":
+            try:
+                self.CPU.update_memory(head, float(src_val))
+            except (TypeError, ValueError):
+                self.report_error(f"Invalid source value: {src_val}")
+        elif var_type == "vector":
+            if isinstance(src_val, list):
+                for i, elem in enumerate(src_val):
+                    self.CPU.update_memory(head + i, elem)
+                self.variables[target_base] = [head, len(src_val), "vector"]
             else:
-                if not rbase.startswith("V"):
-                    self.report_error("Cannot index non-vector register " + rbase)
-                    return
-                vec = self.CPU.return_register(rbase)
-                if rindex < 0 or rindex >= len(vec):
-                    self.report_error("Index out of range for register " + rbase)
-                    return
-                elem = vec[rindex]
-                if isinstance(op, list):
-                    self.report_error("Cannot add vector literal to vector element")
-                    return
-                if rbase.startswith("I"):
-                    if float(op).is_integer():
-                        vec[rindex] = elem + int(op)
-                    else:
-                        self.report_error("Cannot add float to integer register element " + rbase)
-                        return
-                else:
-                    vec[rindex] = elem + float(op)
-                self.CPU.update_register(rbase, vec)
+                self.report_error(f"Expected vector, got scalar for variable {target_base}")
         else:
-            self.report_error("Invalid register for ADD operation: " + reg1)
+            self.report_error(f"Unknown variable type for {target_base}")
+
+    def arithmetic_operand(self, reg1, key, operation):
+        if key.kind == "vector_literal":
+            return [token.value for token in key.value]
+        if key.kind == "shadow":
+            slot = key.value
+            if slot.active or slot.load():
+                return float(slot.value)
+            key = slot.fallback
+        if key.kind in ("variable", "variable_element"):
+            head, buf, var_type = self.lookup_variable(key.base)
+            if var_type in ("int", "float"):
+                return float(self.CPU.return_memory(head))
+            if var_type != "vector":
+                self.report_error(f"Cannot {ARITHMETIC_VERBS[operation]} a {var_type} variable and register {reg1.base}")
+        return self.operand_value(key)
+
+    def handle_arithmetic(self, operation, reg1, key):
+        op = self.arithmetic_operand(reg1, key, operation)
+        KERNELS[(operation, reg1.kind, value_kind(op))](self, reg1, op)
+
+    def handle_add(self, reg1, key):
+        self.handle_arithmetic("ADD", reg1, key)
 
     def handle_sub(self, reg1, key):
-        rbase, rindex = self.parse_operand(reg1)
-        kbase, kindex = self.parse_operand(key)
-        if rbase in self.reg_names:
-            if kbase in self.reg_names:
-                if kindex is not None:
-                    vec2 = self.CPU.return_register(kbase)
-                    if kindex < 0 or kindex >= len(vec2):
-                        self.report_error("Index out of range for " + kbase)
-                        return
-                    op = vec2[kindex]
-                else:
-                    op = self.CPU.return_register(kbase)
-            elif kbase in self.variables:
-                head, buf, var_type = self.variables[kbase]
-                if var_type in ("int", "float"):
-                    op = float(self.CPU.return_memory(head))
-                elif var_type == "vector":
-                    if kindex is not None:
-                        if kindex < 0 or kindex >= buf:
-                            self.report_error("Index out of range for variable " + kbase)
-                            return
-                        op = self.CPU.return_memory(head + kindex)
-                    else:
-                        op = [self.CPU.return_memory(head + i) for i in range(buf)]
-                else:
-                    self.report_error("Cannot subtract a " + var_type + " variable from register " + rbase)
-                    return
-            else:
-                if key.startswith("[") and key.endswith("]"):
-                    try:
-                        tokens = key[1:-1].split()
-                        op = [float(x) for x in tokens]
-                    except:
-                        self.report_error("Invalid vector literal: " + key)
-                        return
-                else:
-                    try:
-                        op = float(key)
-                    except:
-                        self.report_error("Invalid type for SUB operation. Got: " + key)
-                        return
-            if rindex is None:
-                if rbase.startswith("I"):
-                    if isinstance(op, list):
-                        self.report_error("Cannot subtract vector from integer register " + rbase)
-                        return
-                    val = self.CPU.return_register(rbase)
-                    if float(op).is_integer():
-                        self.CPU.update_register(rbase, val - int(op))
-                    else:
-                        self.report_error("Cannot subtract float from integer register " + rbase)
-                        return
-                elif rbase.startswith("FF"):
-                    if isinstance(op, list):
-                        self.report_error("Cannot subtract vector from float register " + rbase)
-                        return
-                    val = self.CPU.return_register(rbase)
-                    self.CPU.update_register(rbase, val - float(op))
-                elif rbase.startswith("V"):
-                    vec = self.CPU.return_register(rbase)
-                    if isinstance(op, list):
-                        if len(vec) != len(op):
-                            self.report_error("Vector size mismatch: " + str(len(vec)) + " != " + str(len(op)))
-                            return
-                        self.CPU.update_register(rbase, [x - y for x, y in zip(vec, op)])
-                    else:
-                        self.CPU.update_register(rbase, [x - op for x in vec])
-            else:
-                if not rbase.startswith("V"):
-                    self.report_error("Cannot index non-vector register " + rbase)
-                    return
-                vec = self.CPU.return_register(rbase)
-                if rindex < 0 or rindex >= len(vec):
-                    self.report_error("Index out of range for register " + rbase)
-                    return
-                elem = vec[rindex]
-                if isinstance(op, list):
-                    self.report_error("Cannot subtract vector literal from vector element")
-                    return
-                if rbase.startswith("I"):
-                    if float(op).is_integer():
-                        vec[rindex] = elem - int(op)
-                    else:
-                        self.report_error("Cannot subtract float from integer register element " + rbase)
-                        return
-                else:
-                    vec[rindex] = elem - float(op)
-                self.CPU.update_register(rbase, vec)
-        else:
-            self.report_error("Invalid register for SUB operation: " + reg1)
+        self.handle_arithmetic("SUB", reg1, key)
 
     def handle_mul(self, reg1, key):
-        rbase, rindex = self.parse_operand(reg1)
-        kbase, kindex = self.parse_operand(key)
-        if rbase in self.reg_names:
-            if kbase in self.reg_names:
-                if kindex is not None:
-                    vec2 = self.CPU.return_register(kbase)
-                    if kindex < 0 or kindex >= len(vec2):
-                        self.report_error("Index out of range for " + kbase)
-                        return
-                    op = vec2[kindex]
-                else:
-                    op = self.CPU.return_register(kbase)
-            elif kbase in self.variables:
-                head, buf, var_type = self.variables[kbase]
-                if var_type in ("int", "float"):
-                    op = float(self.CPU.return_memory(head))
-                elif var_type == "vector":
-                    if kindex is not None:
-                        if kindex < 0 or kindex >= buf:
-                            self.report_error("Index out of range for variable " + kbase)
-                            return
-                        op = self.CPU.return_memory(head + kindex)
-                    else:
-                        op = [self.CPU.return_memory(head + i) for i in range(buf)]
-                else:
-                    self.report_error("Cannot multiply a " + var_type + " variable with register " + rbase)
-                    return
-            else:
-                if key.startswith("[") and key.endswith("]"):
-                    try:
-                        tokens = key[1:-1].split()
-                        op = [float(x) for x in tokens]
-                    except:
-                        self.report_error("Invalid vector literal: " + key)
-                        return
-                else:
-                    try:
-                        op = float(key)
-                    except:
-                        self.report_error("Invalid type for MUL operation. Got: " + key)
-                        return
-            if rindex is None:
-                if rbase.startswith("I"):
-                    if isinstance(op, list):
-                        self.report_error("Cannot multiply integer register " + rbase + " with vector")
-                        return
-                    val = self.CPU.return_register(rbase)
-                    if float(op).is_integer():
-                        self.CPU.update_register(rbase, val * int(op))
-                    else:
-                        self.report_error("Cannot multiply integer register " + rbase + " with float")
-                        return
-                elif rbase.startswith("FF"):
-                    if isinstance(op, list):
-                        self.report_error("Cannot multiply float register " + rbase + " with vector")
-                        return
-                    val = self.CPU.return_register(rbase)
-                    self.CPU.update_register(rbase, val * float(op))
-                elif rbase.startswith("V"):
-                    vec = self.CPU.return_register(rbase)
-                    if isinstance(op, list):
-                        if len(vec) != len(op):
-                            self.report_error("Vector size mismatch: " + str(len(vec)) + " != " + str(len(op)))
-                            return
-                        self.CPU.update_register(rbase, [x * y for x, y in zip(vec, op)])
-                    else:
-                        self.CPU.update_register(rbase, [x * op for x in vec])
-            else:
-                if not rbase.startswith("V"):
-                    self.report_error("Cannot index non-vector register " + rbase)
-                    return
-                vec = self.CPU.return_register(rbase)
-                if rindex < 0 or rindex >= len(vec):
-                    self.report_error("Index out of range for register " + rbase)
-                    return
-                elem = vec[rindex]
-                if isinstance(op, list):
-                    self.report_error("Cannot multiply vector literal with vector element")
-                    return
-                if rbase.startswith("I"):
-                    if float(op).is_integer():
-                        vec[rindex] = elem * int(op)
-                    else:
-                        self.report_error("Cannot multiply integer register element " + rbase + " with float")
-                        return
-                else:
-                    vec[rindex] = elem * float(op)
-                self.CPU.update_register(rbase, vec)
-        else:
-            self.report_error("Invalid register for MUL operation: " + reg1)
+        self.handle_arithmetic("MUL", reg1, key)
 
     def handle_div(self, reg1, key):
-        rbase, rindex = self.parse_operand(reg1)
-        kbase, kindex = self.parse_operand(key)
-        if rbase in self.reg_names:
-            if kbase in self.reg_names:
-                if kindex is not None:
-                    vec2 = self.CPU.return_register(kbase)
-                    if kindex < 0 or kindex >= len(vec2):
-                        self.report_error("Index out of range for " + kbase)
-                        return
-                    op = vec2[kindex]
-                else:
-                    op = self.CPU.return_register(kbase)
-            elif kbase in self.variables:
-                head, buf, var_type = self.variables[kbase]
-                if var_type in ("int", "float"):
-                    op = float(self.CPU.return_memory(head))
-                elif var_type == "vector":
-                    if kindex is not None:
-                        if kindex < 0 or kindex >= buf:
-                            self.report_error("Index out of range for variable " + kbase)
-                            return
-                        op = self.CPU.return_memory(head + kindex)
-                    else:
-                        op = [self.CPU.return_memory(head + i) for i in range(buf)]
-                else:
-                    self.report_error("Cannot divide register " + rbase + " by a " + var_type + " variable")
-                    return
-            else:
-                if key.startswith("[") and key.endswith("]"):
-                    try:
-                        tokens = key[1:-1].split()
-                        op = [float(x) for x in tokens]
-                    except:
-                        self.report_error("Invalid vector literal: " + key)
-                        return
-                else:
-                    try:
-                        op = float(key)
-                    except:
-                        self.report_error("Invalid type for DIV operation. Got: " + key)
-                        return
-            if (isinstance(op, (int, float)) and float(op) == 0) or (
-                    isinstance(op, list) and any(float(x) == 0 for x in op)):
-                self.report_error("Division by zero")
-                return
-            if rindex is None:
-                if rbase.startswith("I"):
-                    if isinstance(op, list):
-                        self.report_error("Cannot divide integer register " + rbase + " by vector")
-                        return
-                    val = self.CPU.return_register(rbase)
-                    if float(op).is_integer():
-                        self.CPU.update_register(rbase, val // int(op))
-                    else:
-                        self.report_error("Cannot divide integer register " + rbase + " by float")
-                        return
-                elif rbase.startswith("FF"):
-                    if isinstance(op, list):
-                        self.report_error("Cannot divide float register " + rbase + " by vector")
-                        return
-                    val = self.CPU.return_register(rbase)
-                    self.CPU.update_register(rbase, val / float(op))
-                elif rbase.startswith("V"):
-                    vec = self.CPU.return_register(rbase)
-                    if isinstance(op, list):
-                        if len(vec) != len(op):
-                            self.report_error("Vector size mismatch: " + str(len(vec)) + " != " + str(len(op)))
-                            return
-                        result = [x / y if float(y) != 0 else 0 for x, y in zip(vec, op)]
-                        self.CPU.update_register(rbase, result)
-                    else:
-                        self.CPU.update_register(rbase, [x / float(op) if float(op) != 0 else 0 for x in vec])
-            else:
-                if not rbase.startswith("V"):
-                    self.report_error("Cannot index non-vector register " + rbase)
-                    return
-                vec = self.CPU.return_register(rbase)
-                if rindex < 0 or rindex >= len(vec):
-                    self.report_error("Index out of range for register " + rbase)
-                    return
-                elem = vec[rindex]
-                if isinstance(op, list):
-                    self.report_error("Cannot divide by vector literal for a single element")
-                    return
-                if float(op) == 0:
-                    self.report_error("Division by zero")
-                    return
-                if rbase.startswith("I"):
-                    if float(op).is_integer():
-                        vec[rindex] = elem // int(op)
-                    else:
-                        self.report_error("Cannot divide integer register element " + rbase + " by float")
-                        return
-                else:
-                    vec[rindex] = elem / float(op)
-                self.CPU.update_register(rbase, vec)
-        else:
-            self.report_error("Invalid register for DIV operation: " + reg1)
+        self.handle_arithmetic("DIV", reg1, key)
 
     def handle_mod(self, reg1, key):
-        rbase, rindex = self.parse_operand(reg1)
-        kbase, kindex = self.parse_operand(key)
-        if rbase in self.reg_names:
-            if kbase in self.reg_names:
-                if kindex is not None:
-                    vec2 = self.CPU.return_register(kbase)
-                    if kindex < 0 or kindex >= len(vec2):
-                        self.report_error("Index out of range for " + kbase)
-                        return
-                    op = vec2[kindex]
-                else:
-                    op = self.CPU.return_register(kbase)
-            elif kbase in self.variables:
-                head, buf, var_type = self.variables[kbase]
-                if var_type in ("int", "float"):
-                    op = float(self.CPU.return_memory(head))
-                elif var_type == "vector":
-                    if kindex is not None:
-                        if kindex < 0 or kindex >= buf:
-                            self.report_error("Index out of range for variable " + kbase)
-                            return
-                        op = self.CPU.return_memory(head + kindex)
-                    else:
-                        op = [self.CPU.return_memory(head + i) for i in range(buf)]
-                else:
-                    self.report_error(
-                        "Cannot perform modulo on register " + rbase + " with a " + var_type + " variable")
-                    return
-            else:
-                if key.startswith("[") and key.endswith("]"):
-                    try:
-                        tokens = key[1:-1].split()
-                        op = [float(x) for x in tokens]
-                    except:
-                        self.report_error("Invalid vector literal: " + key)
-                        return
-                else:
-                    try:
-                        op = float(key)
-                    except:
-                        self.report_error("Invalid type for MOD operation. Got: " + key)
-                        return
-            if (isinstance(op, (int, float)) and float(op) == 0) or (
-                    isinstance(op, list) and any(float(x) == 0 for x in op)):
-                self.report_error("Modulo by zero")
-                return
-            if rindex is None:
-                if rbase.startswith("I"):
-                    if isinstance(op, list):
-                        self.report_error("Cannot perform modulo on integer register " + rbase + " with vector")
-                        return
-                    val = self.CPU.return_register(rbase)
-                    if float(op).is_integer():
-                        self.CPU.update_register(rbase, val % int(op))
-                    else:
-                        self.report_error("Cannot perform modulo on integer register " + rbase + " with float")
-                        return
-                elif rbase.startswith("FF"):
-                    if isinstance(op, list):
-                        self.report_error("Cannot perform modulo on float register " + rbase + " with vector")
-                        return
-                    val = self.CPU.return_register(rbase)
-                    self.CPU.update_register(rbase, val % float(op))
-                elif rbase.startswith("V"):
-                    vec = self.CPU.return_register(rbase)
-                    if isinstance(op, list):
-                        if len(vec) != len(op):
-                            self.report_error("Vector size mismatch: " + str(len(vec)) + " != " + str(len(op)))
-                            return
-                        self.CPU.update_register(rbase, [x % y for x, y in zip(vec, op)])
-                    else:
-                        self.CPU.update_register(rbase, [x % float(op) for x in vec])
-            else:
-                if not rbase.startswith("V"):
-                    self.report_error("Cannot index non-vector register " + rbase)
-                    return
-                vec = self.CPU.return_register(rbase)
-                if rindex < 0 or rindex >= len(vec):
-                    self.report_error("Index out of range for register " + rbase)
-                    return
-                elem = vec[rindex]
-                if isinstance(op, list):
-                    self.report_error("Cannot perform modulo with vector literal for a single element")
-                    return
-                if float(op) == 0:
-                    self.report_error("Modulo by zero")
-                    return
-                if rbase.startswith("I"):
-                    if float(op).is_integer():
-                        vec[rindex] = elem % int(op)
-                    else:
-                        self.report_error("Cannot perform modulo on integer register element " + rbase + " with float")
-                        return
-                else:
-                    vec[rindex] = elem % float(op)
-                self.CPU.update_register(rbase, vec)
-        else:
-            self.report_error("Invalid register for MOD operation: " + reg1)
+        self.handle_arithmetic("MOD", reg1, key)
 
     def handle_store(self, reg, address):
         address = int(address)
@@ -982,10 +588,13 @@ class Compiler:
                 if index < 0 or index >= len(vec):
                     self.report_error("Index " + str(index) + " out of range for register " + base)
                     return
-                print(vec[index], end=end)
+                print(vec[index], end=end, file=self.output)
             else:
                 self.cpu_executor.print(base,end)
             return
+        if base not in self.variables:
+            print(key,end=end, file=self.output)
+            return
         try:
             head, buffer, var_type = self.variables[base]
             if var_type == "string":
@@ -993,33 +602,32 @@ class Compiler:
                     if index < 0 or index >= buffer:
                         self.report_error("Index " + str(index) + " out of range for variable " + base)
                         return
-                    print(chr(self.CPU.return_memory(head + index)),end=end)
+                    print(chr(self.CPU.return_memory(head + index)),end=end, file=self.output)
                 else:
-                    values = [chr(self.CPU.return_memory(head + i)) for i in range(buffer)]
-                    print("".join(values),end=end)
+                    print(self.strings.text(head, buffer),end=end, file=self.output)
             elif var_type == "vector":
                 if index is not None:
                     if index < 0 or index >= buffer:
                         self.report_error("Index " + str(index) + " out of range for vector variable " + base)
                         return
-                    print(self.CPU.return_memory(head + index),end=end)
+                    print(self.CPU.return_memory(head + index),end=end, file=self.output)
                 else:
                     values = [str(self.CPU.return_memory(head + i)) for i in range(buffer)]
-                    print(f"[{' '.join(values)}]",end=end)
+                    print(f"[{' '.join(values)}]",end=end, file=self.output)
             else:
                 if index is not None:
                     self.report_error("Scalar variable " + base + " cannot be indexed")
                 else:
-                    print(self.CPU.return_memory(head),end=end)
+                    print(self.CPU.return_memory(head),end=end, file=self.output)
         except:
-            print(key,end=end)
+            print(key,end=end, file=self.output)
 
     def handle_print_newlinw(self, key):
         self.handle_print(key, end="\n")
 
     def handle_print_ascii(self, reg):
         value = self.CPU.return_register(reg)
-        print(chr(int(value)))
+        print(chr(int(value)), file=self.output)
 
     def handle_jz(self, reg, pos):
         value = self.CPU.return_register(reg)
@@ -1093,7 +701,7 @@ class Compiler:
         exit(int(code))
 
     def handle_input(self, key, text=""):
-        value = input(text)
+        value = self.input_source(text)
         if key in self.reg_names:
             if value.replace('.', '', 1).isdigit() and value.count('.') < 2:
                 numeric_value = float(value)
@@ -1114,8 +722,12 @@ class Compiler:
                 value = '"' + value + '"'
             self.handle_set_var(key, value)
 
+    def allocate(self, size):
+        head = self.memory_index
+        self.memory_index += size
+        return head
+
     def handle_set_var(self, name, data, buffer=None):
-        memory_head = self.memory_index
         try:
             if data.replace('.', '', 1).isdigit() and data.count('.') < 2:
                 numeric_value = float(data)
@@ -1149,15 +761,15 @@ class Compiler:
                             self.report_error(f"Invalid vector element: {token}")
                 var_type = "vector"
             else:
-                values = [ord(char) for char in data.replace('"', "")]
+                values = self.strings.codes(data)
                 var_type = "string"
             memory_buffer = len(values) if buffer is None else int(buffer)
             if len(values) > memory_buffer:
                 self.report_error(f"Memory buffer overflow by {len(values) - memory_buffer} bytes")
+            memory_head = self.allocate(len(values))
             for i, value in enumerate(values):
                 self.CPU.update_memory(memory_head + i, value)
             self.variables[name] = [memory_head, len(values), var_type]
-            self.memory_index += len(values)
         except Exception as e:
             self.report_error(str(e))
 
@@ -1166,7 +778,8 @@ class Compiler:
         if base in self.reg_names:
             if base.startswith("V"):
                 if index is None:
-                    self.report_error("Cannot push entire vector register " + base + " to stack; specify an index.")
+                    vec = self.CPU.return_register(base)
+                    self.push_values(vec + [len(vec)])
                     return
                 else:
                     vec = self.CPU.return_register(base)
@@ -1198,6 +811,9 @@ class Compiler:
         else:
             self.report_error("Invalid key for PUSH operation: " + key)
             return
+        if self.stack_index >= len(self.CPU.call_stack):
+            self.report_error("Stack overflow: no room to push " + key + ".")
+            return
         self.CPU.call_stack[self.stack_index] = value
         self.stack_index += 1
 
@@ -1211,7 +827,7 @@ class Compiler:
         if base in self.reg_names:
             if base.startswith("V"):
                 if index is None:
-                    self.report_error("Cannot pop to an entire vector register " + base + "; specify an index.")
+                    self.CPU.update_register(base, self.pop_vector(value, base))
                     return
                 else:
                     vec = self.CPU.return_register(base)
@@ -1245,7 +861,7 @@ class Compiler:
                 if index is not None:
                     self.report_error("Variable " + base + " is scalar and cannot be indexed.")
                     return
-                self.CPU.memory[head] = value
+                self.CPU.update_memory(head, value)
                 if float(value).is_integer():
                     new_type = "int"
                 else:
@@ -1254,12 +870,198 @@ class Compiler:
         else:
             self.report_error("Invalid key for POP operation: " + key)
 
-    def load_file(self):
-        with open(self.file_path, 'r') as file:
-            lines = file.readlines()
-        cleaned_lines = []
-        for line in lines:
-            if '//' in line:
-                line = line.split('//')[0]
-            cleaned_lines.append(line)
-        return "".join(cleaned_lines)
+    def push_values(self, values):
+        top = self.stack_index + len(values)
+        if top > len(self.CPU.call_stack):
+            self.report_error(f"Stack overflow: no room to push {len(values)} values.")
+            return
+        self.CPU.call_stack[self.stack_index:top] = values
+        self.stack_index = top
+
+    def pop_vector(self, length, register):
+        if not isinstance(length, int) or not 1 <= length <= 32 or length > self.stack_index:
+            self.report_error("Top of the stack is not a whole vector, cannot pop it to " + register + ".")
+            return
+        self.stack_index -= length
+        return self.CPU.call_stack[self.stack_index:self.stack_index + length]
+
+    def handle_push_all(self, *classes):
+        registers = self.class_registers(classes)
+        cpu = self.CPU
+        values = []
+        for register in registers:
+            value = cpu.return_register(register)
+            if register in cpu.vector_registers:
+                values.extend(value)
+                values.append(len(value))
+            else:
+                values.append(value)
+        self.push_values(values)
+
+    def handle_pop_all(self, *classes):
+        registers = self.class_registers(classes)
+        cpu = self.CPU
+        stack = cpu.call_stack
+        top = self.stack_index
+        restored = []
+        for register in reversed(registers):
+            if register in cpu.vector_registers:
+                length = stack[top - 1] if top else None
+                if not isinstance(length, int) or not 1 <= length <= 32 or length >= top:
+                    self.report_error("Top of the stack is not a whole vector, cannot pop it to " + register + ".")
+                    return
+                top -= length + 1
+                restored.append((register, stack[top:top + length]))
+            else:
+                if not top:
+                    self.report_error("Stack underflow: no value to pop to " + register + ".")
+                    return
+                top -= 1
+                restored.append((register, stack[top]))
+        self.stack_index = top
+        for register, value in restored:
+            cpu.update_register(register, value)
+
+    def class_registers(self, classes):
+        for name in classes:
+            if name not in REGISTER_KINDS:
+                self.report_error(f"Unknown register class {name}, expected I, FF or V")
+        return class_registers(self.reg_names, classes)
+
+    def handle_spawn(self, function_name):
+        self.active_cores("SPAWN").spawn(function_name)
+
+    def handle_join(self):
+        self.active_cores("JOIN").join()
+
+    def handle_barrier(self):
+        self.active_cores("BARRIER").barrier()
+
+    def active_cores(self, operator):
+        if self.cores is None:
+            self.report_error(f"{operator} needs the program to be started with run()")
+        return self.cores
+
+    def atomic_address(self, key):
+        base, index = self.parse_operand(key)
+        if base in self.variables:
+            head, buffer, var_type = self.variables[base]
+            if var_type not in ("int", "float", "vector"):
+                self.report_error(f"Atomic operations need a numeric variable, {base} is a {var_type}")
+            if index is None:
+                return head
+            if var_type != "vector" or index < 0 or index >= buffer:
+                self.report_error(f"Index {index} out of range for variable {base}")
+            return head + index
+        if key.isnumeric():
+            return int(key)
+        self.report_error(f"Invalid address for atomic operation: {key}")
+
+    def atomic_register(self, reg):
+        if reg not in self.CPU.int_registers and reg not in self.CPU.ff_registers:
+            self.report_error(f"Atomic operations need an integer or float register, got {reg}")
+        return self.CPU.return_register(reg)
+
+    def atomic_read(self, address):
+        value = self.CPU.return_memory(address)
+        if value is None:
+            self.report_error(f"Memory address {address} is empty")
+        return value
+
+    def handle_xadd(self, key, reg):
+        address = self.atomic_address(key)
+        value = self.atomic_register(reg)
+        with self.lock:
+            old = self.atomic_read(address)
+            self.CPU.update_memory(address, old + value)
+        self.CPU.update_register(reg, old)
+
+    def handle_xchg(self, key, reg):
+        address = self.atomic_address(key)
+        value = self.atomic_register(reg)
+        with self.lock:
+            old = self.atomic_read(address)
+            self.CPU.update_memory(address, value)
+        self.CPU.update_register(reg, old)
+
+    def handle_cas(self, key, expected, new):
+        address = self.atomic_address(key)
+        compare, value = self.atomic_register(expected), self.atomic_register(new)
+        with self.lock:
+            old = self.atomic_read(address)
+            if old == compare:
+                self.CPU.update_memory(address, value)
+        self.CPU.update_register(expected, old)
+
+    def read_value(self, key):
+        base, index = self.parse_operand(key)
+        if base in self.reg_names:
+            value = self.CPU.return_register(base)
+            if index is None:
+                return value
+            if not base.startswith("V"):
+                self.report_error(f"Cannot index non-vector register {base}")
+            if index < 0 or index >= len(value):
+                self.report_error(f"Index {index} out of range for register {base}")
+            return value[index]
+        if base in self.variables:
+            head, buffer, var_type = self.variables[base]
+            if index is None:
+                if var_type == "vector":
+                    return [self.CPU.return_memory(head + i) for i in range(buffer)]
+                if var_type == "string":
+                    self.report_error(f"Cannot use string variable {base} as a number")
+                return self.CPU.return_memory(head)
+            if var_type != "vector":
+                self.report_error(f"Cannot index non-vector variable {base}")
+            if index < 0 or index >= buffer:
+                self.report_error(f"Index {index} out of range for variable {base}")
+            return self.CPU.return_memory(head + index)
+        if key.startswith("[") and key.endswith("]"):
+            try:
+                return [float(x) for x in key[1:-1].replace(",", " ").split()]
+            except ValueError:
+                self.report_error(f"Invalid vector literal: {key}")
+        try:
+            return float(key)
+        except ValueError:
+            self.report_error(f"Invalid operand: {key}")
+
+    def handle_dot(self, dest, reg1, reg2):
+        self.cpu_executor.dot_product(dest, reg1, reg2)
+
+    def handle_mag(self, dest, reg):
+        self.cpu_executor.magnitude(dest, reg)
+
+    def handle_norm(self, dest, reg=None):
+        self.cpu_executor.normalize(dest, dest if reg is None else reg)
+
+    def handle_hsum(self, dest, reg):
+        self.cpu_executor.horizontal_sum(dest, reg)
+
+    def handle_hmin(self, dest, reg):
+        self.cpu_executor.horizontal_min(dest, reg)
+
+    def handle_hmax(self, dest, reg):
+        self.cpu_executor.horizontal_max(dest, reg)
+
+    def handle_fma(self, dest, key1, key2):
+        if dest not in self.reg_names:
+            self.report_error(f"Invalid register for FMA operation: {dest}")
+        self.cpu_executor.fused_multiply_add(dest, self.read_value(key1), self.read_value(key2))
+
+    def handle_bcast(self, dest, key, length=None):
+        value = self.read_value(key)
+        if isinstance(value, list):
+            self.report_error(f"Cannot broadcast vector {key}; expected a scalar")
+        if length is None:
+            length = len(self.CPU.return_register(dest) or [])
+        else:
+            length = self.read_value(length)
+        self.cpu_executor.broadcast(dest, float(value), int(length))
+
+    def handle_shuf(self, dest, reg, key):
+        indices = self.read_value(key)
+        if not isinstance(indices, list):
+            self.report_error(f"SHUF expects a vector of indices, got {key}")
+        self.cpu_executor.shuffle(dest, reg, indices)
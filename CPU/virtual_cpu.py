@@ -10,6 +10,16 @@ class VirtualCPU:
         self.memory = [None] * 1000
         self.call_stack = [None] * 1000
 
+    def reset(self):
+        for reg in self.int_registers:
+            self.int_registers[reg] = 0
+        for reg in self.ff_registers:
+            self.ff_registers[reg] = 0.0
+        for reg in self.vector_registers:
+            self.vector_registers[reg] = [0.0] * 32
+        self.memory[:] = [None] * len(self.memory)
+        self.call_stack[:] = [None] * len(self.call_stack)
+
     def _update_overflow(self):
         for reg in self.int_registers:
             value = self.int_registers[reg]
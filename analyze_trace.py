@@ -0,0 +1,50 @@
+import argparse
+import sys
+
+from CPU.tracing import TraceReader
+
+parser = argparse.ArgumentParser(description="Summarise a trace recorded with main.py --trace.")
+parser.add_argument("trace", help="trace file written by --trace")
+parser.add_argument("--top", type=int, default=10, help="number of hot instructions and jumps to list")
+parser.add_argument("--state", type=int, metavar="STEP", help="print registers and memory after the given step")
+parser.add_argument("--steps", action="store_true", help="print every recorded step")
+args = parser.parse_args()
+
+
+def fail(error):
+    print(f"\033[31mFATAL ERROR: {error}\033[0m")
+    sys.exit(1)
+
+
+try:
+    trace = TraceReader(args.trace)
+except (OSError, ValueError) as error:
+    fail(error)
+executed = trace.executed()
+print(f"{trace.program}: {trace.steps} steps, {trace.written} records "
+      f"({len(trace.records)} kept in a buffer of {trace.capacity})")
+if executed:
+    print(f"steps {executed[0][0]}-{executed[-1][0]} are in the trace")
+
+if args.steps:
+    for step, index in executed:
+        print(f"{step:>10}  {trace.describe(index)}")
+
+print("\nhot instructions:")
+for index, count in trace.hot_instructions(args.top):
+    print(f"{count:>10}  {trace.describe(index)}")
+
+print("\nhot jumps:")
+for (source, target), count in trace.hot_jumps(args.top):
+    print(f"{count:>10}  {trace.describe(source)}\n{'->':>12}  {trace.describe(target)}")
+
+if args.state is not None:
+    try:
+        registers, memory = trace.state_at(args.state)
+    except ValueError as error:
+        fail(error)
+    print(f"\nstate after step {args.state}:")
+    for name, value in registers.items():
+        print(f"{name:>5} = {value}")
+    for address, value in sorted(memory.items()):
+        print(f"  [{address}] = {value}")
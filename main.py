@@ -1,3 +1,125 @@
+import argparse
+import asyncio
+import sys
+
+from CPU.async_runner import serve
+from CPU.control_flow import uses_cores
+from CPU.input_log import InputRecorder, InputReplayer
+from CPU.multicore import Cores
+from CPU.profiler import SamplingProfiler
+from CPU.resource_stats import ResourceStats
+from CPU.timing import TimingModel, load_config
+from CPU.tracing import TraceRecorder
+from CPU.translator import Translator
 from CPU.vasm_compiler import Compiler
 
-Compiler("programs/test.vasm")
+parser = argparse.ArgumentParser(description="Run a VASM program on the virtual CPU.")
+parser.add_argument("file", nargs="?", default="programs/test.vasm", help="VASM program to run")
+parser.add_argument("-O", "--optimize", type=int, default=0, help="optimization level (0 disables the optimizer)")
+parser.add_argument("--unroll", type=int, default=4, help="unroll factor for counted loops at -O3")
+parser.add_argument("--inline-limit", type=int, default=8,
+                    help="largest function body, in instructions, inlined at -O3")
+parser.add_argument("--memo-size", type=int, default=256,
+                    help="results kept per memoized function at -O3")
+parser.add_argument("--memo-stats", action="store_true", help="print memoization hits and misses after running")
+parser.add_argument("--translate", metavar="MODULE", help="write the program as a standalone Python module and exit")
+parser.add_argument("--report", action="store_true", help="print the optimizer report before running")
+parser.add_argument("--diff", action="store_true", help="print a diff of the optimized program before running")
+parser.add_argument("--stats", metavar="FILE",
+                    help="write peak memory and stack use, opcode counts, jumps and overflow wraps as JSON to FILE")
+parser.add_argument("--profile", metavar="FILE",
+                    help="sample the running function and label and write collapsed stacks for flame graphs to FILE")
+parser.add_argument("--profile-interval", type=float, default=1.0,
+                    help="milliseconds of CPU time between profiler samples")
+parser.add_argument("--timing", action="store_true",
+                    help="print modelled cycles, CPI and data cache hit rates per label after running")
+parser.add_argument("--timing-config", metavar="FILE",
+                    help="JSON file overriding the cycle costs and cache shape used by --timing")
+parser.add_argument("--trace", metavar="FILE", help="record executed instructions and writes to a binary trace file")
+parser.add_argument("--trace-capacity", type=int, default=1 << 16,
+                    help="records kept in the trace ring buffer, older records are overwritten")
+inputs = parser.add_mutually_exclusive_group()
+inputs.add_argument("--record-input", metavar="FILE", help="save every INPUT value to FILE while running")
+inputs.add_argument("--replay-input", metavar="FILE",
+                    help="answer INPUT from a file saved with --record-input instead of the terminal")
+parser.add_argument("--no-cache", action="store_true", help="assemble imported modules without the module cache")
+parser.add_argument("--parallel", action="store_true",
+                    help="run every core started with SPAWN in its own OS process over shared memory")
+parser.add_argument("--core-quantum", type=int, default=100,
+                    help="instructions a core runs before the next one continues when cores share one process")
+parser.add_argument("--serve", metavar="ADDRESS",
+                    help="run one session of the program per connection on a local port or unix socket path")
+parser.add_argument("--slice", type=int, default=1000,
+                    help="instructions a served session runs before letting other sessions continue")
+args = parser.parse_args()
+
+options = dict(optimize=args.optimize, unroll=max(1, args.unroll), inline_limit=args.inline_limit,
+               memo_size=max(1, args.memo_size), cache=not args.no_cache)
+compiler = Compiler(args.file, run=False, **options)
+if args.report:
+    for change in compiler.optimizer.report:
+        print(change, file=sys.stderr)
+if args.diff:
+    for line in compiler.optimizer.diff():
+        print(line, file=sys.stderr)
+if args.translate:
+    Translator(compiler).write(args.translate)
+    sys.exit(0)
+if args.serve:
+    print(f"Serving {args.file} on {args.serve}", file=sys.stderr)
+    try:
+        asyncio.run(serve(args.file, args.serve, args.slice, **options))
+    except KeyboardInterrupt:
+        pass
+    sys.exit(0)
+tracer = TraceRecorder(args.trace_capacity).attach(compiler) if args.trace else None
+recorder = InputRecorder(compiler) if args.record_input else None
+try:
+    replayer = InputReplayer(compiler, args.replay_input) if args.replay_input else None
+except (OSError, ValueError) as error:
+    print(f"\033[31mFATAL ERROR: {error}\033[0m")
+    sys.exit(1)
+if uses_cores(compiler.program):
+    Cores(compiler, args.core_quantum, args.parallel)
+    reports = [option for option, given in (("--stats", args.stats), ("--timing", args.timing or args.timing_config),
+                                            ("--trace", args.trace), ("--profile", args.profile)) if given]
+    if args.parallel and reports:
+        print(f"\033[31mWARNING: with --parallel only the first core is covered by {', '.join(reports)}\033[0m",
+              file=sys.stderr)
+usage = ResourceStats().attach(compiler) if args.stats else None
+timing = None
+if args.timing or args.timing_config:
+    try:
+        timing = TimingModel(load_config(args.timing_config) if args.timing_config else None).attach(compiler)
+    except (OSError, ValueError) as error:
+        print(f"\033[31mFATAL ERROR: {error}\033[0m")
+        sys.exit(1)
+profiler = SamplingProfiler(args.profile_interval / 1000).attach(compiler) if args.profile else None
+try:
+    if profiler:
+        profiler.start()
+    compiler.run()
+finally:
+    if profiler:
+        profiler.stop()
+        profiler.save(args.profile)
+    if usage:
+        usage.save(args.stats)
+    if tracer:
+        tracer.save(args.trace)
+    if recorder:
+        recorder.save(args.record_input)
+    if replayer and replayer.remaining():
+        print(f"\033[31mFATAL ERROR: {replayer.remaining()} recorded INPUT values were not used\033[0m")
+        sys.exit(1)
+    if args.memo_stats:
+        for name, memo in compiler.memos.items():
+            stats = memo.stats()
+            print(f"{name}: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions",
+                  file=sys.stderr)
+    if timing:
+        print(f"{'label':<20} {'cycles':>12} {'instructions':>12} {'CPI':>6} {'accesses':>10} {'hit rate':>8}",
+              file=sys.stderr)
+        for row in timing.report():
+            print(f"{row['label']:<20} {row['cycles']:>12} {row['instructions']:>12} {row['cpi']:>6.2f} "
+                  f"{row['accesses']:>10} {row['hit_rate']:>8.1%}", file=sys.stderr)
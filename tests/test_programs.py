@@ -0,0 +1,136 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAMS = {"bmi": "70\n150\n", "bubble": "5\n3.5\n1\n9\n2\n4\n", "factorial": "10\n", "fib": "15\n",
+            "ptl": "2\n1\n3\n4\n", "sqrt": "2\n", "test": ""}
+SNIPPETS = {
+    "arithmetic": ("""VAR n,7;
+MOVE I1,2147483647;
+ADD I1,1;
+PRINTF I1;
+MOVE I2,17;
+MOD I2,5;
+PRINTF I2;
+DIV I2,2;
+PRINTF I2;
+MOVE FF1,1.5;
+ADD FF1,I2;
+MUL FF1,n;
+PRINTF FF1;
+MOVE I3,n;
+SUB I3,10;
+PRINTF I3;
+MOVE V1,[1 2 3];
+ADD V1[1],0.5;
+PRINTF V1;
+""", "-2147483648\n2\n1\n17.5\n-3\n[1.0, 2.5, 3.0]\n"),
+    "vectors": ("""MOVE V1,[1 2 3 4];
+MOVE V2,[4 3 2 1];
+DOT FF1,V1,V2;
+PRINTF FF1;
+HSUM FF2,V1;
+PRINTF FF2;
+HMAX FF3,V2;
+PRINTF FF3;
+FMA FF1,2,3;
+PRINTF FF1;
+ADD V1,V2;
+PRINTF V1;
+MUL V2,2;
+PRINTF V2;
+SHUF V3,V2,[3 2 1 0];
+PRINTF V3;
+BCAST V4,1.5,3;
+PRINTF V4;
+""", "20.0\n10.0\n4.0\n26.0\n[5.0, 5.0, 5.0, 5.0]\n[8.0, 6.0, 4.0, 2.0]\n[2.0, 4.0, 6.0, 8.0]\n[1.5, 1.5, 1.5]\n"),
+    "calls": ("""VAR greeting,"hello";
+DEF square:
+    MOVE I2,I1;
+    MUL I2,I1;
+RETURN;
+DEF clobber:
+    PUSHA I,FF;
+    MOVE I1,99;
+    MOVE FF1,9.5;
+    POPA I,FF;
+RETURN;
+    MOVE I1,0;
+    MOVE I4,0;
+loop:
+    ADD I1,1;
+    CALL square;
+    ADD I4,I2;
+    MOVE I3,I1;
+    SUB I3,20;
+    JNZ I3,loop;
+    PRINTF I4;
+    MOVE FF1,2.5;
+    CALL clobber;
+    PRINTF I1;
+    PRINTF FF1;
+    MOVE I1,12;
+    CALL @FACT;
+    PRINTF I1;
+    MOVE V1,[5 3 9 1];
+    MOVE I1,4;
+    CALL @SORT;
+    PRINTF V1;
+    PRINT greeting;
+    PRINT greeting;
+""", "2870\n20\n2.5\n479001600\n[1.0, 3.0, 5.0, 9.0]\nhellohello"),
+}
+
+
+def run(*args, stdin=""):
+    return subprocess.run([sys.executable, *args], input=stdin, capture_output=True, text=True, cwd=ROOT,
+                          timeout=120)
+
+
+def program(name, tmp_path):
+    if name in SNIPPETS:
+        path = tmp_path / f"{name}.vasm"
+        path.write_text(SNIPPETS[name][0])
+        return str(path), ""
+    return os.path.join(ROOT, "programs", f"{name}.vasm"), PROGRAMS[name]
+
+
+@pytest.fixture(scope="module")
+def expected(tmp_path_factory):
+    outputs = {}
+    tmp_path = tmp_path_factory.mktemp("expected")
+    for name in list(PROGRAMS) + list(SNIPPETS):
+        path, stdin = program(name, tmp_path)
+        result = run("main.py", path, stdin=stdin)
+        assert result.returncode == 0, result.stdout + result.stderr
+        outputs[name] = result.stdout
+    return outputs
+
+
+@pytest.mark.parametrize("name", list(SNIPPETS))
+def test_snippet_output(name, expected):
+    assert expected[name] == SNIPPETS[name][1]
+
+
+@pytest.mark.parametrize("level", ["-O1", "-O2", "-O3"])
+@pytest.mark.parametrize("name", list(PROGRAMS) + list(SNIPPETS))
+def test_optimized_output_matches(name, level, expected, tmp_path):
+    path, stdin = program(name, tmp_path)
+    result = run("main.py", level, path, stdin=stdin)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout == expected[name]
+
+
+@pytest.mark.parametrize("level", ["-O0", "-O3"])
+@pytest.mark.parametrize("name", list(PROGRAMS) + list(SNIPPETS))
+def test_translated_output_matches(name, level, expected, tmp_path):
+    path, stdin = program(name, tmp_path)
+    module = str(tmp_path / f"{name}.py")
+    result = run("main.py", level, "--translate", module, path)
+    assert result.returncode == 0, result.stdout + result.stderr
+    result = run(module, stdin=stdin)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout == expected[name]
@@ -0,0 +1,121 @@
+import os
+import pickle
+import subprocess
+import sys
+
+from CPU.incremental import IncrementalAssembler
+from CPU.linker import CACHE_DIR
+from CPU.vasm_compiler import Compiler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIBRARY = """DEF five:
+    MOVE I1,5;
+    PUSHA I;
+    MOVE I1,9;
+    POPA I;
+RETURN;
+"""
+
+
+def run(*args, stdin=""):
+    return subprocess.run([sys.executable, *args], input=stdin, capture_output=True, text=True, cwd=ROOT,
+                          timeout=60)
+
+
+def test_cache_from_another_decoder_is_ignored(tmp_path):
+    (tmp_path / "lib.vasm").write_text(LIBRARY)
+    main = tmp_path / "main.vasm"
+    main.write_text('IMPORT "lib.vasm";\nCALL five;\nPRINT I1;\n')
+    assert run("main.py", str(main)).stdout == "5"
+    cache = tmp_path / CACHE_DIR / "lib.vasm.pickle"
+    with open(cache, 'rb') as file:
+        fingerprint, module = pickle.load(file)
+    module.code = [("UNKNOWN", (entry[0],)) if entry is not None and entry[0] in ("PUSHA", "POPA") else entry
+                   for entry in module.code]
+    with open(cache, 'wb') as file:
+        pickle.dump(("an older decoder", module), file)
+    assert run("main.py", str(main)).stdout == "5"
+    with open(cache, 'wb') as file:
+        pickle.dump((fingerprint, module), file)
+    assert "Unknown instruction: PUSHA" in run("main.py", str(main)).stdout
+
+
+def test_incremental_update_to_empty_source(tmp_path):
+    path = tmp_path / "fib.vasm"
+    source = open(os.path.join(ROOT, "programs", "fib.vasm")).read()
+    path.write_text(source)
+    compiler = Compiler(str(path), run=False)
+    assembler = IncrementalAssembler(compiler)
+    assembler.update("")
+    assert not any(compiler.program)
+    assembler.update(source)
+    fresh = Compiler(str(path), run=False)
+    assert [line.strip() for line in compiler.asm] == [line.strip() for line in fresh.asm]
+    assert [entry and entry[0] for entry in compiler.program] == [entry and entry[0] for entry in fresh.program]
+
+
+def test_empty_program(tmp_path):
+    path = tmp_path / "empty.vasm"
+    path.write_text("")
+    assert not any(Compiler(str(path), run=False).program)
+
+
+def test_factorial_of_large_value_wraps_to_zero(tmp_path):
+    path = tmp_path / "fact.vasm"
+    path.write_text("MOVE I1,2000000000;\nCALL @FACT;\nPRINTF I1;\nMOVE I1,33;\nCALL @FACT;\nPRINTF I1;\n")
+    assert run("main.py", str(path)).stdout == "0\n-2147483648\n"
+    module = str(tmp_path / "fact.py")
+    run("main.py", "--translate", module, str(path))
+    assert run(module).stdout == "0\n-2147483648\n"
+
+
+def test_trace_state_out_of_range(tmp_path):
+    trace = str(tmp_path / "test.vtr")
+    assert run("main.py", "--trace", trace, "programs/fib.vasm", stdin="5\n").returncode == 0
+    result = run("analyze_trace.py", trace, "--state", "1000000")
+    assert result.returncode == 1
+    assert "FATAL ERROR: Step 1000000 is not in the trace" in result.stdout
+    assert "Traceback" not in result.stderr
+
+
+def test_replay_of_truncated_input_log(tmp_path):
+    log = tmp_path / "inputs.log"
+    assert run("main.py", "--record-input", str(log), "programs/factorial.vasm", stdin="10\n").returncode == 0
+    data = log.read_bytes()
+    for size in (0, 8, 20, len(data) - 1):
+        log.write_bytes(data[:size])
+        result = run("main.py", "--replay-input", str(log), "programs/factorial.vasm")
+        assert result.returncode == 1
+        assert "FATAL ERROR" in result.stdout
+        assert "Traceback" not in result.stderr
+    result = run("main.py", "--replay-input", str(tmp_path / "missing.log"), "programs/factorial.vasm")
+    assert result.returncode == 1 and "FATAL ERROR" in result.stdout
+
+
+def test_truncated_trace(tmp_path):
+    trace = tmp_path / "test.vtr"
+    assert run("main.py", "--trace", str(trace), "programs/fib.vasm", stdin="5\n").returncode == 0
+    data = trace.read_bytes()
+    listing = data.rindex(b'{"program"')
+    for content in (data[:5], data[:40], data[:100], data[:listing - 3], data[:-1], data[:listing] + b'{"lines": []}'):
+        trace.write_bytes(content)
+        result = run("analyze_trace.py", str(trace))
+        assert result.returncode == 1
+        assert "FATAL ERROR" in result.stdout
+        assert "Traceback" not in result.stderr
+
+
+def test_incremental_edit_defers_optimization_and_shifts_lines(tmp_path, capsys):
+    path = tmp_path / "sum.vasm"
+    path.write_text("MOVE I1,5;\nMOVE I2,0;\nloop:\n    ADD I2,I1;\n    SUB I1,1;\n    JNZ I1,loop;\nPRINTF I2;\n")
+    compiler = Compiler(str(path), optimize=3, run=False)
+    assembler = IncrementalAssembler(compiler)
+    assembler.replace(1, 1, "MOVE I1,10;\nMOVE I3,1;\n")
+    assert compiler.stale
+    lines = {asm.strip(): location.line for asm, location in zip(compiler.asm, compiler.locations)}
+    assert lines["JNZ I1,loop"] == 7 and lines["PRINTF I2"] == 8
+    compiler.reset()
+    compiler.run()
+    assert not compiler.stale
+    assert "LOOP" in [entry[0] for entry in compiler.program if entry is not None]
+    assert capsys.readouterr().out == "55\n"